@@ -366,6 +366,15 @@ class AdminPortal:
                  bg=self.colors['accent_secondary'], fg="#0f172a", font=(self.fonts['primary'], 10, "bold"),
                  relief="flat", padx=15).pack(side=tk.LEFT)
         
+        load_more_btn = tk.Button(tools, text="⬇ Load More", 
+                 bg=self.colors['secondary'], fg=self.colors['text_primary'], font=(self.fonts['primary'], 10, "bold"),
+                 relief="flat", padx=15)
+        load_more_btn.pack(side=tk.LEFT, padx=10)
+        
+        count_lbl = tk.Label(tools, text="", font=(self.fonts['secondary'], 10),
+                 fg=self.colors['text_secondary'], bg=self.colors['primary'])
+        count_lbl.pack(side=tk.LEFT)
+        
         # Log Table
         list_frame = tk.Frame(self.content_area, bg=self.colors['secondary'])
         list_frame.pack(fill=tk.BOTH, expand=True)
@@ -395,34 +404,48 @@ class AdminPortal:
         tree.column("Status/Details", width=300)
         
         v_scroll = ttk.Scrollbar(list_frame, orient="vertical", command=tree.yview)
-        tree.configure(yscrollcommand=v_scroll.set)
         
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
-        if DB_AVAILABLE:
+        # Access logs are loaded one keyset page at a time (newest first);
+        # the next page is fetched on demand or when scrolled to the bottom
+        page_state = {'cursor': None, 'done': False, 'loaded': 0}
+        
+        def load_page():
+            if page_state['done'] or not DB_AVAILABLE:
+                return
             try:
-                # Use SQL directly if specific method missing
-                with db.get_connection() as conn:
-                    cursor = conn.cursor()
-                    # Try access logs + audit logs or just one?
-                    # Let's show access logs first as they are most relevant for "audit" of entry
-                    cursor.execute('''
-                        SELECT access_time, person_id, access_type, access_granted, confidence_score 
-                        FROM access_logs 
-                        ORDER BY access_time DESC LIMIT 100
-                    ''')
-                    logs = cursor.fetchall()
-                    
-                    for log in logs:
-                        status = "✅ Granted" if log['access_granted'] else "❌ Denied"
-                        details = f"Score: {log['confidence_score']:.2f}"
-                        # Resolve person name if possible
-                        p_name = f"ID: {log['person_id']}"
-                        
-                        tree.insert("", "end", values=(log['access_time'], p_name, log['access_type'], f"{status} | {details}"))
+                logs, page_state['cursor'] = db.page_access_history(
+                    page_state['cursor'], page_size=100, hours=None,
+                    columns=['access_time', 'person_id', 'name', 'access_type', 'access_granted', 'confidence_score'])
             except Exception as e:
+                page_state['done'] = True
                 tree.insert("", "end", values=("Error", "DB Error", str(e), ""))
+                return
+            
+            for log in logs:
+                status = "✅ Granted" if log['access_granted'] else "❌ Denied"
+                details = f"Score: {(log['confidence_score'] or 0):.2f}"
+                # Resolve person name if possible
+                p_name = log['name'] or f"ID: {log['person_id']}"
+                
+                tree.insert("", "end", values=(log['access_time'], p_name, log['access_type'], f"{status} | {details}"))
+            
+            page_state['loaded'] += len(logs)
+            if page_state['cursor'] is None:
+                page_state['done'] = True
+                load_more_btn.config(state=tk.DISABLED)
+            count_lbl.config(text=f"{page_state['loaded']} entries" + ("" if page_state['done'] else "+"))
+        
+        def on_scroll(first, last):
+            v_scroll.set(first, last)
+            if float(last) >= 1.0 and not page_state['done'] and page_state['loaded']:
+                tree.after_idle(load_page)
+        
+        tree.configure(yscrollcommand=on_scroll)
+        load_more_btn.config(command=load_page)
+        load_page()
 
     def show_add_admin_modal(self):
         modal = tk.Toplevel(self.root)
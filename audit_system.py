@@ -5,40 +5,216 @@ Features:
 - Append-only JSONL logs
 - HMAC-SHA256 hash chain for tamper evidence
 - Automatic log directory creation
-- Simple verification helper
+- Segment rotation by size or age; each sealed segment records its first
+  and last chain hashes and an HMAC over its content
+- Parallel verification of sealed segments (process pool) with boundary
+  stitching, an incremental mode and optional gzip of sealed segments
+- Chain tip kept in memory and the active segment held open; events go
+  through a bounded queue to one writer thread that appends each batch with
+  a single write() and fsyncs per event, every N events or on an interval
+- Startup check against the saved tip state flags truncation, rewrites or
+  foreign appends as an 'audit_log_external_modification' event
+- SQLite sidecar index (event, details.person_id, hour bucket -> segment and
+  byte offset) so lookups seek straight to the matching records, each of
+  which is re-checked against its chain HMAC
 
 Usage:
     from audit_system import AuditLogger
     logger = AuditLogger()
     logger.log_event('vote_cast_attempt', {'person_id': 1, 'party_id': 2})
+    logger.flush()
+    ok, count = logger.verify_chain(incremental=True)
+    hits = logger.query(event='vote_cast_success', person_id=1)
 """
 
 import os
+import re
+import glob
+import gzip
 import json
 import hmac
 import hashlib
+import atexit
+import itertools
+import queue
+import sqlite3
 import threading
-from datetime import datetime
-from typing import Optional, Dict, Any, Tuple
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Tuple, List
+
+_SEGMENT_RE = re.compile(r'audit-(\d{6})\.seal\.json$')
+_SEGMENT_FILE_RE = re.compile(r'audit-(\d{6})\.jsonl(\.gz)?$')
+
+# Event index: one row per record, keyed by (segment index, byte offset).
+# Segment indexes survive rotation, so rows stay valid once a segment is sealed.
+_INDEX_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS audit_index (
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    ts TEXT NOT NULL,
+    hour TEXT NOT NULL,
+    event TEXT NOT NULL,
+    person_id TEXT,
+    chain_hash TEXT NOT NULL,
+    PRIMARY KEY (segment, offset)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_audit_index_event ON audit_index(event, ts);
+CREATE INDEX IF NOT EXISTS idx_audit_index_person ON audit_index(person_id, ts);
+CREATE INDEX IF NOT EXISTS idx_audit_index_hour ON audit_index(hour);
+CREATE TABLE IF NOT EXISTS audit_index_mark (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL
+);
+'''
+_INDEX_INSERT = 'INSERT OR REPLACE INTO audit_index VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+_INDEX_MARK = 'INSERT OR REPLACE INTO audit_index_mark (id, segment, offset) VALUES (1, ?, ?)'
+
+
+def _chain_hash(secret: bytes, payload: Dict[str, Any], prev_hash: str) -> str:
+    msg = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    data = prev_hash.encode('utf-8') + b'|' + msg
+    return hmac.new(secret, data, hashlib.sha256).hexdigest()
+
+
+def _open_segment(path: str):
+    return gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')
+
+
+def _index_row(segment: int, offset: int, length: int, obj: Dict[str, Any]) -> Tuple:
+    timestamp = obj.get('timestamp', '')
+    details = obj.get('details')
+    person_id = details.get('person_id') if isinstance(details, dict) else None
+    return (segment, offset, length, timestamp, timestamp[:13], obj.get('event', ''),
+            None if person_id is None else str(person_id), obj.get('chain_hash', ''))
+
+
+def _timestamp_key(value: Any) -> str:
+    """Datetime (UTC) or ISO string in the log's timestamp format, for range comparisons"""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat(timespec='milliseconds') + 'Z'
+    return str(value)
+
+
+def _last_line(f, end: int, block: int = 8192) -> bytes:
+    """Last non-empty line before offset end, read backwards in blocks"""
+    tail = b''
+    position = end
+    while position > 0:
+        step = min(block, position)
+        position -= step
+        f.seek(position)
+        tail = f.read(step) + tail
+        stripped = tail.rstrip(b'\r\n')
+        cut = stripped.rfind(b'\n')
+        if cut >= 0:
+            return stripped[cut + 1:]
+    return tail.strip()
+
+
+def _scan_segment(path: str, secret: bytes, prev_hash: str, offset: int = 0) -> Dict[str, Any]:
+    """
+    Replay the chain of one segment file from prev_hash and HMAC its raw
+    content. Top-level so sealed segments can be verified in worker processes.
+    With an offset (plain files only) replay starts there instead.
+    """
+    content_mac = hmac.new(secret, digestmod=hashlib.sha256)
+    result = {'path': path, 'valid': True, 'records': 0, 'bytes': 0,
+              'first_prev_hash': prev_hash, 'first_hash': None, 'last_hash': prev_hash}
+    prev = prev_hash
+    with _open_segment(path) as f:
+        if offset:
+            f.seek(offset)
+        for raw in f:
+            content_mac.update(raw)
+            result['bytes'] += len(raw)
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError:
+                result['valid'] = False
+                break
+            record = {k: obj[k] for k in ('timestamp', 'event', 'details') if k in obj}
+            if prev != obj.get('prev_hash') or _chain_hash(secret, record, prev) != obj.get('chain_hash'):
+                result['valid'] = False
+                break
+            prev = obj['chain_hash']
+            if result['first_hash'] is None:
+                result['first_hash'] = prev
+            result['records'] += 1
+    result['last_hash'] = prev
+    result['content_hmac'] = content_mac.hexdigest()
+    return result
 
 
 class AuditLogger:
     """Thread-safe, tamper-evident audit logger."""
 
+    FSYNC_POLICIES = ('event', 'every_n', 'interval', 'none')
+    _WRITE_BATCH = 512  # Records joined into one write() call at most
+
     def __init__(self,
                  log_dir: str = 'logs',
                  log_filename: str = 'audit.log.jsonl',
-                 secret_env_var: str = 'AUDIT_LOG_SECRET'):
+                 secret_env_var: str = 'AUDIT_LOG_SECRET',
+                 max_segment_bytes: Optional[int] = 16 * 1024 * 1024,
+                 max_segment_age: Optional[float] = 24 * 3600,
+                 compress_sealed: bool = False,
+                 fsync_policy: str = 'interval',
+                 fsync_every: int = 100,
+                 fsync_interval: float = 1.0,
+                 queue_size: int = 10000,
+                 index_filename: Optional[str] = 'audit_index.db'):
+        if fsync_policy not in self.FSYNC_POLICIES:
+            raise ValueError("fsync_policy must be one of {}".format(', '.join(self.FSYNC_POLICIES)))
         self.log_dir = log_dir
         self.log_path = os.path.join(log_dir, log_filename)
+        self.segment_dir = os.path.join(log_dir, 'segments')
         self.secret_env_var = secret_env_var
-        self._lock = threading.Lock()
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.compress_sealed = compress_sealed
+        self.index_path = os.path.join(log_dir, index_filename) if index_filename else None
+        self.index_enabled = bool(index_filename)
+        self._index_local = threading.local()
+        self.fsync_policy = fsync_policy
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()  # Guards the active file, tip and rotation
+        self._segment_started = None  # Time of the active segment's first record
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._fh = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._last_state_save = 0.0
+        self.stats = {'events': 0, 'writes': 0, 'fsyncs': 0, 'errors': 0, 'index_errors': 0,
+                      'external_modifications': 0, 'invalid_segments': 0}
+        self.external_modification = None  # Reason, if the log was changed behind our back
         self._ensure_log_dir()
         self._secret = self._load_or_create_secret()
+        invalid = self._adopt_orphan_segments()
+        self._tip, self._offset, reason = self._recover_tip()
+        self._segment_index = self._next_segment_index()
+        if reason:
+            self._flag_external_modification(reason)
+        for index, scan in invalid:
+            self._alert_invalid_segment(index, scan)
+        atexit.register(self.close)
 
     def _ensure_log_dir(self) -> None:
         try:
             os.makedirs(self.log_dir, exist_ok=True)
+            os.makedirs(self.segment_dir, exist_ok=True)
         except Exception:
             pass
 
@@ -72,73 +248,744 @@ class AuditLogger:
 
     def _read_last_hash(self) -> str:
         try:
-            if not os.path.exists(self.log_path):
-                return ''
+            if not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0:
+                # Fresh active segment: continue from the last sealed one
+                seals = self._sealed_segments()
+                return seals[-1]['last_hash'] if seals else ''
             with open(self.log_path, 'rb') as f:
-                # Read last non-empty line efficiently
-                f.seek(0, os.SEEK_END)
-                position = f.tell()
-                buffer = bytearray()
-                while position:
-                    position -= 1
-                    f.seek(position)
-                    byte = f.read(1)
-                    if byte == b'\n' and buffer:
-                        break
-                    buffer.extend(byte)
-                if not buffer:
-                    return ''
-                last_line = bytes(reversed(buffer)).decode('utf-8').strip()
-                if not last_line:
-                    return ''
-                obj = json.loads(last_line)
-                return obj.get('chain_hash', '')
+                last_line = _last_line(f, os.fstat(f.fileno()).st_size)
+            return json.loads(last_line).get('chain_hash', '') if last_line else ''
         except Exception:
             return ''
 
     def _compute_chain_hash(self, payload: Dict[str, Any], prev_hash: str) -> str:
-        msg = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
-        data = prev_hash.encode('utf-8') + b'|' + msg
-        mac = hmac.new(self._secret, data, hashlib.sha256).hexdigest()
-        return mac
+        return _chain_hash(self._secret, payload, prev_hash)
 
-    def log_event(self, event_type: str, details: Optional[Dict[str, Any]] = None) -> None:
-        record = {
+    # --- Chain tip ---
+    def _tip_state_path(self) -> str:
+        return os.path.join(self.segment_dir, '.tip.json')
+
+    def _tip_state_mac(self, state: Dict[str, Any]) -> str:
+        msg = '{}|{}|{}'.format(state.get('sealed'), state.get('size'), state.get('tip'))
+        return hmac.new(self._secret, msg.encode('utf-8'), hashlib.sha256).hexdigest()
+
+    def _save_tip_state(self) -> None:
+        """Remember where this logger left the active segment (size and chain tip)"""
+        try:
+            if os.path.getsize(self.log_path) != self._offset:
+                return  # Another writer appended since; its state is the newer one
+        except OSError:
+            if self._offset:
+                return
+        state = {'sealed': len(self._sealed_segments()), 'size': self._offset, 'tip': self._tip}
+        state['mac'] = self._tip_state_mac(state)
+        try:
+            tmp = self._tip_state_path() + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp, self._tip_state_path())
+        except Exception:
+            pass
+        self._last_state_save = time.monotonic()
+
+    def _load_tip_state(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._tip_state_path(), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception:
+            return None
+        if not hmac.compare_digest(state.get('mac', ''), self._tip_state_mac(state)):
+            return {'invalid': True}
+        return state
+
+    def _recover_tip(self) -> Tuple[str, int, Optional[str]]:
+        """
+        Read the chain tip once at startup and check the active segment
+        against the state saved by the last writer: a shrunk file, a
+        rewritten last record or appended records that do not chain from the
+        saved tip mean the log was modified outside this logger.
+        """
+        seals = self._sealed_segments()
+        seal_tip = seals[-1]['last_hash'] if seals else ''
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            size = 0
+        tip, reason = seal_tip, None
+        last = None
+        state = self._load_tip_state()
+        if state and not state.get('invalid') and state['sealed'] == len(seals) and size < state['size']:
+            reason = 'active segment shrank from {} to {} bytes'.format(state['size'], size)
+        if size:
+            try:
+                with open(self.log_path, 'rb') as f:
+                    last = json.loads(_last_line(f, size))
+                tip = last.get('chain_hash', '')
+            except Exception:
+                reason = reason or 'last record of the active segment is unreadable'
+
+        if reason is None and state is not None:
+            if state.get('invalid'):
+                reason = 'tip state file failed its HMAC'
+            elif state['sealed'] > len(seals):
+                reason = 'sealed segments were removed'
+            elif state['sealed'] == len(seals):
+                reason = self._check_since(state, size, seal_tip)
+            # More seals than saved: another process rotated; nothing to compare
+        elif reason is None and last is not None:
+            record = {k: last[k] for k in ('timestamp', 'event', 'details') if k in last}
+            if not hmac.compare_digest(last.get('chain_hash', ''),
+                                       self._compute_chain_hash(record, last.get('prev_hash', ''))):
+                reason = 'last record of the active segment fails its HMAC'
+
+        return tip, size, reason
+
+    def _check_since(self, state: Dict[str, Any], size: int, seal_tip: str) -> Optional[str]:
+        saved_size, saved_tip = state['size'], state['tip']
+        if size < saved_size:
+            return 'active segment shrank from {} to {} bytes'.format(saved_size, size)
+        try:
+            line = b''
+            if saved_size:  # After a rotation the active segment may not exist yet
+                with open(self.log_path, 'rb') as f:
+                    line = _last_line(f, saved_size)
+            anchor = json.loads(line) if line else None
+        except Exception:
+            return 'record at the saved chain tip is unreadable'
+        if anchor is None:
+            rewritten = saved_tip != seal_tip
+        else:
+            record = {k: anchor[k] for k in ('timestamp', 'event', 'details') if k in anchor}
+            rewritten = anchor.get('chain_hash') != saved_tip or not hmac.compare_digest(
+                saved_tip, self._compute_chain_hash(record, anchor.get('prev_hash', '')))
+        if rewritten:
+            return 'record at the saved chain tip was rewritten'
+        if size > saved_size:
+            # Records appended after the last save (ours, before a crash, or someone else's)
+            scan = _scan_segment(self.log_path, self._secret, saved_tip, offset=saved_size)
+            if not scan['valid']:
+                return 'records appended after the saved tip do not chain'
+        return None
+
+    def _flag_external_modification(self, reason: str) -> None:
+        self.external_modification = reason
+        self.stats['external_modifications'] += 1
+        print("⚠️ Audit log modified externally: {}".format(reason))
+        # Recorded in the chain itself; queued, so this never blocks on the lock
+        self._enqueue({
             'timestamp': datetime.utcnow().isoformat(timespec='milliseconds') + 'Z',
-            'event': event_type,
-            'details': details or {}
+            'event': 'audit_log_external_modification',
+            'details': {'reason': reason, 'active_segment_bytes': self._offset}
+        })
+
+    # --- Segments ---
+    def _seal_hmac(self, seal: Dict[str, Any]) -> str:
+        body = {k: v for k, v in seal.items() if k != 'seal_hmac' and not k.startswith('_')}
+        msg = json.dumps(body, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        return hmac.new(self._secret, msg, hashlib.sha256).hexdigest()
+
+    def _sealed_segments(self) -> List[Dict[str, Any]]:
+        """Seal records of all sealed segments, oldest first"""
+        seals = []
+        for path in sorted(glob.glob(os.path.join(self.segment_dir, 'audit-*.seal.json'))):
+            if not _SEGMENT_RE.search(path):
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    seal = json.load(f)
+                seal['_seal_path'] = path
+                seals.append(seal)
+            except Exception:
+                seals.append({'_seal_path': path, 'index': -1})
+        return seals
+
+    def sealed_segments(self) -> List[Dict[str, Any]]:
+        """Seals of all sealed segments, oldest first, each with the segment file 'path'"""
+        seals = []
+        for seal in self._sealed_segments():
+            if 'file' in seal:
+                seal = {k: v for k, v in seal.items() if not k.startswith('_')}
+                seal['path'] = os.path.join(self.segment_dir, seal['file'])
+                seals.append(seal)
+        return seals
+
+    def _next_segment_index(self) -> int:
+        """Index the active segment will get when it is sealed"""
+        return max((s.get('index', -1) for s in self._sealed_segments()), default=-1) + 1
+
+    def _segment_path(self, index: int, seals: Optional[Dict[int, Dict[str, Any]]] = None) -> str:
+        if seals is None:
+            seals = {s.get('index'): s for s in self._sealed_segments()}
+        seal = seals.get(index)
+        return os.path.join(self.segment_dir, seal['file']) if seal else self.log_path
+
+    def _should_rotate(self) -> bool:
+        if self._offset == 0:
+            return False
+        if self.max_segment_bytes and self._offset >= self.max_segment_bytes:
+            return True
+        if self.max_segment_age:
+            if self._segment_started is None:
+                self._segment_started = self._first_record_time()
+            return time.time() - self._segment_started >= self.max_segment_age
+        return False
+
+    def _first_record_time(self) -> float:
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                first = json.loads(f.readline())
+            started = datetime.strptime(first['timestamp'].rstrip('Z'), '%Y-%m-%dT%H:%M:%S.%f')
+            return started.replace(tzinfo=timezone.utc).timestamp()
+        except Exception:
+            return time.time()
+
+    def rotate(self) -> Optional[str]:
+        """Seal the active segment now (if it has records); returns the sealed file path"""
+        self.flush()
+        with self._lock:
+            return self._rotate_locked()
+
+    def _rotate_locked(self) -> Optional[str]:
+        self._close_file()
+        if not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0:
+            return None
+        # A segment left unsealed by a crash (here or in another process) keeps its index
+        for index, scan in self._adopt_orphan_segments():
+            self._alert_invalid_segment(index, scan)
+        seals = self._sealed_segments()
+        index = (max((s.get('index', -1) for s in seals), default=-1)) + 1
+        prev_hash = seals[-1]['last_hash'] if seals else ''
+
+        segment_path = os.path.join(self.segment_dir, 'audit-{:06d}.jsonl'.format(index))
+        os.replace(self.log_path, segment_path)
+        segment_path, scan = self._seal_segment(index, segment_path, prev_hash)
+        if not scan['valid']:
+            self._alert_invalid_segment(index, scan)
+        self._segment_started = None
+        self._offset = 0
+        self._segment_index = index + 1
+        self._save_tip_state()
+        return segment_path
+
+    def _seal_segment(self, index: int, segment_path: str, prev_hash: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Compress (if configured) and seal a segment file already moved into
+        the segment directory. Returns its final path and the chain scan.
+        """
+        base = os.path.join(self.segment_dir, 'audit-{:06d}'.format(index))
+        scan = _scan_segment(segment_path, self._secret, prev_hash)
+        if self.compress_sealed and not segment_path.endswith('.gz'):
+            with open(segment_path, 'rb') as src, gzip.open(segment_path + '.gz', 'wb') as dst:
+                while True:
+                    chunk = src.read(1 << 20)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+            os.remove(segment_path)
+            segment_path += '.gz'
+
+        seal = {
+            'index': index,
+            'file': os.path.basename(segment_path),
+            'records': scan['records'],
+            'bytes': scan['bytes'],
+            'first_prev_hash': prev_hash,
+            'first_hash': scan['first_hash'],
+            'last_hash': scan['last_hash'],
+            'content_hmac': scan['content_hmac'],
+            'chain_valid_at_seal': scan['valid'],
+            'sealed_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
         }
+        seal['seal_hmac'] = self._seal_hmac(seal)
+        tmp_path = base + '.seal.json.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(seal, f, indent=2)
+        os.replace(tmp_path, base + '.seal.json')
+        return segment_path, scan
+
+    def _adopt_orphan_segments(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Seal segment files that a crash left between the move out of the
+        active log and the seal, so the next rotation cannot reuse (and
+        overwrite) their index. A plain file next to a .gz means compression
+        was interrupted: the plain file is the complete one. Returns
+        (index, scan) of adopted segments whose chain did not verify.
+        """
+        invalid = []
+        try:
+            paths = sorted(glob.glob(os.path.join(self.segment_dir, 'audit-*.jsonl*')))
+        except Exception:
+            return invalid
+        for path in paths:
+            match = _SEGMENT_FILE_RE.search(path)
+            if not match or not os.path.exists(path):
+                continue
+            index = int(match.group(1))
+            if os.path.exists(os.path.join(self.segment_dir, 'audit-{:06d}.seal.json'.format(index))):
+                continue
+            seals = [s for s in self._sealed_segments() if 'last_hash' in s]
+            if not match.group(2) and os.path.exists(path + '.gz'):
+                os.remove(path + '.gz')
+            earlier = [s for s in seals if s.get('index', -1) < index]
+            prev_hash = max(earlier, key=lambda s: s['index'])['last_hash'] if earlier else ''
+            try:
+                _, scan = self._seal_segment(index, path, prev_hash)
+            except Exception as e:
+                print("⚠️ Could not seal orphaned audit segment {}: {}".format(path, e))
+                continue
+            print("⚠️ Sealed audit segment {:06d} left unsealed by an interrupted rotation".format(index))
+            if not scan['valid']:
+                invalid.append((index, scan))
+        return invalid
+
+    def _alert_invalid_segment(self, index: int, scan: Dict[str, Any]) -> None:
+        """A segment was sealed with a broken chain: say so loudly and record it in the chain"""
+        reason = 'segment {:06d} sealed with a broken chain after {} valid record(s)'.format(index, scan['records'])
+        self.external_modification = reason
+        self.stats['invalid_segments'] += 1
+        print("⚠️ Audit log integrity alert: {}".format(reason))
+        self._ensure_writer()
+        try:
+            # Never block here: rotation can run on the writer thread itself
+            self._queue.put_nowait(({
+                'timestamp': datetime.utcnow().isoformat(timespec='milliseconds') + 'Z',
+                'event': 'audit_segment_chain_invalid',
+                'details': {'segment': index, 'valid_records': scan['records']}
+            }, None))
+        except queue.Full:
+            pass
+
+    # --- Writer ---
+    def _open_file(self):
+        """
+        Keep the active segment open for appending. If another process
+        appended to, truncated or rotated the file, re-read the tip from disk
+        before chaining onto it.
+        """
+        if self._fh is not None:
+            try:
+                st = os.stat(self.log_path)
+                same_file = os.path.samestat(st, os.fstat(self._fh.fileno()))
+            except OSError:
+                same_file = False
+            if same_file and st.st_size == self._offset:
+                return self._fh
+            self._close_file()
+            self._resync_tip('active segment changed by another writer')
+        self._fh = open(self.log_path, 'ab', buffering=0)
+        size = os.fstat(self._fh.fileno()).st_size
+        if size != self._offset:
+            self._resync_tip('active segment changed by another writer')
+        return self._fh
+
+    def _resync_tip(self, reason: str) -> None:
+        self.stats['external_modifications'] += 1
+        self.external_modification = reason
+        self._tip = self._read_last_hash()
+        self._segment_index = self._next_segment_index()
+        try:
+            self._offset = os.path.getsize(self.log_path)
+        except OSError:
+            self._offset = 0
+
+    def _close_file(self) -> None:
+        if self._fh is not None:
+            try:
+                os.fsync(self._fh.fileno())
+                self._fh.close()
+            except Exception:
+                pass
+            self._fh = None
+            self._unsynced = 0
+
+    def _sync(self, save_state: bool = False) -> None:
+        if self._fh is not None and self._unsynced:
+            try:
+                os.fsync(self._fh.fileno())
+                self.stats['fsyncs'] += 1
+            except Exception:
+                self.stats['errors'] += 1
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        if save_state or self._last_sync - self._last_state_save >= max(self.fsync_interval, 1.0):
+            self._save_tip_state()
+
+    def _write_records(self, records: List[Dict[str, Any]]) -> None:
+        """Chain a batch onto the in-memory tip and append it with one write()"""
         with self._lock:
-            prev_hash = self._read_last_hash()
-            chain_hash = self._compute_chain_hash(record, prev_hash)
-            record['prev_hash'] = prev_hash
-            record['chain_hash'] = chain_hash
             try:
-                with open(self.log_path, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                if self._should_rotate():
+                    self._rotate_locked()
             except Exception:
-                # Best-effort logging; ignore failures to avoid breaking main flow
+                # Keep appending to the active segment if sealing fails
                 pass
+            try:
+                fh = self._open_file()
+                tip = self._tip
+                lines = []
+                for record in records:
+                    chain_hash = self._compute_chain_hash(record, tip)
+                    record['prev_hash'] = tip
+                    record['chain_hash'] = chain_hash
+                    lines.append((json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8'))
+                    tip = chain_hash
+                data = b''.join(lines)
+                view = memoryview(data)
+                while view:
+                    view = view[fh.write(view):]
+            except Exception:
+                # Best-effort logging; the tip only advances once the batch is on disk
+                self.stats['errors'] += 1
+                self._close_file()
+                return
+            if self._segment_started is None:
+                self._segment_started = time.time()
+            if self.index_enabled:
+                self._index_batch(records, lines)
+            self._tip = tip
+            self._offset += len(data)
+            self._unsynced += len(records)
+            self.stats['writes'] += 1
+            self.stats['events'] += len(records)
+            policy = self.fsync_policy
+            if policy == 'event' or (policy == 'every_n' and self._unsynced >= self.fsync_every) \
+                    or (policy == 'interval' and time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+
+    def _run(self) -> None:
+        while True:
+            timeout = self.fsync_interval if self._unsynced and self.fsync_policy == 'interval' else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._sync()
+                continue
+            items = [item]
+            while len(items) < self._WRITE_BATCH:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [record for record, _ in items if record is not None]
+            if records:
+                self._write_records(records)
+            waiters = [done for record, done in items if done is not None]
+            barrier = any(record is None for record, _ in items)
+            if barrier or (self.fsync_policy == 'event' and waiters):
+                with self._lock:
+                    self._sync(save_state=barrier)
+            for done in waiters:
+                done.set()
+            if any(record is None and done is None for record, done in items):
+                conn = getattr(self._index_local, 'conn', None)
+                if conn is not None:
+                    conn.close()
+                return  # Stop sentinel
+
+    def _ensure_writer(self) -> None:
+        if self._pid != os.getpid():
+            # Forked child: the parent's thread and handle are not ours
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=self._queue.maxsize)
+            self._writer = None
+            self._fh = None
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name='AuditLogWriter', daemon=True)
+                self._writer.start()
+
+    def _enqueue(self, record: Optional[Dict[str, Any]], done: Optional[threading.Event] = None) -> None:
+        self._ensure_writer()
+        # Bounded: producers block rather than drop audit records
+        self._queue.put((record, done))
+
+    def log_event(self, event_type: str, details: Optional[Dict[str, Any]] = None,
+                  wait: Optional[bool] = None) -> None:
+        """
+        Queue an event for the writer thread. The caller waits until the
+        record is written (and fsynced) when wait=True, which is the default
+        under the 'event' fsync policy.
+        """
+        record = {
+            'timestamp': datetime.utcnow().isoformat(timespec='milliseconds') + 'Z',
+            'event': event_type,
+            'details': details or {}
+        }
+        if wait is None:
+            wait = self.fsync_policy == 'event'
+        done = threading.Event() if wait else None
+        try:
+            self._enqueue(record, done)
+        except Exception:
+            # Best-effort logging; ignore failures to avoid breaking main flow
+            return
+        if done is not None:
+            done.wait()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued event is written and fsynced; False on timeout"""
+        if self._writer is None or self._pid != os.getpid():
+            return True
+        done = threading.Event()
+        self._enqueue(None, done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._writer is not None and self._writer.is_alive() and self._pid == os.getpid():
+            self._queue.put((None, None))
+            self._writer.join(timeout)
+        with self._lock:
+            self._close_file()
+            if self._pid == os.getpid() and self.stats['events']:
+                self._save_tip_state()
+
+    # --- Event index ---
+    def _index_conn(self) -> sqlite3.Connection:
+        conn = getattr(self._index_local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.index_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_INDEX_SCHEMA)
+            self._index_local.conn = conn
+        return conn
 
-    def verify_chain(self) -> Tuple[bool, int]:
-        """Verify the entire log chain. Returns (is_valid, checked_records)."""
+    def _index_batch(self, records: List[Dict[str, Any]], lines: List[bytes]) -> None:
+        """Index a batch just appended at self._offset; runs under self._lock"""
         try:
-            if not os.path.exists(self.log_path):
-                return True, 0
+            conn = self._index_conn()
+            self._catch_up_index(conn, self._segment_index, self._offset)
+            offset = self._offset
+            rows = []
+            for record, line in zip(records, lines):
+                rows.append(_index_row(self._segment_index, offset, len(line), record))
+                offset += len(line)
+            with conn:
+                conn.executemany(_INDEX_INSERT, rows)
+                conn.execute(_INDEX_MARK, (self._segment_index, offset))
+        except Exception:
+            # The log is authoritative; missing rows are caught up on the next batch or query
+            self.stats['index_errors'] += 1
+
+    def _catch_up_index(self, conn: sqlite3.Connection, end_segment: int, end_offset: int) -> int:
+        """Index records between the index high-water mark and (end_segment, end_offset)"""
+        row = conn.execute('SELECT segment, offset FROM audit_index_mark WHERE id = 1').fetchone()
+        segment, offset = row if row else (0, 0)
+        if (segment, offset) == (end_segment, end_offset):
+            return 0
+        if (segment, offset) > (end_segment, end_offset):
+            # Log is behind the index (rewritten or truncated): drop the stale tail
+            with conn:
+                conn.execute('DELETE FROM audit_index WHERE segment > ? OR (segment = ? AND offset >= ?)',
+                             (end_segment, end_segment, end_offset))
+                conn.execute(_INDEX_MARK, (end_segment, end_offset))
+            return 0
+
+        seals = {s.get('index'): s for s in self._sealed_segments()}
+        added = 0
+        while (segment, offset) < (end_segment, end_offset):
+            if segment < end_segment:
+                seal = seals.get(segment)
+                if seal is None or offset >= seal.get('bytes', 0):
+                    segment, offset = segment + 1, 0
+                    continue
+                limit = seal['bytes']
+            else:
+                limit = end_offset
+            rows = []
+            with _open_segment(self._segment_path(segment, seals)) as f:
+                f.seek(offset)
+                while offset < limit:
+                    raw = f.readline()
+                    if not raw:
+                        break
+                    if raw.strip():
+                        try:
+                            rows.append(_index_row(segment, offset, len(raw), json.loads(raw)))
+                        except ValueError:
+                            pass
+                    offset += len(raw)
+            with conn:
+                conn.executemany(_INDEX_INSERT, rows)
+                conn.execute(_INDEX_MARK, (segment, limit))
+            added += len(rows)
+            segment, offset = (segment + 1, 0) if segment < end_segment else (segment, limit)
+        return added
+
+    def rebuild_index(self) -> int:
+        """Re-create the event index from all segments; returns the number of records indexed"""
+        self.flush()
+        conn = self._index_conn()
+        with self._lock:
+            with conn:
+                conn.execute('DELETE FROM audit_index')
+                conn.execute('DELETE FROM audit_index_mark')
+            return self._catch_up_index(conn, self._segment_index, self._offset)
+
+    def _index_filter(self, event: Optional[str], person_id: Optional[Any],
+                      since: Optional[Any], until: Optional[Any]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if event:
+            clauses.append('event = ?')
+            params.append(event)
+        if person_id is not None:
+            clauses.append('person_id = ?')
+            params.append(str(person_id))
+        if since is not None:
+            clauses.append('ts >= ?')
+            params.append(_timestamp_key(since))
+        if until is not None:
+            clauses.append('ts < ?')
+            params.append(_timestamp_key(until))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _indexed_conn(self) -> sqlite3.Connection:
+        if not self.index_enabled:
+            raise RuntimeError('Audit event index is disabled for this logger')
+        self.flush()
+        conn = self._index_conn()
+        with self._lock:
+            self._catch_up_index(conn, self._segment_index, self._offset)
+        return conn
+
+    def query(self, event: Optional[str] = None, person_id: Optional[Any] = None,
+              since: Optional[Any] = None, until: Optional[Any] = None,
+              limit: Optional[int] = None, newest_first: bool = False,
+              verify: bool = True) -> List[Dict[str, Any]]:
+        """
+        Look up events through the index and read only the matching lines.
+
+        since/until take datetimes (UTC) or ISO timestamps. Each result is
+        {'segment', 'offset', 'record', 'verified'}: verified means the line
+        still carries the indexed chain hash and that hash is the HMAC of the
+        record over its prev_hash. Linkage of whole segments is what
+        verify_chain() checks.
+        """
+        conn = self._indexed_conn()
+        where, params = self._index_filter(event, person_id, since, until)
+        sql = 'SELECT segment, offset, length, chain_hash FROM audit_index{} ORDER BY segment {order}, offset {order}'.format(
+            where, order='DESC' if newest_first else 'ASC')
+        if limit:
+            sql += ' LIMIT {}'.format(int(limit))
+        rows = conn.execute(sql, params).fetchall()
+
+        seals = {s.get('index'): s for s in self._sealed_segments()}
+        results = []
+        for segment, group in itertools.groupby(rows, key=lambda r: r[0]):
+            with _open_segment(self._segment_path(segment, seals)) as f:
+                for _, offset, length, chain_hash in group:
+                    f.seek(offset)
+                    try:
+                        obj = json.loads(f.read(length))
+                    except ValueError:
+                        obj = None
+                    entry = {'segment': segment, 'offset': offset, 'record': obj}
+                    if verify:
+                        entry['verified'] = obj is not None and self._verify_record(obj, chain_hash)
+                    results.append(entry)
+        return results
+
+    def event_counts(self, event: Optional[str] = None, person_id: Optional[Any] = None,
+                     since: Optional[Any] = None, until: Optional[Any] = None) -> Dict[str, int]:
+        """Matching events per hour bucket ('YYYY-MM-DDTHH'), answered from the index alone"""
+        conn = self._indexed_conn()
+        where, params = self._index_filter(event, person_id, since, until)
+        rows = conn.execute('SELECT hour, COUNT(*) FROM audit_index{} GROUP BY hour ORDER BY hour'.format(where),
+                            params).fetchall()
+        return dict(rows)
+
+    def _verify_record(self, obj: Dict[str, Any], chain_hash: str) -> bool:
+        record = {k: obj[k] for k in ('timestamp', 'event', 'details') if k in obj}
+        return obj.get('chain_hash') == chain_hash and hmac.compare_digest(
+            chain_hash, self._compute_chain_hash(record, obj.get('prev_hash', '')))
+
+    def _state_path(self) -> str:
+        return os.path.join(self.segment_dir, '.verified.json')
+
+    def verify_chain(self, incremental: bool = False, workers: Optional[int] = None) -> Tuple[bool, int]:
+        """
+        Verify sealed segments and the active log. Returns (is_valid, checked_records).
+
+        Sealed segments are replayed in a process pool, each from the
+        first_prev_hash in its seal; the seals are then stitched (every
+        segment must start where the previous one ended) and the active
+        segment is replayed from the last seal. With incremental=True,
+        segments whose seal and file are unchanged since the last
+        successful run are not re-read.
+        """
+        self.flush()
+        try:
+            seals = self._sealed_segments()
+            state = {}
+            if incremental:
+                try:
+                    with open(self._state_path(), 'r', encoding='utf-8') as f:
+                        state = json.load(f)
+                except Exception:
+                    state = {}
+
+            # Seal integrity and boundary stitching (cheap, always done)
             prev = ''
+            for i, seal in enumerate(seals):
+                if seal.get('index') != i or not hmac.compare_digest(seal.get('seal_hmac', ''), self._seal_hmac(seal)):
+                    return False, 0
+                if seal['first_prev_hash'] != prev:
+                    return False, 0
+                prev = seal['last_hash']
+
+            def fingerprint(seal):
+                path = os.path.join(self.segment_dir, seal['file'])
+                st = os.stat(path)
+                return '{}:{}:{}'.format(seal['seal_hmac'], st.st_size, int(st.st_mtime))
+
             count = 0
-            with open(self.log_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    obj = json.loads(line)
-                    record = {k: obj[k] for k in ('timestamp', 'event', 'details') if k in obj}
-                    expected = self._compute_chain_hash(record, prev)
-                    if expected != obj.get('chain_hash') or prev != obj.get('prev_hash'):
-                        return False, count
-                    prev = obj.get('chain_hash', '')
-                    count += 1
+            todo = []
+            for seal in seals:
+                path = os.path.join(self.segment_dir, seal['file'])
+                if not os.path.exists(path):
+                    return False, count
+                if incremental and state.get(str(seal['index'])) == fingerprint(seal):
+                    count += seal['records']
+                else:
+                    todo.append(seal)
+
+            if len(todo) > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    scans = list(pool.map(_scan_segment,
+                                          [os.path.join(self.segment_dir, s['file']) for s in todo],
+                                          [self._secret] * len(todo),
+                                          [s['first_prev_hash'] for s in todo]))
+            else:
+                scans = [_scan_segment(os.path.join(self.segment_dir, s['file']), self._secret, s['first_prev_hash'])
+                         for s in todo]
+
+            for seal, scan in zip(todo, scans):
+                if not scan['valid'] or scan['last_hash'] != seal['last_hash'] \
+                        or scan['records'] != seal['records'] \
+                        or not hmac.compare_digest(scan['content_hmac'], seal['content_hmac']):
+                    return False, count
+                count += scan['records']
+                state[str(seal['index'])] = fingerprint(seal)
+
+            # Active segment continues from the last seal
+            if os.path.exists(self.log_path):
+                with self._lock:
+                    scan = _scan_segment(self.log_path, self._secret, prev)
+                if not scan['valid']:
+                    return False, count + scan['records']
+                count += scan['records']
+
+            try:
+                tmp = self._state_path() + '.tmp'
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(tmp, self._state_path())
+            except Exception:
+                pass
             return True, count
         except Exception:
             return False, 0
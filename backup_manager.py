@@ -0,0 +1,391 @@
+"""
+Online, incremental backups of the project's SQLite databases.
+
+Features:
+- Copies with the SQLite backup API (sqlite3.Connection.backup) a few
+  hundred pages per step instead of copying the file, so the -wal contents
+  are included and the copy is a valid database
+- WAL databases (iris_system.db, voting_system.db) are copied inside one
+  read transaction: a consistent snapshot while writers keep committing.
+  Rollback-journal databases (performance.db, registration.db) release
+  their lock between steps so writers get in; a step that sees a change
+  restarts the copy, and a database that keeps changing is finished in one
+  step (writers wait for that one copy), so every backup is a snapshot
+- Backup sets: one timestamped directory per run with every database and a
+  manifest (pages, bytes, duration, pages/s, SHA-256); written under a
+  .part name and renamed when complete
+- Retention by count and/or age; optional scheduling on a daemon thread
+- Optional encryption (AES-256-GCM in 1 MiB segments, key from a password
+  with PBKDF2) when the cryptography package is installed
+- Online restore through the same backup API
+
+Usage:
+    manager = BackupManager('backups', keep=14, password=os.environ.get('IRIS_BACKUP_PASSWORD'))
+    report = manager.run()                  # one backup set, returns per-database stats
+    manager.start(interval=6 * 3600)        # scheduled runs
+    manager.restore(report['name'], 'voting_system.db')
+"""
+
+import hashlib
+import json
+import logging
+import os
+import secrets
+import shutil
+import sqlite3
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    CRYPTO_AVAILABLE = True
+except ImportError:
+    CRYPTO_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DATABASES = ('iris_system.db', 'voting_system.db', 'performance.db', 'registration.db')
+MANIFEST = 'manifest.json'
+
+ENC_MAGIC = b'IRISBAK1'
+ENC_SEGMENT = 1 << 20
+ENC_ITERATIONS = 200_000
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backup_database(src_path: str, dest_path: str, pages: int = 1024, pause: Optional[float] = None,
+                    max_restarts: int = 3, progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Copy a live database to dest_path with the backup API, `pages` pages per
+    step. pause is the sleep between steps (default: none for WAL sources,
+    5 ms otherwise so writers waiting on the lock get in). A non-WAL source
+    that restarts the copy more than max_restarts times is copied in one
+    step instead. The copy is written next to dest_path, checked with
+    quick_check and renamed into place. Returns {'pages', 'bytes',
+    'seconds', 'pages_per_sec', ...}.
+    """
+    if not os.path.exists(src_path):
+        raise FileNotFoundError(src_path)
+    tmp_path = dest_path + '.part'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    src = sqlite3.connect(src_path, timeout=30, isolation_level=None)
+    dst = sqlite3.connect(tmp_path)
+    state = {'steps': 0, 'restarts': 0, 'remaining': None, 'total': 0, 'single_step': False}
+    try:
+        snapshot = src.execute('PRAGMA journal_mode').fetchone()[0].lower() == 'wal'
+        if snapshot:
+            # A read transaction held across all steps pins one WAL snapshot; writers are not blocked
+            src.execute('BEGIN')
+            src.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+        if pause is None:
+            pause = 0.0 if snapshot else 0.005
+
+        def _step(status, remaining, total):
+            if status == sqlite3.SQLITE_OK and state['remaining'] is not None and remaining >= state['remaining']:
+                state['restarts'] += 1  # No progress: the source changed and the copy started over
+                if state['restarts'] > max_restarts:
+                    raise _TooManyRestarts()
+            state.update(steps=state['steps'] + 1, remaining=remaining, total=total)
+            if progress is not None:
+                progress(total - remaining, total)
+            if pause and remaining:
+                time.sleep(pause)
+
+        start = time.perf_counter()
+        try:
+            src.backup(dst, pages=pages, progress=_step)
+        except _TooManyRestarts:
+            logger.info("{} kept changing during the stepped backup; copying it in one step".format(src_path))
+            state['single_step'] = True
+            src.backup(dst, pages=-1)
+        seconds = time.perf_counter() - start
+        if snapshot:
+            src.execute('COMMIT')
+
+        # A single self-contained file: no -wal next to the backup
+        dst.execute('PRAGMA journal_mode=DELETE')
+        check = dst.execute('PRAGMA quick_check').fetchone()[0]
+        if check != 'ok':
+            raise RuntimeError('backup of {} failed quick_check: {}'.format(src_path, check))
+        page_size = dst.execute('PRAGMA page_size').fetchone()[0]
+        page_count = dst.execute('PRAGMA page_count').fetchone()[0]
+    except BaseException:
+        dst.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        src.close()
+    dst.close()
+    os.replace(tmp_path, dest_path)
+    return {'source': src_path, 'path': dest_path, 'snapshot': 'wal-read-transaction' if snapshot else 'restart-on-change',
+            'pages': page_count, 'page_size': page_size, 'bytes': os.path.getsize(dest_path),
+            'steps': state['steps'], 'restarts': state['restarts'], 'single_step': state['single_step'],
+            'seconds': seconds,
+            'pages_per_sec': page_count / seconds if seconds > 0 else 0.0}
+
+
+def restore_database(backup_path: str, target_path: str, pages: int = 1024) -> Dict:
+    """Copy a (decrypted) backup into target_path through the backup API, so open connections see a valid database"""
+    src = sqlite3.connect('file:{}?mode=ro'.format(os.path.abspath(backup_path)), uri=True)
+    dst = sqlite3.connect(target_path, timeout=30)
+    try:
+        start = time.perf_counter()
+        src.backup(dst, pages=pages)
+        seconds = time.perf_counter() - start
+        page_count = dst.execute('PRAGMA page_count').fetchone()[0]
+    finally:
+        src.close()
+        dst.close()
+    return {'path': target_path, 'pages': page_count, 'seconds': seconds}
+
+
+# --- Encryption ---
+
+def _derive_key(password: str, salt: bytes) -> bytes:
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, ENC_ITERATIONS, dklen=32)
+
+
+def _require_crypto() -> None:
+    if not CRYPTO_AVAILABLE:
+        raise RuntimeError('encrypted backups need the cryptography package (pip install cryptography)')
+
+
+def encrypt_file(src_path: str, dest_path: str, password: str) -> None:
+    """
+    AES-256-GCM in segments so large databases stream through: header
+    (magic, salt, nonce prefix), then per segment its length and ciphertext.
+    Each nonce carries the segment number and the last segment is marked in
+    its associated data, so reordering or truncation fails to decrypt.
+    """
+    _require_crypto()
+    salt, prefix = secrets.token_bytes(16), secrets.token_bytes(8)
+    aead = AESGCM(_derive_key(password, salt))
+    with open(src_path, 'rb') as src, open(dest_path, 'wb') as out:
+        out.write(ENC_MAGIC + salt + prefix)
+        counter, chunk = 0, src.read(ENC_SEGMENT)
+        while True:
+            following = src.read(ENC_SEGMENT)
+            aad = struct.pack('>IB', counter, 0 if following else 1)
+            sealed = aead.encrypt(prefix + struct.pack('>I', counter), chunk, aad)
+            out.write(struct.pack('>I', len(sealed)) + sealed)
+            if not following:
+                break
+            counter, chunk = counter + 1, following
+
+
+def decrypt_file(src_path: str, dest_path: str, password: str) -> None:
+    _require_crypto()
+    with open(src_path, 'rb') as src, open(dest_path, 'wb') as out:
+        header = src.read(len(ENC_MAGIC) + 24)
+        if not header.startswith(ENC_MAGIC):
+            raise ValueError('{} is not an encrypted backup'.format(src_path))
+        salt, prefix = header[len(ENC_MAGIC):-8], header[-8:]
+        aead = AESGCM(_derive_key(password, salt))
+        counter, final = 0, False
+        while not final:
+            length = src.read(4)
+            if len(length) < 4:
+                raise ValueError('{} is truncated'.format(src_path))
+            sealed = src.read(struct.unpack('>I', length)[0])
+            nonce = prefix + struct.pack('>I', counter)
+            try:
+                chunk = aead.decrypt(nonce, sealed, struct.pack('>IB', counter, 0))
+            except Exception:
+                try:
+                    chunk = aead.decrypt(nonce, sealed, struct.pack('>IB', counter, 1))
+                except Exception:
+                    raise ValueError('cannot decrypt {}: wrong password or damaged file'.format(src_path))
+                final = True
+            out.write(chunk)
+            counter += 1
+        if src.read(1):
+            raise ValueError('{} has data after the final segment'.format(src_path))
+
+
+# --- Backup sets ---
+
+class BackupManager:
+    """
+    Timestamped backup sets of the project databases under backup_dir, with
+    retention (keep the newest `keep` sets and/or drop sets older than
+    max_age_days) and an optional scheduler thread.
+    """
+
+    def __init__(self, backup_dir: str = 'backups', databases: Iterable[str] = PROJECT_DATABASES,
+                 keep: Optional[int] = 7, max_age_days: Optional[float] = None, password: Optional[str] = None,
+                 pages: int = 1024):
+        self.backup_dir = backup_dir
+        self.databases = list(databases)
+        self.keep = keep
+        self.max_age_days = max_age_days
+        self.password = password
+        self.pages = pages
+        if password:
+            _require_crypto()
+        self._lock = threading.Lock()  # One run at a time (scheduler vs manual)
+        self._thread = None
+        self._stop = threading.Event()
+        self.last_report = None
+
+    def run(self, progress: Optional[Callable[[str, int, int], None]] = None) -> Dict:
+        """Back up every configured database that exists into a new set, then apply retention"""
+        with self._lock:
+            os.makedirs(self.backup_dir, exist_ok=True)
+            name = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            part_dir = os.path.join(self.backup_dir, name + '.part')
+            os.makedirs(part_dir)
+            started = time.perf_counter()
+            entries, skipped = [], []
+            try:
+                for db_path in self.databases:
+                    if not os.path.exists(db_path):
+                        skipped.append(db_path)
+                        continue
+                    entries.append(self._backup_one(db_path, part_dir, progress))
+            except BaseException:
+                shutil.rmtree(part_dir, ignore_errors=True)
+                raise
+            seconds = time.perf_counter() - started
+            report = {
+                'name': name,
+                'created_at': datetime.now().isoformat(),
+                'encrypted': bool(self.password),
+                'databases': entries,
+                'skipped': skipped,
+                'pages': sum(e['pages'] for e in entries),
+                'bytes': sum(e['stored_bytes'] for e in entries),
+                'seconds': seconds,
+            }
+            report['pages_per_sec'] = report['pages'] / seconds if seconds > 0 else 0.0
+            with open(os.path.join(part_dir, MANIFEST), 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            os.replace(part_dir, os.path.join(self.backup_dir, name))
+            report['removed'] = self.prune()
+            self.last_report = report
+            logger.info("Backup {} of {} database(s): {:,} pages in {:.2f}s ({:,.0f} pages/s)".format(
+                name, len(entries), report['pages'], seconds, report['pages_per_sec']))
+            return report
+
+    def _backup_one(self, db_path: str, set_dir: str, progress) -> Dict:
+        filename = os.path.basename(db_path)
+        plain = os.path.join(set_dir, filename)
+        step = None if progress is None else (lambda done, total: progress(filename, done, total))
+        stats = backup_database(db_path, plain, pages=self.pages, progress=step)
+        stats['sha256'] = _sha256_file(plain)  # Of the database itself, checked again on restore
+        stored = plain
+        if self.password:
+            stored = plain + '.enc'
+            encrypt_file(plain, stored, self.password)
+            os.remove(plain)
+        stats.update(file=os.path.basename(stored), stored_bytes=os.path.getsize(stored))
+        del stats['path']
+        return stats
+
+    def list_backups(self) -> List[Dict]:
+        """Complete backup sets, newest first (their manifests)"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        sets = []
+        for name in os.listdir(self.backup_dir):
+            manifest = os.path.join(self.backup_dir, name, MANIFEST)
+            if name.endswith('.part') or not os.path.exists(manifest):
+                continue
+            with open(manifest, 'r', encoding='utf-8') as f:
+                sets.append(json.load(f))
+        return sorted(sets, key=lambda m: m['name'], reverse=True)
+
+    def prune(self) -> List[str]:
+        """Apply retention and clear sets left half-written by an interrupted run; returns removed names"""
+        removed = []
+        if os.path.isdir(self.backup_dir):
+            for name in os.listdir(self.backup_dir):
+                path = os.path.join(self.backup_dir, name)
+                # An hour old: not a run still in progress in another process
+                if name.endswith('.part') and time.time() - os.path.getmtime(path) > 3600:
+                    shutil.rmtree(path, ignore_errors=True)
+        sets = self.list_backups()
+        cutoff = None
+        if self.max_age_days is not None:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+        for index, manifest in enumerate(sets):
+            too_many = self.keep is not None and index >= self.keep
+            too_old = cutoff is not None and index > 0 and manifest['created_at'] < cutoff  # Never drop the newest
+            if too_many or too_old:
+                shutil.rmtree(os.path.join(self.backup_dir, manifest['name']), ignore_errors=True)
+                removed.append(manifest['name'])
+        return removed
+
+    def restore(self, name: str, database: str, target_path: Optional[str] = None,
+                password: Optional[str] = None) -> Dict:
+        """
+        Restore one database from a set into target_path (default: the path
+        it was backed up from), after checking it against the manifest.
+        """
+        manifest_path = os.path.join(self.backup_dir, name, MANIFEST)
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        entry = next((e for e in manifest['databases']
+                      if os.path.basename(e['source']) == os.path.basename(database)), None)
+        if entry is None:
+            raise ValueError('{} is not in backup set {}'.format(database, name))
+        stored = os.path.join(self.backup_dir, name, entry['file'])
+        plain = stored
+        if manifest['encrypted']:
+            password = password or self.password
+            if not password:
+                raise ValueError('backup set {} is encrypted; a password is required'.format(name))
+            plain = stored[:-len('.enc')] + '.restore'
+            decrypt_file(stored, plain, password)
+        try:
+            if _sha256_file(plain) != entry['sha256']:
+                raise ValueError('{} does not match its manifest digest'.format(entry['file']))
+            return restore_database(plain, target_path or entry['source'], pages=self.pages)
+        finally:
+            if plain != stored and os.path.exists(plain):
+                os.remove(plain)
+
+    # --- Scheduling ---
+
+    def start(self, interval: float, run_now: bool = True) -> None:
+        """Run a backup every `interval` seconds on a daemon thread until stop()"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._schedule, args=(interval, run_now),
+                                        name='BackupScheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the scheduler; a backup in progress is finished first"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _schedule(self, interval: float, run_now: bool) -> None:
+        if not run_now and self._stop.wait(interval):
+            return
+        while True:
+            try:
+                self.run()
+            except Exception as e:
+                logger.error("Scheduled backup failed: {}".format(e))
+            if self._stop.wait(interval):
+                return
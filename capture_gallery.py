@@ -0,0 +1,329 @@
+"""
+Live capture gallery: fixed-capacity capture ring and tile-cached mosaic.
+
+Features:
+- CaptureRecord: __slots__ capture entry holding JPEG bytes, decoded lazily for display
+- CaptureRing: fixed-capacity ring buffer for in-session captures (O(1) append/evict)
+- GalleryMosaic: preallocated mosaic canvas with one pre-rendered tile per ring slot
+- Only the new (and the evicted) tile is blitted per capture
+- Header statistics kept as running sums, so refreshing the window is O(1)
+
+Usage:
+    from capture_gallery import CaptureRecord, CaptureRing, GalleryMosaic
+    ring = CaptureRing(50)
+    mosaic = GalleryMosaic(capacity=50)
+    record = CaptureRecord(composite, iris_image, eye_roi, person_id=1, confidence=0.93)
+    slot, evicted = ring.append(record)
+    mosaic.put(slot, record, evicted, composite=composite)
+    cv2.imshow('Enhanced Iris Gallery', mosaic.frame(len(ring)))
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def encode_jpeg(image: np.ndarray, quality: int = 90) -> bytes:
+    """Encode a BGR/grayscale image to JPEG bytes."""
+    ok, buffer = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), int(quality)])
+    if not ok:
+        raise ValueError('JPEG encoding failed')
+    return buffer.tobytes()
+
+
+def decode_jpeg(data: bytes) -> Optional[np.ndarray]:
+    """Decode JPEG bytes back to a BGR image."""
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+class CaptureRecord:
+    """
+    Compact record of one in-session capture.
+
+    The composite, iris image and eye ROI are stored JPEG-encoded and only
+    decoded when something displays them. Dict-style access (record['name'],
+    record.get('analysis', {})) is kept for the existing gallery code.
+    """
+
+    __slots__ = ('person_id', 'name', 'confidence', 'timestamp', 'filename',
+                 'analysis', 'capture_time', 'session_number', '_jpeg', '_shapes')
+
+    IMAGE_FIELDS = ('composite', 'iris_image', 'eye_roi')
+
+    def __init__(self, composite: np.ndarray, iris_image: np.ndarray, eye_roi: np.ndarray,
+                 person_id: int = 0, name: str = 'Unknown', confidence: float = 0.0,
+                 timestamp: str = '', filename: str = '', analysis: Optional[dict] = None,
+                 capture_time: Optional[datetime] = None, session_number: int = 0,
+                 jpeg_quality: int = 90, composite_jpeg: Optional[bytes] = None):
+        self.person_id = person_id
+        self.name = name
+        self.confidence = confidence
+        self.timestamp = timestamp
+        self.filename = filename
+        self.analysis = analysis or {}
+        self.capture_time = capture_time or datetime.now()
+        self.session_number = session_number
+        if composite_jpeg is None:
+            composite_jpeg = encode_jpeg(composite, jpeg_quality)
+        self._jpeg = (composite_jpeg,
+                      encode_jpeg(iris_image, jpeg_quality),
+                      encode_jpeg(eye_roi, jpeg_quality))
+        self._shapes = (composite.shape, iris_image.shape, eye_roi.shape)
+
+    def decode(self, field: str) -> Optional[np.ndarray]:
+        """Decode one of IMAGE_FIELDS to a fresh uint8 array."""
+        return decode_jpeg(self._jpeg[self.IMAGE_FIELDS.index(field)])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes actually held for the images (encoded)."""
+        return sum(len(data) for data in self._jpeg)
+
+    @property
+    def raw_nbytes(self) -> int:
+        """Bytes the same images would take as raw uint8 arrays."""
+        return sum(int(np.prod(shape)) for shape in self._shapes)
+
+    def __getitem__(self, key: str):
+        if key in self.IMAGE_FIELDS:
+            return self.decode(key)
+        if key in self.__slots__ and not key.startswith('_'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.IMAGE_FIELDS or (key in self.__slots__ and not key.startswith('_'))
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+class CaptureRing:
+    """Fixed-capacity ring buffer; the oldest entry is overwritten when full."""
+
+    def __init__(self, capacity: int = 50):
+        if capacity <= 0:
+            raise ValueError('capacity must be positive')
+        self.capacity = capacity
+        self._slots: List[Any] = [None] * capacity
+        self._next = 0  # Slot that receives the next append
+        self._count = 0
+        self.total_appended = 0  # Monotonic count across the whole session
+        # Running totals of the items' nbytes/raw_nbytes (0 for items without them)
+        self.nbytes = 0
+        self.raw_nbytes = 0
+
+    def append(self, item: Any) -> Tuple[int, Optional[Any]]:
+        """Store item and return (slot_index, evicted_item_or_None)."""
+        slot = self._next
+        evicted = self._slots[slot] if self._count == self.capacity else None
+        self._slots[slot] = item
+        self._next = (slot + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        self.total_appended += 1
+        self.nbytes += getattr(item, 'nbytes', 0)
+        self.raw_nbytes += getattr(item, 'raw_nbytes', getattr(item, 'nbytes', 0))
+        if evicted is not None:
+            self.nbytes -= getattr(evicted, 'nbytes', 0)
+            self.raw_nbytes -= getattr(evicted, 'raw_nbytes', getattr(evicted, 'nbytes', 0))
+        return slot, evicted
+
+    def clear(self) -> None:
+        self._slots = [None] * self.capacity
+        self._next = 0
+        self._count = 0
+        self.nbytes = 0
+        self.raw_nbytes = 0
+
+    @property
+    def latest(self) -> Optional[Any]:
+        if not self._count:
+            return None
+        return self._slots[(self._next - 1) % self.capacity]
+
+    def _start(self) -> int:
+        return (self._next - self._count) % self.capacity
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate oldest to newest."""
+        start = self._start()
+        for i in range(self._count):
+            yield self._slots[(start + i) % self.capacity]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError('capture index out of range')
+        return self._slots[(self._start() + index) % self.capacity]
+
+
+class GalleryMosaic:
+    """
+    Preallocated gallery canvas with one tile per ring slot.
+
+    Tile positions are bound to ring slots, so a new capture overwrites the
+    tile of the capture it evicted and nothing else is redrawn.
+    """
+
+    def __init__(self, capacity: int = 50, cols: int = 4, tile_size: int = 150,
+                 padding: int = 15, header_height: int = 80, analysis_height: int = 80):
+        self.capacity = capacity
+        self.cols = cols
+        self.tile_size = tile_size
+        self.padding = padding
+        self.header_height = header_height
+        self.analysis_height = analysis_height
+        self.cell_height = tile_size // 2 + analysis_height
+        self.rows = (capacity + cols - 1) // cols
+
+        self.width = cols * tile_size + (cols + 1) * padding
+        self.height = header_height + self.rows * (self.cell_height + padding) + padding
+        self.canvas = np.full((self.height, self.width, 3), 25, dtype=np.uint8)
+
+        self._lock = threading.Lock()
+        self._sum_confidence = 0.0
+        self._sum_quality = 0.0
+        self._count = 0
+
+    def _slot_origin(self, slot: int) -> Tuple[int, int]:
+        row, col = divmod(slot, self.cols)
+        x_pos = col * self.tile_size + (col + 1) * self.padding
+        y_pos = self.header_height + row * (self.cell_height + self.padding) + self.padding
+        return x_pos, y_pos
+
+    def render_tile(self, capture_data, composite: Optional[np.ndarray] = None) -> np.ndarray:
+        """Render the image and analysis block for a single capture."""
+        img_size = self.tile_size
+        tile = np.full((self.cell_height, img_size, 3), 25, dtype=np.uint8)
+
+        if composite is None:
+            composite = capture_data['composite']
+        img_resized = cv2.resize(composite, (img_size, img_size // 2))
+        tile[:img_size // 2, :] = img_resized
+        cv2.rectangle(tile, (0, 0), (img_size - 1, img_size // 2 - 1), (100, 100, 100), 1)
+
+        analysis = capture_data.get('analysis', {})
+
+        # Line 1: Person ID and Name
+        info_y = img_size // 2 + 15
+        name = capture_data.get('name', 'Unknown')
+        if len(name) > 15:
+            name = name[:13] + "..."
+        person_text = f"#{capture_data.get('session_number', 0)} {name} (ID:{capture_data['person_id']})"
+        cv2.putText(tile, person_text, (0, info_y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.35, (255, 255, 255), 1)
+
+        # Line 2: Confidence and Quality
+        info_y += 15
+        conf_quality_text = f"Conf: {capture_data['confidence']:.1f}% | Qual: {analysis.get('quality_score', 0):.1f}%"
+        cv2.putText(tile, conf_quality_text, (0, info_y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.35, (150, 255, 150), 1)
+
+        # Line 3: Dimensions and Clarity
+        info_y += 15
+        dims_text = f"Size: {analysis.get('iris_dimensions', 'N/A')} | Clarity: {analysis.get('clarity_score', 0):.1f}%"
+        cv2.putText(tile, dims_text, (0, info_y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.35, (200, 200, 255), 1)
+
+        # Line 4: Timestamp
+        info_y += 15
+        time_text = capture_data['timestamp'][-8:]  # Last 8 chars (HHMMSS_mmm)
+        cv2.putText(tile, f"Time: {time_text}", (0, info_y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.35, (255, 200, 150), 1)
+
+        # Quality indicator bar
+        quality_score = analysis.get('quality_score', 0)
+        bar_width = int((img_size - 20) * min(100, max(0, quality_score)) / 100)
+        bar_y = self.cell_height - 10
+        cv2.rectangle(tile, (10, bar_y), (img_size - 10, bar_y + 5), (50, 50, 50), -1)
+        if quality_score >= 80:
+            bar_color = (0, 255, 0)  # Green
+        elif quality_score >= 60:
+            bar_color = (0, 255, 255)  # Yellow
+        else:
+            bar_color = (0, 100, 255)  # Orange
+        cv2.rectangle(tile, (10, bar_y), (10 + bar_width, bar_y + 5), bar_color, -1)
+
+        return tile
+
+    def put(self, slot: int, capture_data, evicted=None,
+            composite: Optional[np.ndarray] = None) -> None:
+        """
+        Blit the tile for a new capture into its slot, retiring the evicted one.
+
+        Pass the still-decoded composite when available to skip a JPEG decode.
+        """
+        tile = self.render_tile(capture_data, composite)
+        x_pos, y_pos = self._slot_origin(slot)
+        with self._lock:
+            self.canvas[y_pos:y_pos + self.cell_height, x_pos:x_pos + self.tile_size] = tile
+            if evicted is not None:
+                self._sum_confidence -= evicted['confidence']
+                self._sum_quality -= evicted.get('analysis', {}).get('quality_score', 0)
+            else:
+                self._count += 1
+            self._sum_confidence += capture_data['confidence']
+            self._sum_quality += capture_data.get('analysis', {}).get('quality_score', 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.canvas.fill(25)
+            self._sum_confidence = 0.0
+            self._sum_quality = 0.0
+            self._count = 0
+
+    def _draw_header(self, total_captured: int) -> None:
+        header = self.canvas[:self.header_height]
+        header.fill(25)
+        padding = self.padding
+
+        header_text = f"Enhanced Iris Gallery - {self._count} Images"
+        if total_captured > self._count:
+            header_text += f" (latest of {total_captured})"
+        cv2.putText(header, header_text, (padding, 25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+        if self._count > 0:
+            avg_confidence = self._sum_confidence / self._count
+            avg_quality = self._sum_quality / self._count
+            stats_text = f"Avg Confidence: {avg_confidence:.1f}% | Avg Quality: {avg_quality:.1f}%"
+            cv2.putText(header, stats_text, (padding, 45),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+
+        timestamp_text = f"Live Updates: {datetime.now().strftime('%H:%M:%S')}"
+        cv2.putText(header, timestamp_text, (self.width - 200, 45),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 255, 150), 1)
+
+        instructions = "Controls: 'g' toggle | 'f' refresh | 'c' full view | 'i' iris window"
+        cv2.putText(header, instructions, (padding, 68),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (180, 180, 180), 1)
+        cv2.putText(header, "LIVE", (self.width - 60, 25),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+
+    def frame(self, total_captured: int = 0) -> np.ndarray:
+        """
+        Refresh the header and return a view of the rows in use.
+
+        Only the header strip is redrawn; the returned array is a slice of the
+        preallocated canvas, so no per-capture work happens here.
+        """
+        with self._lock:
+            self._draw_header(max(total_captured, self._count))
+            rows_used = max(1, (self._count + self.cols - 1) // self.cols)
+            used_height = self.header_height + rows_used * (self.cell_height + self.padding) + self.padding
+            return self.canvas[:used_height]
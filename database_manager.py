@@ -7,27 +7,114 @@ import sqlite3
 import numpy as np
 import json
 import hashlib
+import csv
 import hmac
 import os
 import re
 import time
 import struct
+import queue
+import atexit
+import threading
+import weakref
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Tuple
+from typing import Optional, List, Dict, Tuple, Iterable, Iterator, Callable
 import logging
 from contextlib import contextmanager
-import pickle
 import base64
+from audit_merkle import (audit_record_hash, leaf_hash, merkle_root, merkle_path, root_from_path,
+                          load_checkpoint_secret, sign_checkpoint, verify_block)
+from template_codec import encode_template, decode_template, is_encoded_template, template_info
 
 logger = logging.getLogger(__name__)
 
+_EMAIL_RE = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$')
+_PHONE_RE = re.compile(r'^[0-9()+\-\s]{7,20}$')
+
+
+def _is_busy_error(error: Exception) -> bool:
+    """True for the locked/busy OperationalErrors worth retrying; anything else will not go away"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Long-lived per-thread connection handed out by IrisDatabase.
+
+    While a transaction scope is open, commit() from the methods running
+    inside it is deferred so the whole scope commits (or rolls back) once.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tx_depth = 0  # Nesting level of IrisDatabase.transaction()
+        self.use_depth = 0  # Nesting level of IrisDatabase.get_connection()
+
+    def commit(self):
+        if self.tx_depth:
+            return
+        super().commit()
+
+
+class AccessRecord(dict):
+    """
+    Access log row whose additional_data JSON is decoded on first access
+    instead of for every row fetched. Every read path (item lookup, get,
+    iteration and so dict(), items, values, copy) sees the decoded value;
+    malformed JSON is left as the raw string.
+    """
+
+    def _decode(self):
+        value = dict.get(self, 'additional_data')
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return value
+            dict.__setitem__(self, 'additional_data', value)
+        return value
+
+    def __getitem__(self, key):
+        if key == 'additional_data' and key in self:
+            return self._decode()
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        self._decode()
+        return dict.__iter__(self)
+
+    def items(self):
+        self._decode()
+        return dict.items(self)
+
+    def values(self):
+        self._decode()
+        return dict.values(self)
+
+    def copy(self):
+        self._decode()
+        return AccessRecord(dict.items(self))
+
+
 class IrisDatabase:
     """
     Comprehensive database manager for iris recognition system
     """
     
+    STATEMENT_CACHE_SIZE = 256
+    # None (lossless), 'float16' or 'uint8'; applies to float templates only
+    TEMPLATE_QUANTIZATION = None
+    
     def __init__(self, db_path='iris_system.db'):
         self.db_path = db_path
+        # Connection pool: one persistent connection per thread
+        self._local = threading.local()
+        self._pool = weakref.WeakSet()
+        self._pool_lock = threading.Lock()
+        self._pid = os.getpid()
         self.init_database()
         logger.info("Database initialized: {}".format(db_path))
     
@@ -189,6 +276,33 @@ class IrisDatabase:
                 )
             ''')
             
+            # Iris template index: content hash and layout per enrolled template
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS template_index (
+                    person_id INTEGER PRIMARY KEY,
+                    template_hash TEXT NOT NULL,
+                    dtype TEXT,
+                    shape TEXT,
+                    extractor_version INTEGER,
+                    FOREIGN KEY (person_id) REFERENCES persons (id)
+                )
+            ''')
+            
+            # Signed Merkle checkpoints over fixed-size blocks of audit_logs
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS audit_checkpoints (
+                    block_index INTEGER PRIMARY KEY,
+                    first_id INTEGER NOT NULL,
+                    last_id INTEGER NOT NULL,
+                    leaf_count INTEGER NOT NULL,
+                    block_root TEXT NOT NULL,
+                    chain_tip TEXT,
+                    tree_root TEXT NOT NULL,
+                    signature TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
             # Model versions table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS model_versions (
@@ -202,35 +316,224 @@ class IrisDatabase:
                 )
             ''')
             
+            # Rollups for dashboard statistics, maintained by triggers
+            rollups_existed = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stats_daily'").fetchone() is not None
+            self._create_rollup_schema(cursor)
+            
             # Create indexes for better performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_access_logs_person_id ON access_logs(person_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_access_logs_time ON access_logs(access_time)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_persons_email ON persons(email)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_persons_voter_id ON persons(voter_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_voting_person_id ON voting_records(person_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_username ON users(username)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_logs_time ON audit_logs(event_time)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_template_index_hash ON template_index(template_hash)')
             
             conn.commit()
+        
+        if not rollups_existed:
+            # First start with rollups: derive them from the existing logs once
+            self.rebuild_rollups()
     
-    @contextmanager
-    def get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable column access by name
-        try:
-            # Enforce useful SQLite pragmas
+    # Rollup buckets: per day ('YYYY-MM-DD') and per hour ('YYYY-MM-DD HH'), UTC
+    # like CURRENT_TIMESTAMP. They summarize history as it was logged; deleting
+    # old logs does not change them (rebuild_rollups() re-derives them).
+    _ROLLUP_BUCKETS = (('stats_daily', 'day', '%Y-%m-%d'), ('stats_hourly', 'hour', '%Y-%m-%d %H'))
+
+    def _create_rollup_schema(self, cursor):
+        for table, key, fmt in self._ROLLUP_BUCKETS:
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS {table} (
+                    {key} TEXT PRIMARY KEY,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    grants INTEGER NOT NULL DEFAULT 0,
+                    granted_confidence_sum REAL NOT NULL DEFAULT 0,
+                    granted_confidence_count INTEGER NOT NULL DEFAULT 0,
+                    votes INTEGER NOT NULL DEFAULT 0,
+                    unique_persons INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            '''.format(table=table, key=key))
+        
+        # Distinct (bucket, person) pairs; a new pair bumps unique_persons
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS stats_persons (
+                bucket TEXT NOT NULL,
+                person_id INTEGER NOT NULL,
+                PRIMARY KEY (bucket, person_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        access_upserts, vote_upserts, person_inserts = [], [], []
+        for table, key, fmt in self._ROLLUP_BUCKETS:
+            bucket = "strftime('{}', COALESCE(NEW.{{col}}, CURRENT_TIMESTAMP))".format(fmt)
+            access_upserts.append('''
+                INSERT INTO {table} ({key}, attempts, grants, granted_confidence_sum, granted_confidence_count)
+                VALUES ({bucket}, 1,
+                        CASE WHEN NEW.access_granted THEN 1 ELSE 0 END,
+                        CASE WHEN NEW.access_granted THEN COALESCE(NEW.confidence_score, 0) ELSE 0 END,
+                        CASE WHEN NEW.access_granted AND NEW.confidence_score IS NOT NULL THEN 1 ELSE 0 END)
+                ON CONFLICT({key}) DO UPDATE SET
+                    attempts = attempts + 1,
+                    grants = grants + excluded.grants,
+                    granted_confidence_sum = granted_confidence_sum + excluded.granted_confidence_sum,
+                    granted_confidence_count = granted_confidence_count + excluded.granted_confidence_count;
+            '''.format(table=table, key=key, bucket=bucket.format(col='access_time')))
+            vote_upserts.append('''
+                INSERT INTO {table} ({key}, votes) VALUES ({bucket}, 1)
+                ON CONFLICT({key}) DO UPDATE SET votes = votes + 1;
+            '''.format(table=table, key=key, bucket=bucket.format(col='vote_time')))
+            person_inserts.append('''
+                INSERT OR IGNORE INTO stats_persons (bucket, person_id)
+                SELECT {bucket}, NEW.person_id WHERE NEW.person_id IS NOT NULL;
+            '''.format(bucket=bucket.format(col='access_time')))
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_access_logs_rollup AFTER INSERT ON access_logs
+            BEGIN {} {} END
+        '''.format(''.join(access_upserts), ''.join(person_inserts)))
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_voting_records_rollup AFTER INSERT ON voting_records
+            BEGIN {} END
+        '''.format(''.join(vote_upserts)))
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_stats_persons_rollup AFTER INSERT ON stats_persons
+            BEGIN
+                UPDATE stats_daily SET unique_persons = unique_persons + 1
+                WHERE length(NEW.bucket) = 10 AND day = NEW.bucket;
+                UPDATE stats_hourly SET unique_persons = unique_persons + 1
+                WHERE length(NEW.bucket) = 13 AND hour = NEW.bucket;
+            END
+        ''')
+
+    def rebuild_rollups(self) -> Dict:
+        """
+        Recompute all rollup tables from access_logs and voting_records in one
+        transaction (backfill after upgrading, or after bulk deletes).
+        """
+        start = time.perf_counter()
+        with self.transaction(immediate=True) as conn:
+            conn.execute('DELETE FROM stats_persons')
+            for table, key, fmt in self._ROLLUP_BUCKETS:
+                conn.execute('DELETE FROM {}'.format(table))
+                conn.execute('''
+                    INSERT INTO {table} ({key}, attempts, grants, granted_confidence_sum, granted_confidence_count)
+                    SELECT strftime('{fmt}', access_time), COUNT(*),
+                           SUM(CASE WHEN access_granted THEN 1 ELSE 0 END),
+                           SUM(CASE WHEN access_granted THEN COALESCE(confidence_score, 0) ELSE 0 END),
+                           SUM(CASE WHEN access_granted AND confidence_score IS NOT NULL THEN 1 ELSE 0 END)
+                    FROM access_logs WHERE access_time IS NOT NULL
+                    GROUP BY 1
+                '''.format(table=table, key=key, fmt=fmt))
+                conn.execute('''
+                    INSERT INTO {table} ({key}, votes)
+                    SELECT strftime('{fmt}', vote_time), COUNT(*) FROM voting_records
+                    WHERE vote_time IS NOT NULL GROUP BY 1
+                    ON CONFLICT({key}) DO UPDATE SET votes = excluded.votes
+                '''.format(table=table, key=key, fmt=fmt))
+                # Distinct pairs; the stats_persons trigger counts them into unique_persons
+                conn.execute('''
+                    INSERT OR IGNORE INTO stats_persons (bucket, person_id)
+                    SELECT DISTINCT strftime('{fmt}', access_time), person_id FROM access_logs
+                    WHERE access_time IS NOT NULL AND person_id IS NOT NULL
+                '''.format(fmt=fmt))
+            stats = {
+                'days': conn.execute('SELECT COUNT(*) FROM stats_daily').fetchone()[0],
+                'hours': conn.execute('SELECT COUNT(*) FROM stats_hourly').fetchone()[0],
+            }
+        stats['elapsed_sec'] = time.perf_counter() - start
+        logger.info("Rollups rebuilt: {} days, {} hours in {:.2f}s".format(
+            stats['days'], stats['hours'], stats['elapsed_sec']))
+        return stats
+    
+    def _thread_connection(self) -> PooledConnection:
+        """Return this thread's pooled connection, opening it on first use"""
+        if os.getpid() != self._pid:
+            # Forked child: never share the parent's sqlite handles
+            self._local = threading.local()
+            self._pool = weakref.WeakSet()
+            self._pid = os.getpid()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, factory=PooledConnection,
+                                   cached_statements=self.STATEMENT_CACHE_SIZE,
+                                   check_same_thread=False)
+            conn.row_factory = sqlite3.Row  # Enable column access by name
+            # Enforce useful SQLite pragmas (once per connection)
             cur = conn.cursor()
             cur.execute('PRAGMA foreign_keys=ON')
             cur.execute('PRAGMA journal_mode=WAL')
             cur.execute('PRAGMA synchronous=NORMAL')
             cur.close()
+            self._local.conn = conn
+            with self._pool_lock:
+                self._pool.add(conn)
+        return conn
+
+    @contextmanager
+    def get_connection(self):
+        """
+        Context manager for database connections.
+
+        Yields the calling thread's pooled connection. Work left uncommitted
+        when the outermost block exits is rolled back, as closing a fresh
+        connection used to do, unless a transaction() scope owns it.
+        """
+        conn = self._thread_connection()
+        conn.use_depth += 1
+        try:
             yield conn
         except Exception as e:
-            conn.rollback()
+            if not conn.tx_depth:
+                conn.rollback()
             logger.error("Database error: {}".format(str(e)))
             raise
         finally:
-            conn.close()
+            conn.use_depth -= 1
+            if not conn.use_depth and not conn.tx_depth and conn.in_transaction:
+                conn.rollback()
+
+    @contextmanager
+    def transaction(self, immediate: bool = False):
+        """
+        Transaction scope shared by every database call made inside it on
+        this thread. Commits once on success, rolls everything back on error.
+        Nested scopes join the outermost one.
+
+            with db.transaction():
+                if not db.has_voted(pid, eid):
+                    db.record_vote(pid, eid, score)
+        """
+        with self.get_connection() as conn:
+            outermost = conn.tx_depth == 0
+            if outermost:
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.execute('BEGIN IMMEDIATE' if immediate else 'BEGIN')
+            conn.tx_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                conn.tx_depth -= 1
+                if outermost:
+                    conn.rollback()
+                raise
+            conn.tx_depth -= 1
+            if outermost:
+                conn.commit()
+
+    def close_connections(self):
+        """Close every pooled connection (shutdown or before replacing the DB file)"""
+        with self._pool_lock:
+            conns = list(self._pool)
+            self._pool = weakref.WeakSet()
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
     
     # --- Security utilities: password hashing (PBKDF2) and TOTP ---
     @staticmethod
@@ -311,15 +614,13 @@ class IrisDatabase:
     def _is_valid_email(email: Optional[str]) -> bool:
         if email is None:
             return True
-        pattern = r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$'
-        return re.match(pattern, email) is not None
+        return _EMAIL_RE.match(email) is not None
 
     @staticmethod
     def _is_valid_phone(phone: Optional[str]) -> bool:
         if phone is None:
             return True
-        pattern = r'^[0-9()+\-\s]{7,20}$'
-        return re.match(pattern, phone) is not None
+        return _PHONE_RE.match(phone) is not None
 
     def enroll_person(self, 
                      name: str, 
@@ -341,8 +642,8 @@ class IrisDatabase:
             cursor = conn.cursor()
             
             # Serialize templates
-            iris_blob = pickle.dumps(iris_template) if iris_template is not None else None
-            face_blob = pickle.dumps(face_template) if face_template is not None else None
+            iris_blob = self._encode_template(iris_template)
+            face_blob = self._encode_template(face_template)
             metadata_json = json.dumps(metadata) if metadata else None
             
             cursor.execute('''
@@ -352,11 +653,104 @@ class IrisDatabase:
             ''', (name, email, phone, department, role, iris_blob, face_blob, metadata_json, address, voter_id))
             
             person_id = cursor.lastrowid
+            if iris_blob is not None:
+                self._index_template(cursor, person_id, iris_blob)
             conn.commit()
             
             logger.info("Person enrolled: {} (ID: {})".format(name, person_id))
             return person_id
 
+    def _encode_template(self, template) -> Optional[bytes]:
+        """Serialize a template with the versioned binary codec"""
+        if template is None:
+            return None
+        if isinstance(template, (bytes, bytearray, memoryview)) and is_encoded_template(template):
+            return bytes(template)
+        return encode_template(np.asarray(template), quantize=self.TEMPLATE_QUANTIZATION)
+
+    @staticmethod
+    def _template_index_row(person_id: int, blob: bytes) -> tuple:
+        info = template_info(blob)
+        return (person_id, hashlib.sha256(blob).hexdigest(), info['dtype'].str,
+                'x'.join(str(d) for d in info['shape']), info['extractor_version'])
+
+    def _index_template(self, cursor, person_id: int, blob: bytes):
+        """Record (or refresh) the index entry for a person's iris template"""
+        cursor.execute('''
+            INSERT INTO template_index (person_id, template_hash, dtype, shape, extractor_version)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(person_id) DO UPDATE SET
+                template_hash = excluded.template_hash,
+                dtype = excluded.dtype,
+                shape = excluded.shape,
+                extractor_version = excluded.extractor_version
+        ''', self._template_index_row(person_id, blob))
+
+    def migrate_templates(self, batch_size: int = 200, quantize: Optional[str] = None,
+                          vacuum: bool = True) -> Dict:
+        """
+        Rewrite legacy pickle template BLOBs in the binary template format.
+
+        Rows are walked by id in batches, each batch rewritten in a single
+        transaction, so the migration can be interrupted and re-run.
+        """
+        stats = {'rows': 0, 'templates': 0, 'failed': 0, 'bytes_before': 0, 'bytes_after': 0}
+        quantize = quantize if quantize is not None else self.TEMPLATE_QUANTIZATION
+        last_id = 0
+        while True:
+            with self.get_connection() as conn:
+                rows = conn.execute('''
+                    SELECT id, iris_template, face_template FROM persons
+                    WHERE id > ? AND (iris_template IS NOT NULL OR face_template IS NOT NULL)
+                    ORDER BY id LIMIT ?
+                ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+
+            updates, index_rows = [], []
+            for row in rows:
+                new_values = []
+                changed = False
+                for column in ('iris_template', 'face_template'):
+                    blob = row[column]
+                    if blob is None or is_encoded_template(blob):
+                        new_values.append(blob)
+                        continue
+                    try:
+                        encoded = encode_template(decode_template(blob), quantize=quantize)
+                    except Exception as e:
+                        logger.warning("Template migration skipped person {} ({}): {}".format(row['id'], column, e))
+                        stats['failed'] += 1
+                        new_values.append(blob)
+                        continue
+                    stats['templates'] += 1
+                    stats['bytes_before'] += len(blob)
+                    stats['bytes_after'] += len(encoded)
+                    new_values.append(encoded)
+                    changed = True
+                if changed:
+                    updates.append((new_values[0], new_values[1], row['id']))
+                    if new_values[0] is not None and is_encoded_template(new_values[0]):
+                        index_rows.append(self._template_index_row(row['id'], new_values[0]))
+
+            if updates:
+                with self.transaction() as conn:
+                    conn.executemany('UPDATE persons SET iris_template = ?, face_template = ? WHERE id = ?', updates)
+                    conn.executemany('''
+                        INSERT OR REPLACE INTO template_index (person_id, template_hash, dtype, shape, extractor_version)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', index_rows)
+                stats['rows'] += len(updates)
+
+        if vacuum and stats['rows']:
+            # Return the freed pages to the filesystem
+            with self.get_connection() as conn:
+                conn.execute('VACUUM')
+        logger.info("Migrated {} templates in {} rows ({} -> {} bytes, {} failed)".format(
+            stats['templates'], stats['rows'], stats['bytes_before'], stats['bytes_after'], stats['failed']))
+        return stats
+
     def check_phone_exists(self, phone: str) -> bool:
         """Check if a phone number is already registered"""
         if not phone:
@@ -388,9 +782,9 @@ class IrisDatabase:
                 person = dict(row)
                 # Deserialize templates
                 if person['iris_template']:
-                    person['iris_template'] = pickle.loads(person['iris_template'])
+                    person['iris_template'] = decode_template(person['iris_template'])
                 if person['face_template']:
-                    person['face_template'] = pickle.loads(person['face_template'])
+                    person['face_template'] = decode_template(person['face_template'])
                 if person['metadata']:
                     person['metadata'] = json.loads(person['metadata'])
                 
@@ -421,7 +815,12 @@ class IrisDatabase:
                 persons.append(person)
             
             return persons
-    
+
+    def count_active_persons(self) -> int:
+        """Number of active enrolled persons, i.e. the registered voter roll"""
+        with self.get_connection() as conn:
+            return conn.execute('SELECT COUNT(*) FROM persons WHERE is_active = 1').fetchone()[0]
+
     def update_person(self, person_id: int, **kwargs) -> bool:
         """Update person information"""
         if not kwargs:
@@ -432,9 +831,9 @@ class IrisDatabase:
             
             # Handle special fields
             if 'iris_template' in kwargs and kwargs['iris_template'] is not None:
-                kwargs['iris_template'] = pickle.dumps(kwargs['iris_template'])
+                kwargs['iris_template'] = self._encode_template(kwargs['iris_template'])
             if 'face_template' in kwargs and kwargs['face_template'] is not None:
-                kwargs['face_template'] = pickle.dumps(kwargs['face_template'])
+                kwargs['face_template'] = self._encode_template(kwargs['face_template'])
             if 'metadata' in kwargs and kwargs['metadata'] is not None:
                 kwargs['metadata'] = json.dumps(kwargs['metadata'])
             if 'email' in kwargs and not self._is_valid_email(kwargs.get('email')):
@@ -447,9 +846,12 @@ class IrisDatabase:
             values = list(kwargs.values()) + [person_id]
             
             cursor.execute('UPDATE persons SET {} WHERE id = ?'.format(set_clause), values)
+            updated = cursor.rowcount > 0
+            if updated and kwargs.get('iris_template') is not None:
+                self._index_template(cursor, person_id, kwargs['iris_template'])
             conn.commit()
             
-            return cursor.rowcount > 0
+            return updated
     
     def deactivate_person(self, person_id: int) -> bool:
         """Deactivate a person (soft delete)"""
@@ -510,11 +912,11 @@ class IrisDatabase:
                    verification_method: str = 'iris') -> bool:
         """Record a vote"""
         
-        # Check if person already voted
-        if self.has_voted(person_id, election_id):
-            return False
-        
-        with self.get_connection() as conn:
+        with self.transaction(immediate=True) as conn:
+            # Check if person already voted (same transaction as the insert)
+            if self.has_voted(person_id, election_id):
+                return False
+            
             cursor = conn.cursor()
             
             # Create vote hash for verification - safe string operations
@@ -543,48 +945,90 @@ class IrisDatabase:
             count = cursor.fetchone()[0]
             return count > 0
     
+    _ACCESS_COLUMNS = ('id', 'person_id', 'access_time', 'access_type', 'confidence_score',
+                       'access_granted', 'location', 'device_id', 'error_message', 'additional_data')
+    _PERSON_COLUMNS = ('name', 'department')
+
+    def page_access_history(self,
+                            cursor: Optional[Tuple[str, int]] = None,
+                            page_size: int = 200,
+                            person_id: Optional[int] = None,
+                            hours: Optional[int] = 24,
+                            access_type: Optional[str] = None,
+                            columns: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[Tuple[str, int]]]:
+        """
+        One page of access history, newest first.
+
+        Pages are addressed by keyset on (access_time, id): pass the returned
+        cursor back to get the next page, None when there are no more rows.
+        Each page is an indexed range scan, independent of how deep the
+        caller has paged. columns limits the projection (access_logs columns
+        plus 'name'/'department' from persons).
+        """
+        columns = list(columns) if columns else list(self._ACCESS_COLUMNS + self._PERSON_COLUMNS)
+        unknown = [c for c in columns if c not in self._ACCESS_COLUMNS + self._PERSON_COLUMNS]
+        if unknown:
+            raise ValueError('Unknown access history columns: {}'.format(unknown))
+        # The keyset columns are always fetched
+        select = ['al.access_time AS _k_time', 'al.id AS _k_id']
+        select += ['{}.{}'.format('p' if c in self._PERSON_COLUMNS else 'al', c) for c in columns]
+        join_persons = any(c in self._PERSON_COLUMNS for c in columns)
+
+        query = 'SELECT {} FROM access_logs al'.format(', '.join(select))
+        if join_persons:
+            query += ' LEFT JOIN persons p ON al.person_id = p.id'
+        where, params = [], []
+        if hours is not None:
+            where.append("al.access_time > datetime('now', ?)")
+            params.append('-{} hours'.format(int(hours)))
+        if person_id:
+            where.append('al.person_id = ?')
+            params.append(person_id)
+        if access_type:
+            where.append('al.access_type = ?')
+            params.append(access_type)
+        if cursor is not None:
+            where.append('(al.access_time, al.id) < (?, ?)')
+            params.extend(cursor)
+        if where:
+            query += ' WHERE ' + ' AND '.join(where)
+        query += ' ORDER BY al.access_time DESC, al.id DESC LIMIT ?'
+        params.append(page_size)
+
+        with self.get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+
+        records = []
+        for row in rows:
+            values = tuple(row)
+            records.append(AccessRecord(zip(columns, values[2:])))
+        next_cursor = (rows[-1]['_k_time'], rows[-1]['_k_id']) if len(rows) == page_size else None
+        return records, next_cursor
+
+    def iter_access_history(self,
+                            person_id: Optional[int] = None,
+                            hours: Optional[int] = 24,
+                            access_type: Optional[str] = None,
+                            columns: Optional[List[str]] = None,
+                            page_size: int = 500) -> Iterator[Dict]:
+        """Stream access history newest first, one keyset page in memory at a time"""
+        cursor = None
+        while True:
+            records, cursor = self.page_access_history(cursor, page_size, person_id, hours, access_type, columns)
+            for record in records:
+                yield record
+            if cursor is None:
+                return
+
     def get_access_history(self, 
                           person_id: Optional[int] = None,
                           hours: int = 24,
                           access_type: Optional[str] = None) -> List[Dict]:
         """Get access history"""
-        
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            query = '''
-                SELECT al.*, p.name, p.department 
-                FROM access_logs al
-                LEFT JOIN persons p ON al.person_id = p.id
-                WHERE al.access_time > datetime('now', '-{} hours')
-            '''.format(hours)
-            
-            params = []
-            
-            if person_id:
-                query += ' AND al.person_id = ?'
-                params.append(person_id)
-            
-            if access_type:
-                query += ' AND al.access_type = ?'
-                params.append(access_type)
-            
-            query += ' ORDER BY al.access_time DESC'
-            
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            
-            history = []
-            for row in rows:
-                record = dict(row)
-                if record['additional_data']:
-                    record['additional_data'] = json.loads(record['additional_data'])
-                history.append(record)
-            
-            return history
+        return list(self.iter_access_history(person_id=person_id, hours=hours, access_type=access_type))
     
     def get_system_statistics(self) -> Dict:
-        """Get comprehensive system statistics"""
+        """Get comprehensive system statistics (served from the rollup tables)"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
@@ -592,43 +1036,41 @@ class IrisDatabase:
             cursor.execute('SELECT COUNT(*) FROM persons WHERE is_active = 1')
             total_persons = cursor.fetchone()[0]
             
-            # Access attempts today
-            cursor.execute('''
-                SELECT COUNT(*) FROM access_logs 
-                WHERE date(access_time) = date('now')
-            ''')
-            today_attempts = cursor.fetchone()[0]
-            
-            # Successful accesses today
+            # Today's attempts, successes, votes and distinct persons
             cursor.execute('''
-                SELECT COUNT(*) FROM access_logs 
-                WHERE date(access_time) = date('now') AND access_granted = 1
-            ''')
-            today_success = cursor.fetchone()[0]
-            
-            # Votes today
-            cursor.execute('''
-                SELECT COUNT(*) FROM voting_records 
-                WHERE date(vote_time) = date('now')
+                SELECT attempts, grants, votes, unique_persons FROM stats_daily
+                WHERE day = date('now')
             ''')
-            today_votes = cursor.fetchone()[0]
+            row = cursor.fetchone()
+            today_attempts, today_success, today_votes, today_persons = tuple(row) if row else (0, 0, 0, 0)
             
-            # Average confidence score
+            # Average confidence of granted accesses over the last 24 hourly buckets
             cursor.execute('''
-                SELECT AVG(confidence_score) FROM access_logs 
-                WHERE access_granted = 1 AND access_time > datetime('now', '-24 hours')
+                SELECT SUM(granted_confidence_sum), SUM(granted_confidence_count) FROM stats_hourly
+                WHERE hour > strftime('%Y-%m-%d %H', 'now', '-24 hours')
             ''')
-            avg_confidence = cursor.fetchone()[0] or 0
+            conf_sum, conf_count = cursor.fetchone()
+            avg_confidence = (conf_sum / conf_count) if conf_count else 0
             
             return {
                 'total_persons': total_persons,
                 'today_attempts': today_attempts,
                 'today_success': today_success,
                 'today_votes': today_votes,
+                'today_unique_persons': today_persons,
                 'success_rate': (today_success / today_attempts * 100) if today_attempts > 0 else 0,
                 'average_confidence': round(avg_confidence, 3)
             }
 
+    def get_hourly_statistics(self, hours: int = 24) -> List[Dict]:
+        """Per-hour rollup rows for the last N hours, oldest first"""
+        with self.get_connection() as conn:
+            rows = conn.execute('''
+                SELECT * FROM stats_hourly WHERE hour > strftime('%Y-%m-%d %H', 'now', ?)
+                ORDER BY hour
+            ''', ('-{} hours'.format(int(hours)),)).fetchall()
+            return [dict(r) for r in rows]
+
     # --- RBAC and Authentication helpers ---
     def create_user(self, username: str, password_hash: str, role: str = 'viewer', display_name: str = None, totp_secret: str = None) -> int:
         with self.get_connection() as conn:
@@ -798,6 +1240,17 @@ class IrisDatabase:
         return True, 'ok'
 
     # --- Immutable audit log with hash chaining ---
+    @property
+    def audit_writer(self) -> 'AuditChainWriter':
+        """Group-commit appender owning this database's audit chain tip"""
+        writer = self.__dict__.get('_audit_writer')
+        if writer is None:
+            with self._pool_lock:
+                writer = self.__dict__.get('_audit_writer')
+                if writer is None:
+                    writer = self._audit_writer = AuditChainWriter(self)
+        return writer
+
     def _get_last_audit_hash(self) -> Optional[str]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -805,26 +1258,209 @@ class IrisDatabase:
             row = cursor.fetchone()
             return row[0] if row else None
 
-    def write_audit_log(self, actor_username: str, action: str, resource: str = None, details: Dict = None) -> int:
-        prev_hash = self._get_last_audit_hash()
-        event_time = datetime.now().isoformat()
-        payload = json.dumps({
-            't': event_time,
-            'u': actor_username,
-            'a': action,
-            'r': resource,
-            'd': details or {},
-            'p': prev_hash
-        }, sort_keys=True)
-        record_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    def write_audit_log(self, actor_username: str, action: str, resource: str = None, details: Dict = None,
+                        wait: bool = True) -> int:
+        """Append a hash-chained audit event; returns its id (committed unless wait=False)"""
+        return self.audit_writer.append(actor_username, action, resource, details, wait=wait)
+
+    def verify_audit_chain(self, batch_size: int = 5000) -> Dict:
+        """
+        Recompute every record_hash and check prev_hash links, streaming the
+        table in id order. Returns counts and the first broken id (or None).
+        """
+        result = {'records': 0, 'valid': True, 'first_invalid_id': None, 'reason': None}
+        prev_hash = None
+        last_id = 0
+        while result['valid']:
+            with self.get_connection() as conn:
+                rows = conn.execute('''
+                    SELECT id, event_time, actor_username, action, resource, details, prev_hash, record_hash
+                    FROM audit_logs WHERE id > ? ORDER BY id LIMIT ?
+                ''', (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            for row in rows:
+                try:
+                    details = json.loads(row['details']) if row['details'] else {}
+                except ValueError:
+                    details = None
+                if row['prev_hash'] != prev_hash:
+                    reason = 'broken link'
+                elif AuditChainWriter.compute_hash(row['event_time'], row['actor_username'], row['action'],
+                                                   row['resource'], details, row['prev_hash']) != row['record_hash']:
+                    reason = 'hash mismatch'
+                else:
+                    prev_hash = row['record_hash']
+                    result['records'] += 1
+                    continue
+                result.update(valid=False, first_invalid_id=row['id'], reason=reason)
+                break
+            last_id = rows[-1]['id']
+        return result
+    
+    # --- Merkle checkpoints over audit_logs ---
+    AUDIT_BLOCK_SIZE = 1024  # Records per checkpointed block (by id range)
+
+    @property
+    def _checkpoint_secret(self) -> bytes:
+        secret = self.__dict__.get('_checkpoint_secret_cache')
+        if secret is None:
+            secret = self._checkpoint_secret_cache = load_checkpoint_secret(self.db_path)
+        return secret
+
+    def _block_range(self, block_index: int) -> Tuple[int, int]:
+        return block_index * self.AUDIT_BLOCK_SIZE + 1, (block_index + 1) * self.AUDIT_BLOCK_SIZE
+
+    def create_audit_checkpoints(self) -> int:
+        """
+        Seal every complete, not yet checkpointed block of audit records.
+        Each block is re-verified from the previous signed chain tip before
+        its root is signed. Returns the number of checkpoints written.
+        """
+        created = 0
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO audit_logs (event_time, actor_username, action, resource, details, prev_hash, record_hash)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (event_time, actor_username, action, resource, json.dumps(details or {}), prev_hash, record_hash))
-            conn.commit()
-            return cursor.lastrowid
+            last = conn.execute('''
+                SELECT block_index, chain_tip FROM audit_checkpoints ORDER BY block_index DESC LIMIT 1
+            ''').fetchone()
+            max_id = conn.execute('SELECT MAX(id) FROM audit_logs').fetchone()[0] or 0
+            roots = [bytes.fromhex(r[0]) for r in conn.execute(
+                'SELECT block_root FROM audit_checkpoints ORDER BY block_index')]
+        block_index = last['block_index'] + 1 if last else 0
+        prev_tip = last['chain_tip'] if last else None
+
+        while self._block_range(block_index)[1] <= max_id:
+            first_id, last_id = self._block_range(block_index)
+            block = verify_block(self.db_path, first_id, last_id, prev_tip)
+            if not block['valid']:
+                logger.error("Audit checkpoint {} not created: {} at id {}".format(
+                    block_index, block['reason'], block['first_invalid_id']))
+                break
+            roots.append(bytes.fromhex(block['root']))
+            tree_root = merkle_root(roots).hex()
+            signature = sign_checkpoint(self._checkpoint_secret, block_index, last_id, block['records'],
+                                        block['root'], block['chain_tip'], tree_root)
+            with self.get_connection() as conn:
+                conn.execute('''
+                    INSERT INTO audit_checkpoints
+                    (block_index, first_id, last_id, leaf_count, block_root, chain_tip, tree_root, signature)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (block_index, first_id, last_id, block['records'], block['root'],
+                      block['chain_tip'], tree_root, signature))
+                conn.commit()
+            prev_tip = block['chain_tip']
+            block_index += 1
+            created += 1
+        return created
+
+    def verify_audit_log(self, full: bool = False, workers: Optional[int] = None) -> Dict:
+        """
+        Verify audit_logs against the signed Merkle checkpoints.
+
+        Checkpoint signatures and the root over all block roots are always
+        checked. By default only the records after the last trusted
+        checkpoint are replayed; with full=True every block is also replayed
+        and re-rooted, in parallel across processes.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        start = time.perf_counter()
+        result = {'valid': True, 'checkpoints': 0, 'blocks_verified': 0, 'tail_records': 0,
+                  'first_invalid_id': None, 'reason': None}
+        with self.get_connection() as conn:
+            checkpoints = [dict(r) for r in conn.execute('SELECT * FROM audit_checkpoints ORDER BY block_index')]
+
+        def fail(record_id, reason):
+            result.update(valid=False, first_invalid_id=record_id, reason=reason)
+            result['elapsed_sec'] = time.perf_counter() - start
+            return result
+
+        roots = []
+        for i, cp in enumerate(checkpoints):
+            expected = sign_checkpoint(self._checkpoint_secret, cp['block_index'], cp['last_id'], cp['leaf_count'],
+                                       cp['block_root'], cp['chain_tip'], cp['tree_root'])
+            if cp['block_index'] != i or not hmac.compare_digest(expected, cp['signature']):
+                return fail(cp['first_id'], 'bad checkpoint signature (block {})'.format(cp['block_index']))
+            roots.append(bytes.fromhex(cp['block_root']))
+        if checkpoints and merkle_root(roots).hex() != checkpoints[-1]['tree_root']:
+            return fail(checkpoints[-1]['first_id'], 'checkpoint tree root mismatch')
+        result['checkpoints'] = len(checkpoints)
+
+        if full and checkpoints:
+            tasks = [(self.db_path, cp['first_id'], cp['last_id'],
+                      checkpoints[i - 1]['chain_tip'] if i else None, cp['block_root'])
+                     for i, cp in enumerate(checkpoints)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for block, cp in zip(pool.map(verify_block, *zip(*tasks), chunksize=4), checkpoints):
+                    if not block['valid']:
+                        return fail(block['first_invalid_id'], block['reason'])
+                    if block['chain_tip'] != cp['chain_tip'] or block['records'] != cp['leaf_count']:
+                        return fail(cp['first_id'], 'block does not match checkpoint')
+                    result['blocks_verified'] += 1
+
+        # Records after the last trusted checkpoint
+        tail_start = checkpoints[-1]['last_id'] + 1 if checkpoints else 1
+        with self.get_connection() as conn:
+            max_id = conn.execute('SELECT MAX(id) FROM audit_logs').fetchone()[0] or 0
+        if max_id >= tail_start:
+            tail = verify_block(self.db_path, tail_start, max_id,
+                                checkpoints[-1]['chain_tip'] if checkpoints else None)
+            if not tail['valid']:
+                return fail(tail['first_invalid_id'], tail['reason'])
+            result['tail_records'] = tail['records']
+        result['elapsed_sec'] = time.perf_counter() - start
+        return result
+
+    def audit_inclusion_proof(self, record_id: int) -> Optional[Dict]:
+        """
+        Proof that an audit record is covered by the latest signed checkpoint:
+        the record, its path to the block root and the block root's path to
+        the tree root (O(log n) hashes). None if the record is not yet
+        checkpointed.
+        """
+        block_index = (record_id - 1) // self.AUDIT_BLOCK_SIZE
+        with self.get_connection() as conn:
+            record = conn.execute('SELECT * FROM audit_logs WHERE id = ?', (record_id,)).fetchone()
+            checkpoint = conn.execute('SELECT * FROM audit_checkpoints WHERE block_index = ?', (block_index,)).fetchone()
+            latest = conn.execute('SELECT * FROM audit_checkpoints ORDER BY block_index DESC LIMIT 1').fetchone()
+            if record is None or checkpoint is None:
+                return None
+            leaf_rows = conn.execute('SELECT id, record_hash FROM audit_logs WHERE id BETWEEN ? AND ? ORDER BY id',
+                                     (checkpoint['first_id'], checkpoint['last_id'])).fetchall()
+            roots = [bytes.fromhex(r[0]) for r in conn.execute(
+                'SELECT block_root FROM audit_checkpoints WHERE block_index <= ? ORDER BY block_index',
+                (latest['block_index'],))]
+        leaves = [leaf_hash(r[0], r[1]) for r in leaf_rows]
+        leaf_index = [r[0] for r in leaf_rows].index(record_id)
+        return {
+            'record': dict(record),
+            'block_index': block_index,
+            'block_path': merkle_path(leaves, leaf_index),
+            'block_root': checkpoint['block_root'],
+            'tree_path': merkle_path(roots, block_index),
+            'checkpoint': {k: latest[k] for k in ('block_index', 'last_id', 'leaf_count', 'block_root',
+                                                  'chain_tip', 'tree_root', 'signature')},
+        }
+
+    def verify_audit_inclusion(self, proof: Dict) -> bool:
+        """Check an inclusion proof from audit_inclusion_proof (no table scan)"""
+        try:
+            record = proof['record']
+            details = json.loads(record['details']) if record['details'] else {}
+            record_hash = audit_record_hash(record['event_time'], record['actor_username'], record['action'],
+                                            record['resource'], details, record['prev_hash'])
+            if record_hash != record['record_hash']:
+                return False
+            block_root = root_from_path(leaf_hash(record['id'], record_hash), proof['block_path'])
+            if block_root.hex() != proof['block_root']:
+                return False
+            cp = proof['checkpoint']
+            if root_from_path(block_root, proof['tree_path']).hex() != cp['tree_root']:
+                return False
+            expected = sign_checkpoint(self._checkpoint_secret, cp['block_index'], cp['last_id'], cp['leaf_count'],
+                                       cp['block_root'], cp['chain_tip'], cp['tree_root'])
+            return hmac.compare_digest(expected, cp['signature'])
+        except Exception:
+            return False
     
     def get_setting(self, setting_name: str, default_value: str = None) -> str:
         """Get system setting"""
@@ -871,7 +1507,8 @@ class IrisDatabase:
             # 3. Delete voting records
             cursor.execute('DELETE FROM voting_records WHERE person_id = ?', (person_id,))
             
-            # 4. Delete the person
+            # 4. Delete the template index entry and the person
+            cursor.execute('DELETE FROM template_index WHERE person_id = ?', (person_id,))
             cursor.execute('DELETE FROM persons WHERE id = ?', (person_id,))
             
             conn.commit()
@@ -905,6 +1542,20 @@ class IrisDatabase:
         Let's try a simple comparison loop.
         """
         
+        # 0. Exact re-use of an enrolled template is a single index lookup
+        try:
+            template_hash = hashlib.sha256(self._encode_template(new_iris_template)).hexdigest()
+            with self.get_connection() as conn:
+                row = conn.execute('''
+                    SELECT t.person_id FROM template_index t
+                    JOIN persons p ON p.id = t.person_id
+                    WHERE t.template_hash = ? AND p.is_active = 1 LIMIT 1
+                ''', (template_hash,)).fetchone()
+            if row:
+                return row[0]
+        except Exception:
+            pass
+        
         # 1. Get all templates
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -915,7 +1566,7 @@ class IrisDatabase:
             pid = row['id']
             blob = row['iris_template']
             try:
-                stored_template = pickle.loads(blob)
+                stored_template = decode_template(blob)
                 # Ensure similar shapes
                 if stored_template.shape == new_iris_template.shape:
                     # Calculate Difference (MSE)
@@ -933,6 +1584,221 @@ class IrisDatabase:
                 
         return None
     
+    # --- Bulk voter-roll enrollment ---
+    _BULK_FIELDS = ('name', 'email', 'phone', 'department', 'role', 'address', 'voter_id')
+
+    @staticmethod
+    def read_voter_roll(path: str) -> Iterator[Dict]:
+        """
+        Stream voter-roll records from a CSV (header row) or JSONL file.
+        Template columns may hold file paths (iris_template_path / face_template_path).
+        """
+        if path.lower().endswith(('.jsonl', '.ndjson')):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield json.loads(line)
+        else:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.DictReader(f):
+                    yield {k: (v if v != '' else None) for k, v in row.items()}
+
+    @staticmethod
+    def _load_template_file(path: str, base_dir: Optional[str] = None) -> np.ndarray:
+        if base_dir and not os.path.isabs(path):
+            path = os.path.join(base_dir, path)
+        if path.endswith('.npy'):
+            return np.load(path, allow_pickle=False)
+        import cv2
+        image = cv2.imread(path)
+        if image is None:
+            raise ValueError('Unreadable template image: {}'.format(path))
+        return image
+
+    def _existing_values(self, conn, column: str, values: List[str]) -> set:
+        """Which of values already exist in persons.column (one IN query per 500)"""
+        found = set()
+        for i in range(0, len(values), 500):
+            part = values[i:i + 500]
+            rows = conn.execute('SELECT {} FROM persons WHERE {} IN ({})'.format(
+                column, column, ','.join('?' * len(part))), part).fetchall()
+            found.update(r[0] for r in rows)
+        return found
+
+    def bulk_enroll(self,
+                    records: Iterable[Dict],
+                    chunk_size: int = 5000,
+                    template_dir: Optional[str] = None,
+                    defer_indexes: bool = False,
+                    workers: int = 4,
+                    progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Enroll a voter roll in chunks.
+
+        Each chunk is validated as a set (compiled regexes, one IN query per
+        unique column instead of a lookup per row, duplicate detection within
+        the roll), template files are loaded on a thread pool, and the valid
+        rows go in with executemany inside one transaction per chunk. The
+        iris template index is written in the same pass. Invalid rows are
+        skipped and reported by their 1-based position in the input.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        report = {'read': 0, 'enrolled': 0, 'rejected': 0, 'errors': [], 'chunks': 0,
+                  'elapsed_sec': 0.0, 'rows_per_sec': 0.0}
+        seen_emails, seen_voter_ids, seen_hashes = set(), set(), set()
+        start = time.perf_counter()
+
+        if defer_indexes:
+            with self.get_connection() as conn:
+                conn.execute('DROP INDEX IF EXISTS idx_persons_email')
+                conn.execute('DROP INDEX IF EXISTS idx_persons_voter_id')
+                conn.commit()
+
+        def reject(position, reason):
+            report['rejected'] += 1
+            if len(report['errors']) < 1000:
+                report['errors'].append((position, reason))
+
+        def load_templates(record):
+            out = {}
+            for key in ('iris_template', 'face_template'):
+                value = record.get(key)
+                path = record.get(key + '_path')
+                if value is None and path:
+                    value = self._load_template_file(path, template_dir)
+                out[key] = self._encode_template(value) if value is not None else None
+            return out
+
+        def process(chunk):
+            positions = [p for p, _ in chunk]
+            rows = [r for _, r in chunk]
+            for r in rows:
+                for key in self._BULK_FIELDS:
+                    if r.get(key) is not None:
+                        r[key] = str(r[key]).strip() or None
+
+            with self.get_connection() as conn:
+                emails = sorted({r['email'] for r in rows if r.get('email')})
+                voter_ids = sorted({r['voter_id'] for r in rows if r.get('voter_id')})
+                existing_emails = self._existing_values(conn, 'email', emails)
+                existing_voters = self._existing_values(conn, 'voter_id', voter_ids)
+
+            valid = []
+            for position, r in zip(positions, rows):
+                name, email, phone, voter_id = r.get('name'), r.get('email'), r.get('phone'), r.get('voter_id')
+                if not name:
+                    reject(position, 'missing name')
+                elif email and _EMAIL_RE.match(email) is None:
+                    reject(position, 'invalid email')
+                elif phone and _PHONE_RE.match(phone) is None:
+                    reject(position, 'invalid phone')
+                elif email and (email in existing_emails or email in seen_emails):
+                    reject(position, 'duplicate email')
+                elif voter_id and (voter_id in existing_voters or voter_id in seen_voter_ids):
+                    reject(position, 'duplicate voter_id')
+                else:
+                    # Reserved only once the row is enrolled (below), so a row rejected
+                    # later for its templates does not block a corrected row for the voter
+                    valid.append((position, r))
+            if not valid:
+                return
+
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                futures = [pool.submit(load_templates, r) for _, r in valid]
+                loaded = []
+                for (position, r), future in zip(valid, futures):
+                    try:
+                        loaded.append((position, r, future.result()))
+                    except Exception as e:
+                        reject(position, 'template: {}'.format(e))
+
+            with self.transaction(immediate=True) as conn:
+                template_hashes = [hashlib.sha256(t['iris_template']).hexdigest()
+                                   for _, _, t in loaded if t['iris_template'] is not None]
+                known = set()
+                for i in range(0, len(template_hashes), 500):
+                    part = template_hashes[i:i + 500]
+                    known.update(row[0] for row in conn.execute(
+                        'SELECT template_hash FROM template_index WHERE template_hash IN ({})'.format(
+                            ','.join('?' * len(part))), part))
+
+                # Ids are assigned here, under the write lock, so the index rows
+                # can be inserted with the persons rows in one executemany each
+                seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'persons'").fetchone()
+                max_id = conn.execute('SELECT MAX(id) FROM persons').fetchone()[0]
+                next_id = max(seq[0] if seq else 0, max_id or 0) + 1
+
+                person_rows, index_rows = [], []
+                for position, r, t in loaded:
+                    email, voter_id = r.get('email'), r.get('voter_id')
+                    # Duplicates within this chunk: the first row to get this far wins
+                    if email and email in seen_emails:
+                        reject(position, 'duplicate email')
+                        continue
+                    if voter_id and voter_id in seen_voter_ids:
+                        reject(position, 'duplicate voter_id')
+                        continue
+                    iris_blob = t['iris_template']
+                    if iris_blob is not None:
+                        digest = hashlib.sha256(iris_blob).hexdigest()
+                        if digest in known or digest in seen_hashes:
+                            reject(position, 'duplicate iris template')
+                            continue
+                        seen_hashes.add(digest)
+                        index_rows.append(self._template_index_row(next_id, iris_blob))
+                    metadata = r.get('metadata')
+                    if metadata is not None and not isinstance(metadata, str):
+                        metadata = json.dumps(metadata)
+                    person_rows.append((next_id, r['name'], email, r.get('phone'),
+                                        r.get('department'), r.get('role'), iris_blob,
+                                        t['face_template'], metadata, r.get('address'), voter_id))
+                    if email:
+                        seen_emails.add(email)
+                    if voter_id:
+                        seen_voter_ids.add(voter_id)
+                    next_id += 1
+
+                conn.executemany('''
+                    INSERT INTO persons
+                    (id, name, email, phone, department, role, iris_template, face_template, metadata, address, voter_id)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', person_rows)
+                conn.executemany('''
+                    INSERT OR REPLACE INTO template_index (person_id, template_hash, dtype, shape, extractor_version)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', index_rows)
+            report['enrolled'] += len(person_rows)
+
+        try:
+            chunk = []
+            for position, record in enumerate(records, 1):
+                report['read'] += 1
+                chunk.append((position, dict(record)))
+                if len(chunk) >= chunk_size:
+                    process(chunk)
+                    chunk = []
+                    report['chunks'] += 1
+                    if progress:
+                        progress(report)
+            if chunk:
+                process(chunk)
+                report['chunks'] += 1
+        finally:
+            if defer_indexes:
+                with self.get_connection() as conn:
+                    conn.execute('CREATE INDEX IF NOT EXISTS idx_persons_email ON persons(email)')
+                    conn.execute('CREATE INDEX IF NOT EXISTS idx_persons_voter_id ON persons(voter_id)')
+                    conn.commit()
+
+        report['elapsed_sec'] = time.perf_counter() - start
+        if report['elapsed_sec'] > 0:
+            report['rows_per_sec'] = report['read'] / report['elapsed_sec']
+        logger.info("Bulk enrollment: {} enrolled, {} rejected of {} in {:.1f}s ({:.0f} rows/s)".format(
+            report['enrolled'], report['rejected'], report['read'], report['elapsed_sec'], report['rows_per_sec']))
+        return report
+
     def cleanup_old_logs(self, days: int = 90):
         """Clean up old access logs"""
         with self.get_connection() as conn:
@@ -961,28 +1827,461 @@ class IrisDatabase:
             logger.info("Cleaned up {} old voting records".format(deleted))
             return deleted
     
-    def backup_database(self, backup_path: str):
-        """Create database backup"""
-        import shutil
-        shutil.copy2(self.db_path, backup_path)
-        logger.info("Database backed up to: {}".format(backup_path))
+    def backup_database(self, backup_path: str) -> Dict:
+        """
+        Create a consistent online backup with the SQLite backup API (see
+        backup_manager): includes committed WAL contents and does not block
+        writers. Returns the backup stats.
+        """
+        from backup_manager import backup_database
+        stats = backup_database(self.db_path, backup_path)
+        logger.info("Database backed up to: {} ({:,} pages in {:.2f}s, {:,.0f} pages/s)".format(
+            backup_path, stats['pages'], stats['seconds'], stats['pages_per_sec']))
+        return stats
     
-    def export_data(self, table_name: str, output_path: str):
-        """Export table data to JSON"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM {}'.format(table_name))
-            rows = cursor.fetchall()
-            
-            data = [dict(row) for row in rows]
-            
-            with open(output_path, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
-            
-            logger.info("Exported {} records from {} to {}".format(len(data), table_name, output_path))
+    def export_data(self, table_name: str, output_path: str, fmt: Optional[str] = None,
+                    compression: Optional[str] = 'auto', chunk_size: int = 5000) -> Dict:
+        """
+        Export a table by streaming it in chunks (see streaming_export), so
+        memory stays flat for multi-million-row tables like access_logs.
+        The format follows the extension unless given: .json (one array, as
+        before), .jsonl, .csv or .npy (columnar directory); a .gz / .zst
+        suffix compresses. Returns the export stats.
+        """
+        from streaming_export import export_table
+        stats = export_table(self.db_path, table_name, output_path, fmt=fmt, compression=compression,
+                             chunk_size=chunk_size)
+        logger.info("Exported {} records from {} to {} ({:.0f} rows/s)".format(
+            stats['rows'], table_name, output_path, stats['rows_per_sec']))
+        return stats
+
+class AccessLogWriter:
+    """
+    Asynchronous, batched sink for access_logs.
+
+    Callers enqueue events and return immediately; a single writer thread
+    drains the queue and commits them in groups with executemany on one
+    persistent connection. Person ids are validated against a cached id set
+    instead of a per-event SELECT. Accepted events are retried while the
+    database is locked or busy (up to MAX_RETRIES times) and flushed on
+    shutdown; any other error rejects the batch.
+    """
+
+    MAX_RETRIES = 20  # ~35 s of locked/busy backoff before a batch is given up
+
+    _INSERT_SQL = '''
+        INSERT INTO access_logs
+        (person_id, access_type, confidence_score, access_granted,
+         location, device_id, error_message, additional_data)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    def __init__(self, database: 'IrisDatabase', batch_size: int = 256,
+                 max_delay: float = 0.25, max_queue: int = 10000,
+                 id_refresh_interval: float = 5.0):
+        self.database = database
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.id_refresh_interval = id_refresh_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = 0  # Accepted but not yet committed (or rejected)
+        self._pending_cond = threading.Condition()
+        self._known_ids = set()
+        self._ids_loaded_at = 0.0
+        self._conn = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = False
+        self.stats = {'written': 0, 'batches': 0, 'rejected': 0, 'dropped': 0, 'retries': 0}
+        atexit.register(self.close)
+
+    def submit(self,
+               person_id: int,
+               access_type: str,
+               confidence_score: float,
+               access_granted: bool,
+               location: Optional[str] = None,
+               device_id: Optional[str] = None,
+               error_message: Optional[str] = None,
+               additional_data: Optional[Dict] = None,
+               timeout: float = 0.05) -> bool:
+        """Queue an access event (same fields as IrisDatabase.log_access); never touches SQLite."""
+        self._ensure_started()
+        row = (int(person_id), access_type, confidence_score, access_granted,
+               location, device_id, error_message,
+               json.dumps(additional_data) if additional_data else None)
+        with self._pending_cond:
+            self._pending += 1
+        try:
+            self._queue.put(row, timeout=timeout)
+            return True
+        except queue.Full:
+            self._finish(1)
+            self.stats['dropped'] += 1
+            logger.warning("Access log queue full; event dropped")
+            return False
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until every accepted event is committed. Returns False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._pending_cond:
+            while self._pending > 0:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._pending_cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush outstanding events and stop the writer thread."""
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        self._stopping = True
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='AccessLogWriter', daemon=True)
+                self._thread.start()
+
+    def _finish(self, count: int) -> None:
+        with self._pending_cond:
+            self._pending -= count
+            if self._pending <= 0:
+                self._pending_cond.notify_all()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            # Pragmas are set once for the lifetime of the writer connection
+            self._conn = sqlite3.connect(self.database.db_path, timeout=30)
+            self._conn.execute('PRAGMA foreign_keys=ON')
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        return self._conn
+
+    def _refresh_known_ids(self, force: bool = False) -> None:
+        now = time.time()
+        if not force and now - self._ids_loaded_at < self.id_refresh_interval:
+            return
+        rows = self._connect().execute('SELECT id FROM persons').fetchall()
+        self._known_ids = {r[0] for r in rows}
+        self._ids_loaded_at = now
+
+    def _run(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopping:
+                    break
+                continue
+
+            # Group commit: gather whatever else arrives within max_delay
+            batch = [first]
+            deadline = time.time() + self.max_delay
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._write_with_retry(batch)
+            self._finish(len(batch))
+
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def _write_with_retry(self, batch: List[tuple]) -> None:
+        delay = 0.05
+        attempts = 0
+        while True:
+            try:
+                # Unknown-person rows are counted once, when the batch is settled
+                self.stats['rejected'] += self._write_batch(batch)
+                return
+            except sqlite3.OperationalError as e:
+                attempts += 1
+                if not _is_busy_error(e) or attempts > self.MAX_RETRIES or self._stopping:
+                    # Missing table, read-only database, I/O error, or still locked: give up on the batch
+                    self.stats['rejected'] += len(batch)
+                    logger.error("Access log batch of {} event(s) rejected: {}".format(len(batch), e))
+                    return
+                # Locked/busy: keep the batch and retry
+                self.stats['retries'] += 1
+                logger.warning("Access log batch retry ({}): {}".format(len(batch), e))
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+            except Exception as e:
+                # Isolate a bad row instead of losing the whole batch
+                if len(batch) == 1:
+                    self.stats['rejected'] += 1
+                    logger.error("Access log event rejected: {}".format(e))
+                    return
+                for row in batch:
+                    self._write_with_retry([row])
+                return
+
+    def _write_batch(self, batch: List[tuple]) -> int:
+        """Commit the rows of known persons; returns how many were skipped as unknown"""
+        conn = self._connect()
+        if any(row[0] not in self._known_ids for row in batch):
+            self._refresh_known_ids()
+        rows = [row for row in batch if row[0] in self._known_ids]
+        if not rows:
+            return len(batch)
+        granted_ids = {(row[0],) for row in rows if row[3]}
+        try:
+            conn.execute('BEGIN')
+            conn.executemany(self._INSERT_SQL, rows)
+            if granted_ids:
+                conn.executemany(
+                    'UPDATE persons SET last_access = CURRENT_TIMESTAMP WHERE id = ?',
+                    list(granted_ids)
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        self.stats['written'] += len(rows)
+        self.stats['batches'] += 1
+        return len(batch) - len(rows)
+
+
+class AuditChainWriter:
+    """
+    Group-commit appender for the hash-chained audit_logs table.
+
+    The chain tip (last id and record_hash) is recovered from the database
+    once and then kept in memory. Events are hashed in submission order
+    under a lock, so concurrent callers can never fork the chain. A writer
+    thread inserts them in batches, one transaction per batch: whatever
+    queued up while the previous batch was being written, optionally
+    lingering up to max_delay for more. If another process
+    appended in the meantime, the pending events are re-chained onto the
+    database tip inside the write transaction before inserting.
+    """
+
+    _INSERT_SQL = '''
+        INSERT INTO audit_logs (id, event_time, actor_username, action, resource, details, prev_hash, record_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    def __init__(self, database: 'IrisDatabase', batch_size: int = 256, max_delay: float = 0.0):
+        self.database = database
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._lock = threading.Lock()  # Guards the tip and the pending list
+        self._cond = threading.Condition(self._lock)
+        self._pending: List[Dict] = []  # Hashed, not yet committed, in chain order
+        self._tip_id = None
+        self._tip_hash = None
+        self._conn = None
+        self._thread = None
+        self._stopping = False
+        self.stats = {'written': 0, 'batches': 0, 'rechained': 0, 'retries': 0, 'failed': 0}
+        atexit.register(self.close)
+
+    compute_hash = staticmethod(audit_record_hash)
+
+    def _recover_tip(self) -> None:
+        with self.database.get_connection() as conn:
+            row = conn.execute('SELECT id, record_hash FROM audit_logs ORDER BY id DESC LIMIT 1').fetchone()
+        self._tip_id, self._tip_hash = (row[0], row[1]) if row else (0, None)
+
+    def _chain(self, record: Dict) -> None:
+        """Link a record onto the in-memory tip (lock held)"""
+        record['id'] = self._tip_id + 1
+        record['prev_hash'] = self._tip_hash
+        record['record_hash'] = self.compute_hash(record['event_time'], record['actor_username'],
+                                                  record['action'], record['resource'],
+                                                  record['details'], self._tip_hash)
+        self._tip_id, self._tip_hash = record['id'], record['record_hash']
+
+    def append(self, actor_username: str, action: str, resource: str = None,
+               details: Dict = None, wait: bool = True, timeout: float = 10.0) -> int:
+        """
+        Chain an audit event and queue it for the next group commit.
+        With wait=True, returns once the event's batch is committed; raises
+        TimeoutError if it is still queued after timeout, or the database
+        error that made its batch fail.
+        """
+        record = {
+            'event_time': datetime.now().isoformat(),
+            'actor_username': actor_username,
+            'action': action,
+            'resource': resource,
+            'details': details or {},
+            'committed': False,
+            'error': None,
+        }
+        with self._cond:
+            if self._tip_id is None:
+                self._recover_tip()
+            self._chain(record)
+            self._pending.append(record)
+            self._ensure_started()
+            self._cond.notify_all()
+            if wait:
+                deadline = time.time() + timeout
+                while not record['committed'] and record['error'] is None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError("Audit event {} not committed within {}s; still queued".format(record['id'], timeout))
+                    self._cond.wait(remaining)
+                if record['error'] is not None:
+                    raise record['error']
+            return record['id']
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """Block until every chained event is committed. Returns False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._thread is None:
+            return
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _ensure_started(self) -> None:
+        # Called with the lock held
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='AuditChainWriter', daemon=True)
+            self._thread.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.database.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        return self._conn
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait(0.5)
+                if not self._pending and self._stopping:
+                    break
+                first_seen = time.time()
+            # Group commit: events arriving while the previous batch was being
+            # written are already pending; optionally linger max_delay for more
+            while self.max_delay > 0:
+                with self._cond:
+                    if len(self._pending) >= self.batch_size or time.time() - first_seen >= self.max_delay:
+                        break
+                time.sleep(min(0.002, self.max_delay))
+            self._write_with_retry()
+
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+    def _write_with_retry(self) -> None:
+        delay = 0.05
+        while True:
+            try:
+                self._write_batch()
+                return
+            except Exception as e:
+                if not _is_busy_error(e):
+                    self._fail_batch(e)
+                    return
+                # Records stay pending and chained; retry (at-least-once)
+                self.stats['retries'] += 1
+                logger.warning("Audit batch retry: {}".format(e))
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+
+    def _fail_batch(self, error: Exception) -> None:
+        """
+        Drop the head batch after a non-retryable error and wake its waiters.
+        Records still pending were chained onto the dropped ones; the next
+        _write_batch sees they no longer link to the database tip and
+        re-chains them.
+        """
+        with self._cond:
+            batch = self._pending[:self.batch_size]
+            del self._pending[:len(batch)]
+            for record in batch:
+                record['error'] = error
+            if not self._pending:
+                self._tip_id = self._tip_hash = None  # Recovered from the database on the next append
+            self._cond.notify_all()
+        self.stats['failed'] += len(batch)
+        logger.error("Audit batch of {} event(s) failed: {}".format(len(batch), error))
+
+    def _write_batch(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            db_tip = conn.execute('SELECT id, record_hash FROM audit_logs ORDER BY id DESC LIMIT 1').fetchone()
+            db_tip = (db_tip[0], db_tip[1]) if db_tip else (0, None)
+            with self._cond:
+                batch = self._pending[:self.batch_size]
+                if not batch:
+                    conn.rollback()
+                    return
+                if (batch[0]['id'] - 1, batch[0]['prev_hash']) != db_tip:
+                    # Someone else appended: re-chain everything pending onto the DB tip
+                    self._tip_id, self._tip_hash = db_tip
+                    for record in self._pending:
+                        self._chain(record)
+                    self.stats['rechained'] += 1
+                rows = [(r['id'], r['event_time'], r['actor_username'], r['action'], r['resource'],
+                         json.dumps(r['details']), r['prev_hash'], r['record_hash']) for r in batch]
+            conn.executemany(self._INSERT_SQL, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        with self._cond:
+            del self._pending[:len(batch)]
+            for record in batch:
+                record['committed'] = True
+            self._cond.notify_all()
+        self.stats['written'] += len(batch)
+        self.stats['batches'] += 1
+
+        # Seal a Merkle checkpoint whenever the batch completed a block
+        block_size = self.database.AUDIT_BLOCK_SIZE
+        if batch[-1]['id'] // block_size > (batch[0]['id'] - 1) // block_size:
+            try:
+                self.database.create_audit_checkpoints()
+            except Exception as e:
+                logger.error("Audit checkpoint failed: {}".format(e))
+
 
 # Global database instance
 db = IrisDatabase()
+access_log_writer = AccessLogWriter(db)
 
 if __name__ == "__main__":
     # Test database functionality
@@ -0,0 +1,209 @@
+"""
+Eye detection and iris crop extraction shared by live recognition and the
+frame pipeline workers.
+
+Features:
+- Haar cascade loading (face and eye)
+- Low-light enhancement (CLAHE on the LAB L channel plus gamma)
+- Face-first eye detection with a direct eye-cascade fallback
+- Hough-circle iris cropping to 128x128 BGR
+
+Only OpenCV and NumPy are imported, so extraction worker processes do not
+pull in tkinter, the database or the model.
+
+Usage:
+    extractor = EyeExtractor()
+    for (x, y, w, h), eye_roi, iris in extractor.extract_candidates(frame): ...
+"""
+
+import logging
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def load_cascades():
+    """(eye_cascade, face_cascade) from OpenCV's bundled Haar files, or (None, None)"""
+    try:
+        eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        return eye_cascade, face_cascade
+    except Exception as e:
+        logger.warning(f"Could not load cascade classifiers: {e}")
+        return None, None
+
+
+class EyeExtractor:
+    """Detects eyes and extracts iris crops from BGR frames"""
+
+    def __init__(self, eye_cascade=None, face_cascade=None):
+        if eye_cascade is None and face_cascade is None:
+            eye_cascade, face_cascade = load_cascades()
+        self.eye_cascade = eye_cascade
+        self.face_cascade = face_cascade
+
+    def enhance_low_light(self, frame):
+        """Enhance image for low light conditions"""
+        try:
+            # Check brightness
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            mean_brightness = np.mean(gray)
+
+            # If dark, apply enhancements
+            if mean_brightness < 80:
+                # 1. CLAHE (Contrast Limited Adaptive Histogram Equalization)
+                clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+
+                # Apply to L channel of LAB
+                lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+                l, a, b = cv2.split(lab)
+                cl = clahe.apply(l)
+                enhanced_lab = cv2.merge((cl, a, b))
+                enhanced_frame = cv2.cvtColor(enhanced_lab, cv2.COLOR_LAB2BGR)
+
+                # 2. Gamma Correction if still dark
+                # gamma < 1.0 makes it lighter
+                gamma = 0.5
+                invGamma = 1.0 / gamma
+                table = np.array([((i / 255.0) ** invGamma) * 255 for i in np.arange(0, 256)]).astype("uint8")
+                final_frame = cv2.LUT(enhanced_frame, table)
+
+                return final_frame
+            return frame
+        except Exception:
+            return frame
+
+    def extract_candidates(self, frame):
+        """Detect eyes and extract iris crops: [((x, y, w, h), eye_roi, iris_features)]"""
+        # 1. Try with Enhanced Frame (Low Light)
+        # enhance_low_light never writes into its input, so no defensive copy
+        enhanced_frame = self.enhance_low_light(frame)
+        eyes = self.detect_eyes(enhanced_frame)
+
+        # 2. Fallback: If no eyes found, try Original Frame
+        if eyes is None or len(eyes) == 0:
+            eyes = self.detect_eyes(frame)
+
+        if eyes is None or len(eyes) == 0:
+            return []
+
+        candidates = []
+        for (x, y, w, h) in eyes:
+            # Coordinates are valid for both frames (same geometry); extract from
+            # the enhanced frame for consistency in feature quality when dark
+            eye_roi = enhanced_frame[y:y+h, x:x+w]
+
+            if eye_roi.size == 0:
+                continue
+
+            # Extract iris features
+            iris_features = self.extract_iris_from_roi(eye_roi)
+            if iris_features is not None:
+                candidates.append(((x, y, w, h), eye_roi, iris_features))
+        return candidates
+
+    def detect_eyes(self, frame):
+        """Detect eyes in frame using cascade classifiers"""
+        if not self.eye_cascade:
+            return []
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        # Relaxed parameters for better recall (1.3, 5 -> 1.1, 3)
+        # First detect faces
+        if self.face_cascade:
+            faces = self.face_cascade.detectMultiScale(gray, 1.1, 3)
+
+            eyes = []
+            for (fx, fy, fw, fh) in faces:
+                face_roi = gray[fy:fy+fh, fx:fx+fw]
+                # Look for eyes within face
+                face_eyes = self.eye_cascade.detectMultiScale(face_roi, 1.1, 2) # Very relaxed
+
+                for (ex, ey, ew, eh) in face_eyes:
+                    eyes.append((fx + ex, fy + ey, ew, eh))
+
+            if len(eyes) > 0:
+                return eyes
+
+        # If no face-based eyes found, try direct eye detection (Robust Fallback)
+        return self.eye_cascade.detectMultiScale(gray, 1.1, 3)
+
+    def extract_iris_from_roi(self, eye_roi):
+        """Extract iris features from eye region - ENHANCED VERSION"""
+        try:
+            # Resize eye region for better processing
+            if eye_roi.shape[0] < 100 or eye_roi.shape[1] < 100:
+                eye_roi = cv2.resize(eye_roi, (150, 150))
+
+            # Convert to grayscale for circle detection
+            gray = cv2.cvtColor(eye_roi, cv2.COLOR_BGR2GRAY) if len(eye_roi.shape) == 3 else eye_roi
+
+            # Enhance contrast
+            gray = cv2.equalizeHist(gray)
+            gray = cv2.medianBlur(gray, 5)
+
+            # Detect circles (iris/pupil)
+            circles = cv2.HoughCircles(
+                gray,
+                cv2.HOUGH_GRADIENT,
+                dp=1,
+                minDist=int(gray.shape[0]/4),
+                param1=50,
+                param2=30,
+                minRadius=int(gray.shape[0]/8),
+                maxRadius=int(gray.shape[0]/3)
+            )
+
+            if circles is not None:
+                circles = np.round(circles[0, :]).astype("int")
+
+                # Find the best circle
+                best_circle = None
+                max_radius = 0
+
+                for (x, y, r) in circles:
+                    if r > max_radius and x-r > 0 and y-r > 0 and x+r < gray.shape[1] and y+r < gray.shape[0]:
+                        max_radius = r
+                        best_circle = (x, y, r)
+
+                if best_circle is not None:
+                    x, y, r = best_circle
+
+                    # Create mask for iris region
+                    mask = np.zeros(gray.shape, np.uint8)
+                    cv2.circle(mask, (x, y), r, 255, -1)
+
+                    # Extract iris region
+                    iris_region = cv2.bitwise_and(gray, gray, mask=mask)
+
+                    # Crop to bounding box
+                    crop_x = max(0, x - r)
+                    crop_y = max(0, y - r)
+                    crop_w = min(gray.shape[1] - crop_x, 2 * r)
+                    crop_h = min(gray.shape[0] - crop_y, 2 * r)
+
+                    cropped_iris = iris_region[crop_y:crop_y+crop_h, crop_x:crop_x+crop_w]
+
+                    if cropped_iris.size > 0:
+                        # Resize to standard size
+                        cropped_iris = cv2.resize(cropped_iris, (128, 128))
+
+                        # Convert back to color for model compatibility
+                        if len(cropped_iris.shape) == 2:
+                            cropped_iris = cv2.cvtColor(cropped_iris, cv2.COLOR_GRAY2BGR)
+
+                        return cropped_iris
+
+            # If no iris detected, return resized eye region
+            eye_roi_resized = cv2.resize(eye_roi, (128, 128))
+            if len(eye_roi_resized.shape) == 2:
+                eye_roi_resized = cv2.cvtColor(eye_roi_resized, cv2.COLOR_GRAY2BGR)
+
+            return eye_roi_resized
+
+        except Exception as e:
+            logger.error(f"Error extracting iris: {e}")
+            return None
@@ -0,0 +1,290 @@
+"""
+Shared-memory frame pipeline for multi-process live recognition.
+
+Features:
+- SharedFrameRing: fixed-shape image slots in multiprocessing.shared_memory,
+  each guarded by a sequence number (odd while being written) so readers can
+  detect a slot that was overwritten under them
+- Extraction worker processes run low-light enhancement, Haar detection and
+  Hough iris extraction on frames read zero-copy by slot index
+- Iris crops and eye ROIs go back through per-worker slots of two more rings
+- Only (slot, seq) tuples and small metadata dicts travel through queues
+
+The capture loop and Keras inference stay in the parent process; everything
+CPU-bound in pure OpenCV/Python moves out of its GIL.
+
+Usage:
+    pipeline = FramePipeline(workers=4)
+    pipeline.start((480, 640, 3))
+    pipeline.submit(frame)                    # capture thread
+    meta = pipeline.get_result(timeout=1.0)   # consumer thread
+    for eye_region, eye_roi, iris in pipeline.candidates(meta): ...
+    pipeline.stop()
+"""
+
+import logging
+import multiprocessing as mp
+import queue
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFrameRing:
+    """Ring of fixed-shape image slots backed by one shared memory block."""
+
+    def __init__(self, slots: int, frame_shape: Tuple[int, ...], dtype=np.uint8,
+                 name: Optional[str] = None):
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.frame_bytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        header_bytes = 8 * slots
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * self.frame_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self._seq = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf, offset=0)
+        self._frames = np.ndarray((slots,) + self.frame_shape, dtype=self.dtype,
+                                  buffer=self.shm.buf, offset=header_bytes)
+        if self._owner:
+            self._seq[:] = 0
+        self._next_slot = 0
+        self._counter = 0
+
+    def spec(self) -> Tuple:
+        """Picklable description used by other processes to attach."""
+        return (self.shm.name, self.slots, self.frame_shape, self.dtype.str)
+
+    @classmethod
+    def attach(cls, spec: Tuple) -> 'SharedFrameRing':
+        name, slots, frame_shape, dtype = spec
+        return cls(slots, frame_shape, dtype, name=name)
+
+    def write(self, image: np.ndarray, slot: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Copy image into a slot (round-robin unless given) and return (slot, seq).
+
+        Images smaller than the slot shape are written into its top-left corner.
+        A slot must only ever be written by one process.
+        """
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.slots
+        self._counter += 1
+        seq = 2 * self._counter
+        self._seq[slot] = seq - 1  # Odd: write in progress
+        self._frames[slot][:image.shape[0], :image.shape[1]] = image
+        self._seq[slot] = seq
+        return slot, seq
+
+    def read(self, slot: int, seq: int, shape: Optional[Tuple[int, int]] = None) -> Optional[np.ndarray]:
+        """Zero-copy view of a slot, or None if it no longer holds seq."""
+        if self._seq[slot] != seq:
+            return None
+        view = self._frames[slot]
+        if shape is not None:
+            view = view[:shape[0], :shape[1]]
+        return view
+
+    def is_current(self, slot: int, seq: int) -> bool:
+        return self._seq[slot] == seq
+
+    def close(self) -> None:
+        self._seq = None
+        self._frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a view; the mapping goes away with the process
+            pass
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _fit_into(image: np.ndarray, shape: Tuple[int, ...]) -> np.ndarray:
+    """Downscale image (keeping aspect) so it fits a slot of the given shape."""
+    h, w = image.shape[:2]
+    scale = min(1.0, shape[0] / h, shape[1] / w)
+    if scale < 1.0:
+        image = cv2.resize(image, (max(1, int(w * scale)), max(1, int(h * scale))))
+    if image.ndim == 2 and len(shape) == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    return image
+
+
+def _extraction_worker(worker_index: int, frame_spec: Tuple, iris_spec: Tuple, roi_spec: Tuple,
+                       slots_per_worker: int, max_candidates: int,
+                       task_queue, result_queue, stop_event) -> None:
+    """Worker process: detect eyes and extract iris crops for frames named by slot."""
+    # Imported here so spawn-based platforms re-create the cascades inside the
+    # child; eye_extraction pulls in only OpenCV and NumPy
+    from eye_extraction import EyeExtractor
+
+    frames = SharedFrameRing.attach(frame_spec)
+    iris_ring = SharedFrameRing.attach(iris_spec)
+    roi_ring = SharedFrameRing.attach(roi_spec)
+    # No model, GUI or database in workers: detection and extraction only
+    extractor = EyeExtractor()
+    base_slot = worker_index * slots_per_worker
+    written = 0
+
+    try:
+        while not stop_event.is_set():
+            try:
+                task = task_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if task is None:
+                break
+            slot, seq = task
+            frame = frames.read(slot, seq)
+            if frame is None:
+                continue
+            try:
+                candidates = extractor.extract_candidates(frame)
+            except Exception as e:
+                logger.error(f"Pipeline worker {worker_index} extraction error: {e}")
+                continue
+            # Seqlock check: drop results computed from a frame that was overwritten
+            if not frames.is_current(slot, seq):
+                continue
+
+            out = []
+            for region, eye_roi, iris in candidates[:max_candidates]:
+                out_slot = base_slot + written % slots_per_worker
+                written += 1
+                iris = _fit_into(iris, iris_ring.frame_shape)
+                eye_roi = _fit_into(eye_roi, roi_ring.frame_shape)
+                _, iris_seq = iris_ring.write(iris, slot=out_slot)
+                _, roi_seq = roi_ring.write(eye_roi, slot=out_slot)
+                out.append({
+                    'region': tuple(int(v) for v in region),
+                    'slot': out_slot,
+                    'iris_seq': iris_seq,
+                    'iris_shape': iris.shape[:2],
+                    'roi_seq': roi_seq,
+                    'roi_shape': eye_roi.shape[:2],
+                })
+            result_queue.put({'frame_seq': seq, 'worker': worker_index, 'candidates': out})
+    finally:
+        frames.close()
+        iris_ring.close()
+        roi_ring.close()
+
+
+class FramePipeline:
+    """Owns the shared rings, queues and extraction worker processes."""
+
+    def __init__(self, workers: int = 2, queue_size: int = 4, slots_per_worker: int = 8,
+                 max_candidates: int = 4, iris_shape: Tuple[int, int, int] = (128, 128, 3),
+                 roi_shape: Tuple[int, int, int] = (240, 240, 3)):
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.slots_per_worker = slots_per_worker
+        self.max_candidates = max_candidates
+        self.iris_shape = iris_shape
+        self.roi_shape = roi_shape
+        self.frame_shape = None
+        self.frames = None
+        self.iris_ring = None
+        self.roi_ring = None
+        self._processes: List[mp.Process] = []
+        self._ctx = mp.get_context('spawn')
+        self.submitted = 0
+        self.skipped = 0
+
+    def start(self, frame_shape: Tuple[int, int, int]) -> None:
+        self.frame_shape = tuple(frame_shape)
+        # Enough frame slots that a queued or in-flight frame is not overwritten
+        frame_slots = self.queue_size + 2 * self.workers + 2
+        self.frames = SharedFrameRing(frame_slots, self.frame_shape)
+        self.iris_ring = SharedFrameRing(self.workers * self.slots_per_worker, self.iris_shape)
+        self.roi_ring = SharedFrameRing(self.workers * self.slots_per_worker, self.roi_shape)
+
+        self._tasks = self._ctx.Queue(maxsize=self.queue_size)
+        self._results = self._ctx.Queue()
+        self._stop_event = self._ctx.Event()
+        for i in range(self.workers):
+            p = self._ctx.Process(
+                target=_extraction_worker,
+                args=(i, self.frames.spec(), self.iris_ring.spec(), self.roi_ring.spec(),
+                      self.slots_per_worker, self.max_candidates,
+                      self._tasks, self._results, self._stop_event),
+                name=f'IrisExtraction-{i}',
+                daemon=True
+            )
+            p.start()
+            self._processes.append(p)
+        logger.info(f"Frame pipeline started: {self.workers} workers, {frame_slots} frame slots")
+
+    def submit(self, frame: np.ndarray) -> bool:
+        """Copy a frame into shared memory and hand its slot to a worker (non-blocking)."""
+        if self.frames is None or self._tasks.full():
+            self.skipped += 1
+            return False
+        if frame.shape != self.frame_shape:
+            frame = cv2.resize(frame, (self.frame_shape[1], self.frame_shape[0]))
+        slot, seq = self.frames.write(frame)
+        try:
+            self._tasks.put_nowait((slot, seq))
+        except queue.Full:
+            self.skipped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def get_result(self, timeout: float = 1.0) -> Optional[Dict]:
+        try:
+            return self._results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def candidates(self, meta: Dict) -> List[Tuple[Tuple[int, int, int, int], np.ndarray, np.ndarray]]:
+        """
+        Materialize ((x, y, w, h), eye_roi, iris) for a worker result.
+
+        Crops are small, so they are copied out of shared memory and then
+        re-validated; a crop the worker overwrote meanwhile is dropped.
+        """
+        out = []
+        for c in meta.get('candidates', []):
+            slot = c['slot']
+            iris = self.iris_ring.read(slot, c['iris_seq'], c['iris_shape'])
+            roi = self.roi_ring.read(slot, c['roi_seq'], c['roi_shape'])
+            if iris is None or roi is None:
+                continue
+            iris, roi = iris.copy(), roi.copy()
+            if not (self.iris_ring.is_current(slot, c['iris_seq']) and
+                    self.roi_ring.is_current(slot, c['roi_seq'])):
+                continue
+            out.append((c['region'], roi, iris))
+        return out
+
+    def stop(self, timeout: float = 2.0) -> None:
+        if not self._processes:
+            return
+        self._stop_event.set()
+        for _ in self._processes:
+            try:
+                self._tasks.put_nowait(None)
+            except queue.Full:
+                pass
+        for p in self._processes:
+            p.join(timeout=timeout)
+            if p.is_alive():
+                p.terminate()
+        self._processes = []
+        for ring in (self.frames, self.iris_ring, self.roi_ring):
+            if ring is not None:
+                ring.close()
+        self.frames = self.iris_ring = self.roi_ring = None
+        logger.info(f"Frame pipeline stopped ({self.submitted} frames submitted, {self.skipped} skipped)")
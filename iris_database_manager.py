@@ -81,6 +81,29 @@ class IrisDatabaseManager:
             )
         ''')
         
+        # One row per day, so daily stats can be maintained with an UPSERT
+        try:
+            cursor.execute('''
+                SELECT date FROM recognition_stats GROUP BY date HAVING COUNT(*) > 1
+            ''')
+            for (day,) in cursor.fetchall():
+                # Merge duplicate rows left by the old read-then-insert update
+                cursor.execute('''
+                    SELECT MIN(id), SUM(total_attempts), SUM(successful_recognitions), SUM(failed_attempts),
+                           SUM(average_confidence * total_attempts), MAX(unique_users)
+                    FROM recognition_stats WHERE date = ?
+                ''', (day,))
+                keep_id, total, success, failed, conf_total, unique_users = cursor.fetchone()
+                cursor.execute('DELETE FROM recognition_stats WHERE date = ? AND id != ?', (day, keep_id))
+                cursor.execute('''
+                    UPDATE recognition_stats SET total_attempts = ?, successful_recognitions = ?,
+                        failed_attempts = ?, average_confidence = ?, unique_users = ?
+                    WHERE id = ?
+                ''', (total, success, failed, (conf_total / total) if total else 0.0, unique_users, keep_id))
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_recognition_stats_date ON recognition_stats(date)')
+        except Exception as e:
+            print("Error preparing daily stats index: {}".format(e))
+        
         conn.commit()
         conn.close()
     
@@ -139,12 +162,12 @@ class IrisDatabaseManager:
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (person_id, access_type, confidence_score, access_granted, location, device_id, image_path))
             
+            # Update daily statistics in the same transaction
+            self._update_daily_stats(access_granted, confidence_score, cursor)
+            
             conn.commit()
             conn.close()
             
-            # Update daily statistics
-            self._update_daily_stats(access_granted, confidence_score)
-            
             return True
             
         except Exception as e:
@@ -297,38 +320,37 @@ class IrisDatabaseManager:
             print("Error creating template hash: {}".format(e))
             return None
     
-    def _update_daily_stats(self, access_granted, confidence_score):
-        """Update daily statistics"""
+    def _update_daily_stats(self, access_granted, confidence_score, cursor=None):
+        """Update daily statistics with a single UPSERT (optionally on the caller's cursor)"""
+        conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            today = datetime.now().date()
+            if cursor is None:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
             
-            # Check if today's record exists
-            cursor.execute("SELECT id FROM recognition_stats WHERE date = ?", (today,))
-            if cursor.fetchone():
-                # Update existing record
-                cursor.execute('''
-                    UPDATE recognition_stats 
-                    SET total_attempts = total_attempts + 1,
-                        successful_recognitions = successful_recognitions + ?,
-                        failed_attempts = failed_attempts + ?
-                    WHERE date = ?
-                ''', (1 if access_granted else 0, 0 if access_granted else 1, today))
-            else:
-                # Create new record
-                cursor.execute('''
-                    INSERT INTO recognition_stats 
-                    (date, total_attempts, successful_recognitions, failed_attempts)
-                    VALUES (?, 1, ?, ?)
-                ''', (today, 1 if access_granted else 0, 0 if access_granted else 1))
+            today = datetime.now().date().isoformat()
+            granted = 1 if access_granted else 0
             
-            conn.commit()
-            conn.close()
+            cursor.execute('''
+                INSERT INTO recognition_stats 
+                (date, total_attempts, successful_recognitions, failed_attempts, average_confidence)
+                VALUES (?, 1, ?, ?, ?)
+                ON CONFLICT(date) DO UPDATE SET
+                    average_confidence = (average_confidence * total_attempts + excluded.average_confidence)
+                                         / (total_attempts + 1),
+                    total_attempts = total_attempts + 1,
+                    successful_recognitions = successful_recognitions + excluded.successful_recognitions,
+                    failed_attempts = failed_attempts + excluded.failed_attempts
+            ''', (today, granted, 1 - granted, float(confidence_score or 0.0)))
+            
+            if conn is not None:
+                conn.commit()
             
         except Exception as e:
             print("Error updating daily stats: {}".format(e))
+        finally:
+            if conn is not None:
+                conn.close()
 
 # Global database instance
 db = IrisDatabaseManager()
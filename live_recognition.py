@@ -12,6 +12,9 @@ from tkinter import messagebox
 import queue
 import logging
 
+from capture_gallery import CaptureRecord, CaptureRing, GalleryMosaic, encode_jpeg
+from eye_extraction import EyeExtractor
+
 # Import our modules
 try:
     from biometric_utils import getIrisFeatures
@@ -21,7 +24,7 @@ except ImportError:
     print("Warning: Could not import getIrisFeatures from biometric_utils")
 try:
     from performance_monitor import monitor_recognition
-    from database_manager import db
+    from database_manager import db, access_log_writer
     ENHANCED_FEATURES = True
 except ImportError:
     ENHANCED_FEATURES = False
@@ -53,11 +56,13 @@ class LiveIrisRecognition:
         self.successful_recognitions = 0
 
         # Image capture and display
-        self.captured_images = []  # Store captured iris images
+        self.max_captured_images = 50  # Maximum number of images to keep
+        self.captured_images = CaptureRing(self.max_captured_images)  # Fixed-capacity ring of captures
         self.current_iris_image = None  # Current iris image being displayed
+        self._iris_display_cache = None  # (capture, decoded/scaled composite) for the iris window
+        self.capture_jpeg_quality = 90  # Captures are kept in memory as JPEG bytes
         self.show_iris_window = True  # Whether to show iris capture window
         self.show_gallery_window = True  # Whether to show gallery window
-        self.max_captured_images = 50  # Maximum number of images to keep
         self.capture_folder = "captured_iris"  # Folder to save captured images
 
         # Gallery display settings
@@ -65,6 +70,10 @@ class LiveIrisRecognition:
         self.gallery_image_size = 150  # Size of each image in gallery
         self.gallery_update_interval = 15  # Update gallery every N frames (faster updates)
         self.frame_count_since_gallery_update = 0
+        # Tile-cached mosaic: one pre-rendered tile per ring slot
+        self.gallery_mosaic = GalleryMosaic(capacity=self.max_captured_images,
+                                            cols=self.gallery_grid_cols,
+                                            tile_size=self.gallery_image_size)
 
         # Enhanced gallery features
         self.auto_open_gallery = True  # Automatically open gallery when first image is captured
@@ -72,19 +81,23 @@ class LiveIrisRecognition:
         self.show_detailed_analysis = True  # Show detailed analysis in gallery
         self.gallery_analysis_mode = True  # Enhanced analysis mode for gallery
 
-        # Create capture folder if it doesn't exist
+        # Optional multi-process mode: frames go through a shared-memory ring to
+        # extraction worker processes; inference stays in this process
         import os
+        self.use_multiprocessing = False
+        self.pipeline_workers = max(1, (os.cpu_count() or 2) - 2)
+        self.pipeline = None
+        self._latest_eye_boxes = []  # Eye boxes from the newest worker result (for overlay)
+
+        # Create capture folder if it doesn't exist
         if not os.path.exists(self.capture_folder):
             os.makedirs(self.capture_folder)
         
-        # Load face cascade for eye detection
-        try:
-            self.eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
-            self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        except Exception as e:
-            logger.warning(f"Could not load cascade classifiers: {e}")
-            self.eye_cascade = None
-            self.face_cascade = None
+        # Load face cascade for eye detection (detection code lives in eye_extraction,
+        # which the frame pipeline workers import without tkinter or the database)
+        self.eye_extractor = EyeExtractor()
+        self.eye_cascade = self.eye_extractor.eye_cascade
+        self.face_cascade = self.eye_extractor.face_cascade
     
     def start_recognition(self):
         """Start live recognition"""
@@ -110,8 +123,11 @@ class LiveIrisRecognition:
         
         self.is_running = True
         
-        # Start recognition thread
-        self.recognition_thread = threading.Thread(target=self._recognition_worker)
+        # Start recognition thread (fed by the shared-memory pipeline when enabled)
+        worker = self._recognition_worker
+        if self.use_multiprocessing and self._start_pipeline():
+            worker = self._pipeline_result_worker
+        self.recognition_thread = threading.Thread(target=worker)
         self.recognition_thread.daemon = True
         self.recognition_thread.start()
         
@@ -136,9 +152,26 @@ class LiveIrisRecognition:
         if self.recognition_thread and self.recognition_thread.is_alive():
             self.recognition_thread.join(timeout=2.0)
 
+        if self.pipeline is not None:
+            try:
+                self.pipeline.stop()
+            except Exception as e:
+                logger.warning(f"Could not stop frame pipeline: {e}")
+            self.pipeline = None
+
+        # Commit any queued access-log events before the session ends
+        if ENHANCED_FEATURES:
+            try:
+                access_log_writer.flush(timeout=2.0)
+            except Exception as e:
+                logger.warning(f"Could not flush access logs: {e}")
+
         # Print summary of captured images
         if self.captured_images:
-            print(f"\n📸 Session Summary: {len(self.captured_images)} iris images captured")
+            footprint = self.get_memory_footprint()
+            print(f"\n📸 Session Summary: {self.captured_images.total_appended} iris images captured")
+            print(f"   In memory: {footprint['captures']} captures, {footprint['encoded_kb']:.1f}KB encoded "
+                  f"({footprint['raw_kb']:.1f}KB as raw arrays) + {footprint['gallery_kb']:.1f}KB gallery canvas")
             print(f"   Images saved in: {self.capture_folder}/")
             print("   Gallery window showed real-time updates during capture")
             print("   Use 'c' key during live recognition to view captured images")
@@ -167,7 +200,10 @@ class LiveIrisRecognition:
                 frame = cv2.flip(frame, 1)
 
                 # Add frame to processing queue (non-blocking)
-                if not self.frame_queue.full():
+                pipeline = self.pipeline
+                if pipeline is not None:
+                    pipeline.submit(frame)  # Single copy into shared memory
+                elif not self.frame_queue.full():
                     self.frame_queue.put(frame.copy())
 
                 # Check for recognition results
@@ -180,9 +216,12 @@ class LiveIrisRecognition:
                 except Exception as e:
                     logger.error(f"Error processing recognition result: {e}")
 
-                # Detect and highlight eyes
+                # Detect and highlight eyes (workers already detected them in pipeline mode)
                 try:
-                    self._detect_and_highlight_eyes(frame)
+                    if self.pipeline is not None:
+                        self._draw_eye_boxes(frame, self._latest_eye_boxes)
+                    else:
+                        self._detect_and_highlight_eyes(frame)
                 except Exception as e:
                     logger.error(f"Error in eye detection: {e}")
 
@@ -304,36 +343,55 @@ class LiveIrisRecognition:
             except Exception as e:
                 logger.error(f"Error in recognition worker: {e}")
     
+    def _start_pipeline(self):
+        """Start the shared-memory extraction pipeline; fall back to threads on failure"""
+        try:
+            from frame_pipeline import FramePipeline
+            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
+            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+            self.pipeline = FramePipeline(workers=self.pipeline_workers)
+            self.pipeline.start((height, width, 3))
+            print(f"🧵 Multi-process recognition: {self.pipeline_workers} extraction workers")
+            return True
+        except Exception as e:
+            logger.warning(f"Multi-process pipeline unavailable, using threads: {e}")
+            if self.pipeline is not None:
+                try:
+                    self.pipeline.stop()
+                except Exception:
+                    pass
+            self.pipeline = None
+            return False
+
+    def _pipeline_result_worker(self):
+        """Background thread: run inference on crops produced by the worker processes"""
+        while self.is_running:
+            pipeline = self.pipeline
+            if pipeline is None:
+                break
+            try:
+                meta = pipeline.get_result(timeout=1.0)
+                if meta is None:
+                    continue
+                self._latest_eye_boxes = [c['region'] for c in meta['candidates']]
+
+                # Check cooldown
+                current_time = time.time()
+                if current_time - self.last_recognition_time < self.recognition_cooldown:
+                    continue
+                if not self.model or not self.iris_extractor:
+                    continue
+
+                result = self._recognize_candidates(pipeline.candidates(meta))
+                if result:
+                    self.last_recognition_time = current_time
+                    self.result_queue.put(result)
+            except Exception as e:
+                logger.error(f"Error in pipeline result worker: {e}")
+
     def _enhance_low_light(self, frame):
         """Enhance image for low light conditions"""
-        try:
-            # Check brightness
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            mean_brightness = np.mean(gray)
-            
-            # If dark, apply enhancements
-            if mean_brightness < 80:
-                # 1. CLAHE (Contrast Limited Adaptive Histogram Equalization)
-                clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-                
-                # Apply to L channel of LAB
-                lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
-                l, a, b = cv2.split(lab)
-                cl = clahe.apply(l)
-                enhanced_lab = cv2.merge((cl, a, b))
-                enhanced_frame = cv2.cvtColor(enhanced_lab, cv2.COLOR_LAB2BGR)
-                
-                # 2. Gamma Correction if still dark
-                # gamma < 1.0 makes it lighter
-                gamma = 0.5 
-                invGamma = 1.0 / gamma
-                table = np.array([((i / 255.0) ** invGamma) * 255 for i in np.arange(0, 256)]).astype("uint8")
-                final_frame = cv2.LUT(enhanced_frame, table)
-                
-                return final_frame
-            return frame
-        except Exception:
-            return frame
+        return self.eye_extractor.enhance_low_light(frame)
 
     def _process_frame_for_recognition(self, frame):
         """Process frame for iris recognition"""
@@ -341,60 +399,41 @@ class LiveIrisRecognition:
             return None
         
         try:
-            # 1. Try with Enhanced Frame (Low Light)
-            enhanced_frame = self._enhance_low_light(frame.copy())
-            eyes = self._detect_eyes(enhanced_frame)
-            
-            # 2. Fallback: If no eyes found, try Original Frame
-            if eyes is None or len(eyes) == 0:
-                eyes = self._detect_eyes(frame)
-                
-            if eyes is None or len(eyes) == 0:
-                return None
-            
+            return self._recognize_candidates(self._extract_candidates(frame))
+        except Exception as e:
+            logger.error(f"Error processing frame: {e}")
+            return None
+
+    def _extract_candidates(self, frame):
+        """Detect eyes and extract iris crops: [((x, y, w, h), eye_roi, iris_features)]"""
+        return self.eye_extractor.extract_candidates(frame)
+
+    def _recognize_candidates(self, candidates):
+        """Run recognition on extracted candidates; capture, name and log the best match"""
+        try:
             best_result = None
             best_confidence = 0
             
-            for (x, y, w, h) in eyes:
-                # Use the frame that actually worked for extraction? 
-                # Better to use the one where eyes were found to keep coordinates valid.
-                # If found in enhanced, use enhanced. If original, use original.
-                # Simplification: We have 'eyes' coordinates. 
-                # If we used enhanced to find them, the coordinates are valid for original too (geometry is same).
-                # But extraction might be better on enhanced if dark.
-                
-                # Let's extract from Enhanced Frame for consistency in feature quality
-                img_to_process = enhanced_frame
-                
-                # Extract eye region
-                eye_roi = img_to_process[y:y+h, x:x+w]
-                
-                if eye_roi.size == 0:
-                    continue
-                
-                # Extract iris features
-                iris_features = self._extract_iris_from_roi(eye_roi)
-
-                if iris_features is not None:
-                    self.successful_detections += 1
-
-                    # Perform recognition
-                    prediction = self._recognize_iris(iris_features)
-
-                    if prediction and prediction['confidence'] > self.confidence_threshold:
-                        if prediction['confidence'] > best_confidence:
-                            best_confidence = prediction['confidence']
-                            best_result = {
-                                'person_id': prediction['person_id'],
-                                'confidence': prediction['confidence'],
-                                'eye_region': (x, y, w, h),
-                                'timestamp': datetime.now(),
-                                'iris_image': iris_features.copy(),  # Store the iris image
-                                'eye_roi': eye_roi.copy()  # Store the full eye region
-                            }
-
-                            # Capture and save the iris image
-                            self._capture_iris_image(iris_features, eye_roi, prediction)
+            for (x, y, w, h), eye_roi, iris_features in candidates:
+                self.successful_detections += 1
+
+                # Perform recognition
+                prediction = self._recognize_iris(iris_features)
+
+                if prediction and prediction['confidence'] > self.confidence_threshold:
+                    if prediction['confidence'] > best_confidence:
+                        best_confidence = prediction['confidence']
+                        best_result = {
+                            'person_id': prediction['person_id'],
+                            'confidence': prediction['confidence'],
+                            'eye_region': (x, y, w, h),
+                            'timestamp': datetime.now(),
+                            'iris_image': iris_features,  # Freshly allocated by the extractor
+                            'eye_roi': eye_roi  # May be a view into the source frame (not reused)
+                        }
+
+                        # Capture and save the iris image
+                        self._capture_iris_image(iris_features, eye_roi, prediction)
             
             if best_result:
                 self.successful_recognitions += 1
@@ -426,23 +465,17 @@ class LiveIrisRecognition:
                 # Log to database if enhanced features available
                 if ENHANCED_FEATURES:
                     try:
-                        # Attempt to log access. 
-                        # Note: 'webcam_0' might cause FK error if not in devices table.
-                        # Trying without device_id or handling the error gracefully.
-                        # Assuming log_access signature: (person_id, access_type, confidence_score, access_granted, location, device_id)
-                        db.log_access(
+                        # Queued for the batched background writer; unknown person ids
+                        # are filtered there against a cached id set (no FK errors here)
+                        access_log_writer.submit(
                             person_id=best_result['person_id'],
                             access_type='live_recognition',
                             confidence_score=best_result['confidence'],
                             access_granted=True,
                             location='Live Camera'
-                            # device_id omitted to prevent FK error if table enforces it and 'webcam_0' is missing
                         )
                     except Exception as e:
-                        # Log error but don't crash recognition
-                        err_str = str(e)
-                        if "FOREIGN KEY" not in err_str:
-                             logger.warning(f"Database logging failed (non-critical): {e}")
+                        logger.warning(f"Database logging failed (non-critical): {e}")
             
             return best_result
             
@@ -452,107 +485,11 @@ class LiveIrisRecognition:
     
     def _detect_eyes(self, frame):
         """Detect eyes in frame using cascade classifiers"""
-        if not self.eye_cascade:
-             return []
-        
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Relaxed parameters for better recall (1.3, 5 -> 1.1, 3)
-        # First detect faces
-        if self.face_cascade:
-             faces = self.face_cascade.detectMultiScale(gray, 1.1, 3) 
-             
-             eyes = []
-             for (fx, fy, fw, fh) in faces:
-                 face_roi = gray[fy:fy+fh, fx:fx+fw]
-                 # Look for eyes within face
-                 face_eyes = self.eye_cascade.detectMultiScale(face_roi, 1.1, 2) # Very relaxed
-                 
-                 for (ex, ey, ew, eh) in face_eyes:
-                     eyes.append((fx + ex, fy + ey, ew, eh))
-                     
-             if len(eyes) > 0:
-                 return eyes
-                 
-        # If no face-based eyes found, try direct eye detection (Robust Fallback)
-        return self.eye_cascade.detectMultiScale(gray, 1.1, 3)
+        return self.eye_extractor.detect_eyes(frame)
     
     def _extract_iris_from_roi(self, eye_roi):
-        """Extract iris features from eye region - ENHANCED VERSION"""
-        try:
-            # Resize eye region for better processing
-            if eye_roi.shape[0] < 100 or eye_roi.shape[1] < 100:
-                eye_roi = cv2.resize(eye_roi, (150, 150))
-
-            # Convert to grayscale for circle detection
-            gray = cv2.cvtColor(eye_roi, cv2.COLOR_BGR2GRAY) if len(eye_roi.shape) == 3 else eye_roi
-
-            # Enhance contrast
-            gray = cv2.equalizeHist(gray)
-            gray = cv2.medianBlur(gray, 5)
-
-            # Detect circles (iris/pupil)
-            circles = cv2.HoughCircles(
-                gray,
-                cv2.HOUGH_GRADIENT,
-                dp=1,
-                minDist=int(gray.shape[0]/4),
-                param1=50,
-                param2=30,
-                minRadius=int(gray.shape[0]/8),
-                maxRadius=int(gray.shape[0]/3)
-            )
-
-            if circles is not None:
-                circles = np.round(circles[0, :]).astype("int")
-
-                # Find the best circle
-                best_circle = None
-                max_radius = 0
-
-                for (x, y, r) in circles:
-                    if r > max_radius and x-r > 0 and y-r > 0 and x+r < gray.shape[1] and y+r < gray.shape[0]:
-                        max_radius = r
-                        best_circle = (x, y, r)
-
-                if best_circle is not None:
-                    x, y, r = best_circle
-
-                    # Create mask for iris region
-                    mask = np.zeros(gray.shape, np.uint8)
-                    cv2.circle(mask, (x, y), r, 255, -1)
-
-                    # Extract iris region
-                    iris_region = cv2.bitwise_and(gray, gray, mask=mask)
-
-                    # Crop to bounding box
-                    crop_x = max(0, x - r)
-                    crop_y = max(0, y - r)
-                    crop_w = min(gray.shape[1] - crop_x, 2 * r)
-                    crop_h = min(gray.shape[0] - crop_y, 2 * r)
-
-                    cropped_iris = iris_region[crop_y:crop_y+crop_h, crop_x:crop_x+crop_w]
-
-                    if cropped_iris.size > 0:
-                        # Resize to standard size
-                        cropped_iris = cv2.resize(cropped_iris, (128, 128))
-
-                        # Convert back to color for model compatibility
-                        if len(cropped_iris.shape) == 2:
-                            cropped_iris = cv2.cvtColor(cropped_iris, cv2.COLOR_GRAY2BGR)
-
-                        return cropped_iris
-
-            # If no iris detected, return resized eye region
-            eye_roi_resized = cv2.resize(eye_roi, (128, 128))
-            if len(eye_roi_resized.shape) == 2:
-                eye_roi_resized = cv2.cvtColor(eye_roi_resized, cv2.COLOR_GRAY2BGR)
-
-            return eye_roi_resized
-
-        except Exception as e:
-            logger.error(f"Error extracting iris: {e}")
-            return None
+        """Extract iris features from eye region"""
+        return self.eye_extractor.extract_iris_from_roi(eye_roi)
     
     @monitor_recognition
     def _recognize_iris(self, iris_features):
@@ -582,8 +519,10 @@ class LiveIrisRecognition:
     
     def _detect_and_highlight_eyes(self, frame):
         """Detect and highlight eyes in frame"""
-        eyes = self._detect_eyes(frame)
-        
+        self._draw_eye_boxes(frame, self._detect_eyes(frame))
+
+    def _draw_eye_boxes(self, frame, eyes):
+        """Highlight already-detected eye boxes"""
         for (x, y, w, h) in eyes:
             # Draw rectangle around eye
             cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
@@ -772,9 +711,11 @@ class LiveIrisRecognition:
             # Sanitize name for filename
             clean_name = "".join([c for c in name if c.isalnum() or c in (' ', '_', '-')]).strip().replace(' ', '_')
             
-            # Save the composite image
+            # Encode once: the same JPEG bytes are saved to disk and kept in memory
+            composite_jpeg = encode_jpeg(composite, self.capture_jpeg_quality)
             filename = f"{self.capture_folder}/iris_person{person_id}_{clean_name}_{timestamp}.jpg"
-            cv2.imwrite(filename, composite)
+            with open(filename, 'wb') as f:
+                f.write(composite_jpeg)
 
             # Auto-sync to dataset folder
             try:
@@ -784,39 +725,39 @@ class LiveIrisRecognition:
 
             # Calculate additional analysis metrics
             analysis_data = self._calculate_image_analysis(iris_image, eye_roi, confidence)
+            analysis_data['file_size_kb'] = len(composite_jpeg) / 1024  # Actual encoded size
+
+            # Store in memory as a compact JPEG-backed record; decoded only for display
+            capture_data = CaptureRecord(
+                composite, iris_image, eye_roi,
+                person_id=person_id,
+                name=name,
+                confidence=confidence,
+                timestamp=timestamp,
+                filename=filename,
+                analysis=analysis_data,  # Enhanced analysis data
+                capture_time=datetime.now(),  # Full datetime object
+                session_number=self.captured_images.total_appended + 1,  # Image number in session
+                jpeg_quality=self.capture_jpeg_quality,
+                composite_jpeg=composite_jpeg
+            )
 
-            # Store in memory for display with enhanced analysis
-            capture_data = {
-                'composite': composite,
-                'iris_image': iris_image,
-                'eye_roi': eye_roi,
-                'person_id': person_id,
-                'name': name,
-                'confidence': confidence,
-                'timestamp': timestamp,
-                'filename': filename,
-                'analysis': analysis_data,  # Enhanced analysis data
-                'capture_time': datetime.now(),  # Full datetime object
-                'session_number': len(self.captured_images) + 1  # Image number in session
-            }
-
-            self.captured_images.append(capture_data)
-
-            # Keep only the most recent images
-            if len(self.captured_images) > self.max_captured_images:
-                self.captured_images.pop(0)
+            # Ring append evicts the oldest capture once full; only its tile is replaced
+            slot, evicted = self.captured_images.append(capture_data)
+            self.gallery_mosaic.put(slot, capture_data, evicted, composite=composite)
 
             # Update current display
             self.current_iris_image = capture_data
 
             # Auto-open gallery window on first capture
-            if self.auto_open_gallery and not self.gallery_opened and len(self.captured_images) == 1:
+            auto_open = (self.auto_open_gallery and not self.gallery_opened and
+                         len(self.captured_images) == 1)
+            if auto_open:
                 self.gallery_opened = True
                 print("🖼️ Auto-opening gallery window for real-time viewing...")
-                self._update_enhanced_gallery_window()
 
             # Force immediate gallery update for real-time feedback
-            if self.show_gallery_window:
+            if auto_open or self.show_gallery_window:
                 self._update_enhanced_gallery_window()
 
             print(f"📸 Iris captured: Person {person_id} (Confidence: {confidence:.2f}) -> {filename}")
@@ -924,15 +865,20 @@ class LiveIrisRecognition:
     def _update_iris_display(self):
         """Update the iris display window"""
         if self.current_iris_image is not None:
-            display_image = self.current_iris_image['composite'].copy()
-
-            # Resize for better visibility
-            height, width = display_image.shape[:2]
-            if width < 400:
-                scale = 400 / width
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                display_image = cv2.resize(display_image, (new_width, new_height))
+            # Decode and scale each capture once; later frames reuse the result
+            cached = self._iris_display_cache
+            if cached is None or cached[0] is not self.current_iris_image:
+                display_image = self.current_iris_image['composite']
+
+                # Resize for better visibility
+                height, width = display_image.shape[:2]
+                if width < 400:
+                    scale = 400 / width
+                    new_width = int(width * scale)
+                    new_height = int(height * scale)
+                    display_image = cv2.resize(display_image, (new_width, new_height))
+                cached = self._iris_display_cache = (self.current_iris_image, display_image)
+            display_image = cached[1]
 
             try:
                 cv2.imshow('Captured Iris', display_image)
@@ -949,123 +895,8 @@ class LiveIrisRecognition:
             return
 
         try:
-            # Calculate grid dimensions
-            total_images = len(self.captured_images)
-            grid_cols = min(self.gallery_grid_cols, total_images)
-            grid_rows = (total_images + grid_cols - 1) // grid_cols
-
-            # Calculate window dimensions (larger for analysis info)
-            img_size = self.gallery_image_size
-            padding = 15
-            header_height = 60
-            analysis_height = 80  # Extra space for analysis info
-
-            window_width = grid_cols * img_size + (grid_cols + 1) * padding
-            window_height = grid_rows * (img_size + analysis_height) + (grid_rows + 1) * padding + header_height
-
-            # Create enhanced gallery canvas
-            gallery = np.zeros((window_height, window_width, 3), dtype=np.uint8)
-            gallery.fill(25)  # Darker background for better contrast
-
-            # Add enhanced header with session info
-            header_text = f"🖼️ Enhanced Iris Gallery - {total_images} Images"
-            cv2.putText(gallery, header_text, (padding, 25),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-
-            # Add session statistics
-            if total_images > 0:
-                avg_confidence = sum(img['confidence'] for img in self.captured_images) / total_images
-                avg_quality = sum(img.get('analysis', {}).get('quality_score', 0) for img in self.captured_images) / total_images
-                stats_text = f"Avg Confidence: {avg_confidence:.1f}% | Avg Quality: {avg_quality:.1f}%"
-                cv2.putText(gallery, stats_text, (padding, 45),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
-
-            # Add timestamp
-            timestamp_text = f"Live Updates: {datetime.now().strftime('%H:%M:%S')}"
-            cv2.putText(gallery, timestamp_text, (window_width - 200, 25),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 255, 150), 1)
-
-            # Add captured images to grid with analysis
-            for i, capture_data in enumerate(self.captured_images):
-                row = i // grid_cols
-                col = i % grid_cols
-
-                # Calculate position
-                x_pos = col * img_size + (col + 1) * padding
-                y_pos = row * (img_size + analysis_height) + (row + 1) * padding + header_height
-
-                # Resize and add image
-                try:
-                    img_resized = cv2.resize(capture_data['composite'], (img_size, img_size//2))
-                    gallery[y_pos:y_pos+img_size//2, x_pos:x_pos+img_size] = img_resized
-
-                    # Add image border
-                    cv2.rectangle(gallery, (x_pos-1, y_pos-1),
-                                 (x_pos+img_size+1, y_pos+img_size//2+1), (100, 100, 100), 1)
-
-                    # Add detailed analysis information
-                    analysis = capture_data.get('analysis', {})
-
-                    # Line 1: Person ID and Name
-                    info_y = y_pos + img_size//2 + 15
-                    name = capture_data.get('name', 'Unknown')
-                    # Truncate name if too long
-                    if len(name) > 15: name = name[:13] + "..."
-                    person_text = f"#{capture_data.get('session_number', i+1)} {name} (ID:{capture_data['person_id']})"
-                    cv2.putText(gallery, person_text, (x_pos, info_y),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.35, (255, 255, 255), 1)
-
-                    # Line 2: Confidence and Quality
-                    info_y += 15
-                    conf_quality_text = f"Conf: {capture_data['confidence']:.1f}% | Qual: {analysis.get('quality_score', 0):.1f}%"
-                    cv2.putText(gallery, conf_quality_text, (x_pos, info_y),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.35, (150, 255, 150), 1)
-
-                    # Line 3: Dimensions and Clarity
-                    info_y += 15
-                    dims_text = f"Size: {analysis.get('iris_dimensions', 'N/A')} | Clarity: {analysis.get('clarity_score', 0):.1f}%"
-                    cv2.putText(gallery, dims_text, (x_pos, info_y),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.35, (200, 200, 255), 1)
-
-                    # Line 4: Timestamp
-                    info_y += 15
-                    time_text = capture_data['timestamp'][-8:]  # Last 8 chars (HHMMSS_mmm)
-                    cv2.putText(gallery, f"Time: {time_text}", (x_pos, info_y),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.35, (255, 200, 150), 1)
-
-                    # Quality indicator bar
-                    quality_score = analysis.get('quality_score', 0)
-                    bar_width = int((img_size - 20) * quality_score / 100)
-                    bar_y = y_pos + img_size//2 + analysis_height - 10
-
-                    # Background bar
-                    cv2.rectangle(gallery, (x_pos + 10, bar_y),
-                                 (x_pos + img_size - 10, bar_y + 5), (50, 50, 50), -1)
-
-                    # Quality bar (color based on quality)
-                    if quality_score >= 80:
-                        bar_color = (0, 255, 0)  # Green
-                    elif quality_score >= 60:
-                        bar_color = (0, 255, 255)  # Yellow
-                    else:
-                        bar_color = (0, 100, 255)  # Orange
-
-                    cv2.rectangle(gallery, (x_pos + 10, bar_y),
-                                 (x_pos + 10 + bar_width, bar_y + 5), bar_color, -1)
-
-                except Exception as e:
-                    logger.error(f"Error adding image {i} to enhanced gallery: {e}")
-
-            # Add enhanced instructions at bottom
-            instructions_y = window_height - 25
-            instructions = "🎮 Controls: 'g' toggle | 'f' refresh | 'c' full view | 'i' iris window"
-            cv2.putText(gallery, instructions, (padding, instructions_y),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (180, 180, 180), 1)
-
-            # Add real-time indicator
-            indicator_text = "🔴 LIVE"
-            cv2.putText(gallery, indicator_text, (window_width - 80, instructions_y),
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 255), 1)
+            # Tiles are blitted once per capture; only the header is refreshed here
+            gallery = self.gallery_mosaic.frame(self.captured_images.total_appended)
 
             # Display enhanced gallery window
             try:
@@ -1206,6 +1037,18 @@ class LiveIrisRecognition:
         except Exception as e:
             logger.error(f"Error showing captured images: {e}")
     
+    def get_memory_footprint(self):
+        """Get the live memory held by in-session captures (O(1), no decoding)"""
+        encoded = self.captured_images.nbytes
+        gallery = self.gallery_mosaic.canvas.nbytes
+        return {
+            'captures': len(self.captured_images),
+            'encoded_kb': encoded / 1024,
+            'raw_kb': self.captured_images.raw_nbytes / 1024,
+            'gallery_kb': gallery / 1024,
+            'total_kb': (encoded + gallery) / 1024
+        }
+
     def get_statistics(self):
         """Get current recognition statistics"""
         return {
@@ -1213,11 +1056,16 @@ class LiveIrisRecognition:
             'successful_detections': self.successful_detections,
             'successful_recognitions': self.successful_recognitions,
             'detection_rate': self.successful_detections / max(1, self.total_frames) * 100,
-            'recognition_rate': self.successful_recognitions / max(1, self.successful_detections) * 100
+            'recognition_rate': self.successful_recognitions / max(1, self.successful_detections) * 100,
+            'capture_memory_kb': self.get_memory_footprint()['total_kb']
         }
 
-def start_live_recognition(model=None, iris_extractor=None):
-    """Start live iris recognition system - IMPROVED VERSION"""
+def start_live_recognition(model=None, iris_extractor=None, multiprocess=False):
+    """Start live iris recognition system - IMPROVED VERSION
+
+    multiprocess=True moves eye detection and iris extraction into worker
+    processes fed through a shared-memory frame ring (see frame_pipeline).
+    """
     live_system = None
     try:
         # Check if camera is available first
@@ -1246,6 +1094,7 @@ def start_live_recognition(model=None, iris_extractor=None):
             print("👁️  Iris extractor ready")
 
         live_system = LiveIrisRecognition(model, iris_extractor)
+        live_system.use_multiprocessing = multiprocess
 
         print("\n🚀 Starting live iris recognition...")
         print("📋 Controls:")
@@ -0,0 +1,309 @@
+"""
+Bulk receipt regeneration from voting_system.db.
+
+Features:
+- Streams votes in id order in chunks (one read cursor, never the whole
+  table in memory) and renders them in a process pool; each worker renders
+  from its own cached receipt template
+- 'zip' mode: receipts (PDF or JPEG) go straight into compressed archive
+  parts of part_size receipts each, listed in manifest.jsonl with SHA-256
+- 'booth-pdf' mode: one multi-page PDF per booth (booth from vote_sources
+  after a central merge, else 'local'), written page by page as JPEG images
+  so memory stays flat however many pages a booth has
+- Each receipt embeds its vote Merkle inclusion proof against the tree
+  root taken at the start of the run (also recorded in the manifest)
+- Resumable: a checkpoint (last vote id, open PDF state) is written after
+  every completed part; a re-run continues after it, and a run after new
+  votes were cast only renders those
+- Progress callback with receipts/s and ETA
+
+Usage:
+    report = regenerate_receipts('voting_system.db', 'receipt_export', mode='zip', workers=4)
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import receipt_generator
+from vote_merkle import VoteMerkle, encode_proof
+
+CHECKPOINT_FILE = 'checkpoint.json'
+MANIFEST_FILE = 'manifest.jsonl'
+
+# Page size of a receipt at its 150 DPI canvas, in PDF points
+_PAGE_W = receipt_generator.WIDTH * 72.0 / 150
+_PAGE_H = receipt_generator.HEIGHT * 72.0 / 150
+
+
+def _render_chunk(task) -> List[Dict]:
+    """
+    Worker: render one chunk of vote rows to encoded receipt bytes, each with
+    its inclusion proof against the vote Merkle tree of tree_size leaves
+    """
+    rows, kind, generated, db_path, tree_size = task
+    generated = datetime.datetime.fromisoformat(generated)
+    tree = VoteMerkle()
+    conn = sqlite3.connect(db_path, timeout=30)
+    results = []
+    try:
+        for vote_id, vote_hash, person_id, election_id, booth_id, timestamp, confidence, party_name, party_symbol, \
+                election, username in rows:
+            proof = tree.proof(conn, vote_hash, tree_size) if tree_size else None
+            if proof is not None:
+                proof['compact'] = encode_proof(proof)
+            img = receipt_generator.render_receipt(
+                person_id, username or 'Voter {}'.format(person_id), party_name or 'Unknown', party_symbol or '',
+                str(timestamp), float(confidence), election or 'General', generated=generated, proof=proof)
+            data = receipt_generator.encode_receipt(img, 'pdf' if kind == 'pdf' else 'jpg', proof, quality=90)
+            results.append({'vote_id': vote_id, 'person_id': person_id, 'election_id': election_id,
+                            'booth_id': booth_id, 'data': data, 'sha256': hashlib.sha256(data).hexdigest(),
+                            'proof': proof['compact'] if proof else None})
+    finally:
+        conn.close()
+    return results
+
+
+class _PdfStream:
+    """
+    Multi-page PDF of full-page JPEG images, appended one page at a time.
+    Its state (size and object offsets) fits in the checkpoint, so a resumed
+    run truncates back to it and carries on.
+    """
+
+    def __init__(self, path: str, state: Optional[Dict] = None):
+        self.path = path
+        if state:
+            self.offsets = state['offsets']
+            self.pages = state['pages']
+            self.f = open(path, 'r+b')
+            self.f.truncate(state['size'])
+            self.f.seek(state['size'])
+        else:
+            self.offsets = [None, None, None]  # Objects 1 (catalog) and 2 (page tree) are written at close
+            self.pages = 0
+            self.f = open(path, 'wb')
+            self.f.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _object(self, body: bytes, stream: Optional[bytes] = None) -> int:
+        number = len(self.offsets)
+        self.offsets.append(self.f.tell())
+        self.f.write(b'%d 0 obj\n' % number + body)
+        if stream is not None:
+            self.f.write(b'\nstream\n' + stream + b'\nendstream')
+        self.f.write(b'\nendobj\n')
+        return number
+
+    def add_jpeg(self, data: bytes) -> int:
+        image = self._object(b'<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB '
+                             b'/BitsPerComponent 8 /Filter /DCTDecode /Length %d >>'
+                             % (receipt_generator.WIDTH, receipt_generator.HEIGHT, len(data)), data)
+        content = b'q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q' % (_PAGE_W, _PAGE_H)
+        contents = self._object(b'<< /Length %d >>' % len(content), content)
+        self._object(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources << /XObject << /Im0 %d 0 R >> >> '
+                     b'/Contents %d 0 R >>' % (_PAGE_W, _PAGE_H, image, contents))
+        self.pages += 1
+        return self.pages
+
+    def state(self) -> Dict:
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return {'size': self.f.tell(), 'offsets': list(self.offsets), 'pages': self.pages}
+
+    def close(self) -> None:
+        """Write the page tree, catalog and xref (the checkpointed state stays resumable)"""
+        kids = b' '.join(b'%d 0 R' % n for n in range(5, len(self.offsets), 3))
+        for number, body in ((2, b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, self.pages)),
+                             (1, b'<< /Type /Catalog /Pages 2 0 R >>')):
+            self.offsets[number] = self.f.tell()
+            self.f.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+        xref = self.f.tell()
+        self.f.write(b'xref\n0 %d\n0000000000 65535 f \n' % len(self.offsets))
+        for offset in self.offsets[1:]:
+            self.f.write(b'%010d 00000 n \n' % offset)
+        self.f.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(self.offsets), xref))
+        self.f.close()
+
+
+def _vote_query(conn: sqlite3.Connection, people_db: Optional[str]) -> str:
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    booth = "COALESCE(s.booth_id, 'local')" if 'vote_sources' in tables else "'local'"
+    sources = 'LEFT JOIN vote_sources s ON s.vote_hash = v.vote_hash' if 'vote_sources' in tables else ''
+    username, people = 'NULL', ''
+    if people_db and os.path.exists(people_db):
+        conn.execute('ATTACH DATABASE ? AS people', (people_db,))
+        username, people = 'pp.name', 'LEFT JOIN people.persons pp ON pp.id = v.person_id'
+    return '''
+        SELECT v.id, v.vote_hash, v.person_id, v.election_id, {booth}, v.timestamp, v.confidence_score,
+               p.name, p.symbol, e.name, {username}
+        FROM votes v
+        LEFT JOIN parties p ON p.id = v.party_id
+        LEFT JOIN elections e ON e.id = v.election_id
+        {sources} {people}
+        WHERE v.id > ? ORDER BY v.id
+    '''.format(booth=booth, username=username, sources=sources, people=people)
+
+
+def _load_checkpoint(out_dir: str, mode: str, kind: str) -> Dict:
+    path = os.path.join(out_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return {'mode': mode, 'kind': kind, 'last_vote_id': 0, 'receipts': 0, 'parts': 0, 'pdfs': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    if (checkpoint['mode'], checkpoint['kind']) != (mode, kind):
+        raise ValueError('{} holds a {} ({}) export; use another output directory'.format(
+            out_dir, checkpoint['mode'], checkpoint['kind']))
+    return checkpoint
+
+
+def _save_checkpoint(out_dir: str, checkpoint: Dict) -> None:
+    tmp = os.path.join(out_dir, CHECKPOINT_FILE + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(out_dir, CHECKPOINT_FILE))
+
+
+def _trim_manifest(out_dir: str, last_vote_id: int) -> None:
+    """Drop manifest lines written after the checkpoint by an interrupted run"""
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line for line in f if line.strip() and json.loads(line)['vote_id'] <= last_vote_id]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines)
+
+
+def regenerate_receipts(db_path: str, out_dir: str, mode: str = 'zip', kind: str = 'pdf',
+                        chunk_size: int = 32, part_size: int = 1000, workers: Optional[int] = None,
+                        people_db: Optional[str] = None,
+                        progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Render receipts for every vote after the checkpoint in out_dir.
+    mode 'zip' writes `kind` ('pdf' or 'jpeg') receipts into archive parts;
+    mode 'booth-pdf' appends pages to one PDF per booth. Returns a report.
+    """
+    if mode not in ('zip', 'booth-pdf'):
+        raise ValueError('mode must be zip or booth-pdf')
+    kind = 'jpeg' if mode == 'booth-pdf' else kind
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint = _load_checkpoint(out_dir, mode, kind)
+    _trim_manifest(out_dir, checkpoint['last_vote_id'])
+    generated = datetime.datetime.now().isoformat(timespec='seconds')
+
+    conn = sqlite3.connect(db_path, timeout=30)
+    query = _vote_query(conn, people_db)
+    total = conn.execute('SELECT COUNT(*) FROM votes WHERE id > ?', (checkpoint['last_vote_id'],)).fetchone()[0]
+    # Every receipt of this run proves inclusion against the same published root
+    try:
+        tree_size, tree_root = VoteMerkle().root(conn)
+    except sqlite3.OperationalError:
+        tree_size, tree_root = 0, None  # Database without the vote Merkle tables
+    cursor = conn.execute(query, (checkpoint['last_vote_id'],))
+
+    report = {'mode': mode, 'kind': kind, 'out_dir': out_dir, 'resumed_after': checkpoint['last_vote_id'],
+              'todo': total, 'rendered': 0, 'bytes': 0, 'parts': 0,
+              'merkle': {'tree_size': tree_size, 'root': tree_root}}
+    pdfs = {}
+    for booth_id, state in checkpoint['pdfs'].items():
+        pdfs[booth_id] = _PdfStream(os.path.join(out_dir, 'booth-{}.pdf'.format(booth_id)), state)
+    part = {'zip': None, 'entries': [], 'last_vote_id': checkpoint['last_vote_id']}
+    manifest = open(os.path.join(out_dir, MANIFEST_FILE), 'a', encoding='utf-8')
+    start = time.perf_counter()
+
+    def open_part():
+        number = checkpoint['parts'] + 1
+        part['name'] = 'receipts-{:05d}.zip'.format(number)
+        # 'w' also replaces a .tmp part left by an interrupted run
+        part['zip'] = zipfile.ZipFile(os.path.join(out_dir, part['name'] + '.tmp'), 'w', zipfile.ZIP_DEFLATED)
+
+    def complete_part():
+        """Make everything since the last checkpoint durable, then move the checkpoint"""
+        if not part['entries']:
+            return
+        if part['zip'] is not None:
+            part['zip'].writestr('manifest.json', json.dumps(part['entries'], indent=1))
+            part['zip'].close()
+            os.replace(os.path.join(out_dir, part['name'] + '.tmp'), os.path.join(out_dir, part['name']))
+            part['zip'] = None
+            checkpoint['parts'] += 1
+            report['parts'] += 1
+        for entry in part['entries']:
+            manifest.write(json.dumps(entry) + '\n')
+        manifest.flush()
+        os.fsync(manifest.fileno())
+        checkpoint['pdfs'] = {booth_id: pdf.state() for booth_id, pdf in pdfs.items()}
+        checkpoint['last_vote_id'] = part['last_vote_id']
+        checkpoint['receipts'] += len(part['entries'])
+        checkpoint['updated_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+        _save_checkpoint(out_dir, checkpoint)
+        part['entries'] = []
+
+    def write(result):
+        booth_id = result['booth_id']
+        entry = {k: result[k] for k in ('vote_id', 'person_id', 'election_id', 'booth_id', 'sha256', 'proof')}
+        entry.update(bytes=len(result['data']), merkle_root=tree_root)
+        if mode == 'zip':
+            if part['zip'] is None:
+                open_part()
+            name = '{}/vote_receipt_{}_{}.{}'.format(booth_id, result['person_id'], result['vote_id'],
+                                                     'pdf' if kind == 'pdf' else 'jpg')
+            # Encoded receipts are already compressed; deflating them again only costs time
+            part['zip'].writestr(name, result['data'], compress_type=zipfile.ZIP_STORED)
+            entry.update(file=name, part=part['name'])
+        else:
+            pdf = pdfs.get(booth_id)
+            if pdf is None:
+                pdf = pdfs[booth_id] = _PdfStream(os.path.join(out_dir, 'booth-{}.pdf'.format(booth_id)))
+            entry.update(file=os.path.basename(pdf.path), page=pdf.add_jpeg(result['data']))
+        part['entries'].append(entry)
+        part['last_vote_id'] = result['vote_id']
+        report['rendered'] += 1
+        report['bytes'] += entry['bytes']
+        if len(part['entries']) >= part_size:
+            complete_part()
+
+    try:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            window = 2 * workers
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if rows:
+                    pending.append(pool.submit(_render_chunk, (rows, kind, generated, db_path, tree_size)))
+                # Results are consumed in vote order so the checkpoint is a single vote id
+                while pending and (len(pending) >= window or not rows):
+                    for result in pending.popleft().result():
+                        write(result)
+                    if progress is not None:
+                        elapsed = time.perf_counter() - start
+                        rate = report['rendered'] / elapsed if elapsed > 0 else 0.0
+                        progress({'rendered': report['rendered'], 'todo': total, 'rate': rate,
+                                  'eta': (total - report['rendered']) / rate if rate else None})
+                if not rows:
+                    break
+        complete_part()
+    finally:
+        manifest.close()
+        if part['zip'] is not None:
+            part['zip'].close()  # Incomplete part: left as .tmp and redone on resume
+        conn.close()
+
+    for pdf in pdfs.values():
+        pdf.close()
+    report['seconds'] = time.perf_counter() - start
+    report['receipts_per_sec'] = report['rendered'] / report['seconds'] if report['seconds'] > 0 else 0.0
+    report['total_receipts'] = checkpoint['receipts']
+    report['files'] = sorted(os.path.basename(p.path) for p in pdfs.values()) if mode == 'booth-pdf' else \
+        ['receipts-{:05d}.zip'.format(n) for n in range(1, checkpoint['parts'] + 1)]
+    return report
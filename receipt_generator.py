@@ -1,13 +1,195 @@
 
+import io
 import os
 import json
+import hashlib
 import datetime
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont
 
-def generate_pdf_receipt(person_id, username, party_name, party_symbol, timestamp, confidence_score, election="General"):
+# Canvas: A4 at ~150 DPI
+WIDTH = 1240
+HEIGHT = 1754
+
+# Premium Colors
+NAVY_BLUE = (15, 23, 42)     # Slate 900
+SKY_BLUE = (56, 189, 248)    # Sky 400
+GOLD = (245, 158, 11)        # Amber 500
+LIGHT_GRAY = (241, 245, 249)  # Slate 100
+TEXT_DARK = (30, 41, 59)     # Slate 800
+
+# Font candidates (standard Windows fonts first) and sizes
+FONT_SPECS = {
+    'title': (("seguiemj.ttf", "arialbd.ttf"), 60),  # Segoe UI Emoji for party symbols if available
+    'header': (("arialbd.ttf",), 45),
+    'label': (("arial.ttf",), 30),
+    'value': (("arialbd.ttf",), 30),
+    'footer': (("ariali.ttf",), 22),
+}
+
+# Layout
+BOX_X, BOX_Y = 100, 350
+BOX_W, BOX_H = WIDTH - 200, 1000
+ROW_Y = BOX_Y + 60
+ROW_STEP = 100
+FIELD_LABELS = ("Voter Name", "Voter ID", "Date & Time", "Election", "Transaction Hash")
+VOTE_Y = ROW_Y + ROW_STEP * len(FIELD_LABELS) + 50
+QR_SIZE, QR_X, QR_Y = 150, 100, HEIGHT - 150 - 20
+FOOTER_X = 300
+
+RECEIPT_DIR = "receipts"
+
+
+@lru_cache(maxsize=None)
+def load_font(candidates, size):
+    """First loadable font of the candidates (cached: the fallback search runs once per font)"""
+    for name in candidates:
+        try:
+            return ImageFont.truetype(name, size)
+        except Exception:
+            continue
+    return ImageFont.load_default()
+
+
+def _fonts():
+    return {role: load_font(names, size) for role, (names, size) in FONT_SPECS.items()}
+
+
+@lru_cache(maxsize=16)
+def receipt_template(election="General"):
+    """
+    The static part of a receipt for one election: header, icon, watermark,
+    details box with labels and separators, vote banner, QR box and fixed
+    footer text. Rendered once and copied for every receipt.
+    """
+    fonts = _fonts()
+    img = Image.new('RGB', (WIDTH, HEIGHT), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+
+    # Header Background and Accent Line
+    draw.rectangle([(0, 0), (WIDTH, 220)], fill=NAVY_BLUE)
+    draw.rectangle([(0, 220), (WIDTH, 230)], fill=SKY_BLUE)
+
+    # Title
+    draw.text((80, 60), "OFFICIAL", font=fonts['header'], fill=SKY_BLUE)
+    draw.text((80, 120), "VOTING RECEIPT", font=fonts['title'], fill=(255, 255, 255))
+
+    # Logo / Icon (check circle)
+    icon_x, icon_y = WIDTH - 180, 110
+    r = 70
+    draw.ellipse([(icon_x-r, icon_y-r), (icon_x+r, icon_y+r)], outline=GOLD, width=5)
+    draw.text((icon_x-25, icon_y-35), "✔", font=fonts['title'], fill=GOLD)
+
+    # Watermark
+    cx, cy = WIDTH//2, HEIGHT//2 + 100
+    wr = 350
+    draw.ellipse([(cx-wr, cy-wr), (cx+wr, cy+wr)], outline=LIGHT_GRAY, width=20)
+
+    # Details Container
+    draw.rectangle([(BOX_X, BOX_Y), (BOX_X+BOX_W, BOX_Y+BOX_H)], fill=LIGHT_GRAY)
+    draw.rectangle([(BOX_X, BOX_Y), (BOX_X+BOX_W, BOX_Y+BOX_H)], outline=NAVY_BLUE, width=2)
+
+    # Field labels and separators (the election is fixed per template)
+    for i, label in enumerate(FIELD_LABELS):
+        curr_y = ROW_Y + i * ROW_STEP
+        draw.text((BOX_X + 60, curr_y), label.upper(), font=fonts['label'], fill=TEXT_DARK)
+        if label == "Election":
+            draw.text((BOX_X + 400, curr_y), str(election), font=fonts['value'], fill=NAVY_BLUE)
+        if i < len(FIELD_LABELS) - 1:
+            line_y = curr_y + 60
+            draw.line([(BOX_X + 40, line_y), (BOX_X + BOX_W - 40, line_y)], fill=(200, 200, 200), width=1)
+
+    # Vote banner
+    draw.rectangle([(BOX_X, VOTE_Y), (BOX_X+BOX_W, VOTE_Y + 250)], fill=NAVY_BLUE)
+    draw.text((WIDTH//2 - 120, VOTE_Y + 30), "VOTE CAST FOR", font=fonts['header'], fill=SKY_BLUE)
+
+    # QR Code placeholder (Box)
+    draw.rectangle([(QR_X, QR_Y), (QR_X+QR_SIZE, QR_Y+QR_SIZE)], outline=TEXT_DARK, width=2)
+    draw.text((QR_X + 40, QR_Y + 60), "QR", font=fonts['title'], fill=TEXT_DARK)
+    draw.text((FOOTER_X, QR_Y + 20), "This receipt is an official record of your encrypted vote.",
+              font=fonts['footer'], fill=TEXT_DARK)
+
+    # Blue bottom bar
+    draw.rectangle([(0, HEIGHT-40), (WIDTH, HEIGHT)], fill=NAVY_BLUE)
+    return img
+
+
+def transaction_hash(timestamp, person_id):
+    """Short receipt transaction code; stable across processes so regenerated receipts match"""
+    digest = hashlib.sha256((str(timestamp) + str(person_id)).encode('utf-8')).digest()
+    return f"TX-{int.from_bytes(digest[:8], 'big') % 10000000:08x}".upper()
+
+
+def render_receipt(person_id, username, party_name, party_symbol, timestamp, confidence_score,
+                   election="General", generated=None, proof=None):
+    """
+    Draw one receipt: a copy of the election's template with the per-vote
+    fields on top. Returns the Pillow image. With a vote Merkle proof (see
+    VotingSystem.get_vote_proof) its leaf, tree size and root are printed;
+    the full proof goes into the file metadata when saved.
+    """
+    fonts = _fonts()
+    img = receipt_template(election).copy()
+    draw = ImageDraw.Draw(img)
+
+    values = (username, f"PID-{person_id}", timestamp, None, transaction_hash(timestamp, person_id))
+    for i, val in enumerate(values):
+        if val is not None:
+            draw.text((BOX_X + 400, ROW_Y + i * ROW_STEP), str(val), font=fonts['value'], fill=NAVY_BLUE)
+
+    # VOTE HIGHLIGHT (The "Party Voted" Section)
+    party_full = f"{party_symbol} {party_name}"
+    bbox = draw.textbbox((0, 0), party_full, font=fonts['title'])
+    tw = bbox[2] - bbox[0]
+    draw.text(((WIDTH - tw)//2, VOTE_Y + 110), party_full, font=fonts['title'], fill=GOLD)
+
+    generated = generated or datetime.datetime.now()
+    footer = [
+        f"Biometric Authentication Confidence: {confidence_score*100:.2f}%",
+        f"Generated: {generated.strftime('%Y-%m-%d %H:%M')}",
+    ]
+    if proof:
+        footer.append(f"Vote proof: leaf {proof['leaf_index']} of {proof['tree_size']}, root {proof['root'][:16]}")
+    for n, line in enumerate(footer, start=1):
+        draw.text((FOOTER_X, QR_Y + 20 + 35 * n), line, font=fonts['footer'], fill=TEXT_DARK)
+    return img
+
+
+def proof_metadata(proof):
+    """The receipt's embedded proof (PDF subject / JPEG comment), read back by scripts/verify_vote_proofs.py"""
+    return json.dumps({'vote_hash': proof['vote_hash'], 'proof': proof['compact'], 'root': proof['root']},
+                      separators=(',', ':'))
+
+
+def encode_receipt(img, extension, proof=None, quality=95):
+    """Receipt image as PDF or JPEG bytes, with the proof embedded if given"""
+    options = {}
+    if proof:
+        options['subject' if extension == 'pdf' else 'comment'] = proof_metadata(proof)
+    buf = io.BytesIO()
+    if extension == 'pdf':
+        img.save(buf, "PDF", resolution=150.0, **options)
+    else:
+        img.save(buf, "JPEG", quality=quality, **options)
+    return buf.getvalue()
+
+
+def _save_receipt(img, person_id, extension, proof=None, receipt_dir=RECEIPT_DIR):
+    os.makedirs(receipt_dir, exist_ok=True)
+    filename = f"vote_receipt_{person_id}_{int(datetime.datetime.now().timestamp())}.{extension}"
+    filepath = os.path.join(receipt_dir, filename)
+    with open(filepath, 'wb') as f:
+        f.write(encode_receipt(img, extension, proof))
+    return filepath
+
+
+def generate_pdf_receipt(person_id, username, party_name, party_symbol, timestamp, confidence_score, election="General",
+                         proof=None):
     """
     Generate a beautiful, professional PDF receipt using Pillow and converting to PDF.
-    
+
     Args:
         person_id (int/str): The ID of the voter (from biometric scan)
         username (str): The logged in username
@@ -16,244 +198,62 @@ def generate_pdf_receipt(person_id, username, party_name, party_symbol, timestam
         timestamp (str): Time of vote
         confidence_score (float): Biometric confidence score (0.0-1.0 or 0-100)
         election (str): Election name
-        
+        proof (dict): Optional vote Merkle inclusion proof to embed
+
     Returns:
         str: Path to the generated PDF file
     """
-    
-    # 1. Create a high-res white image (A4-ish ratio)
-    width = 1240
-    height = 1754 # A4 at ~150 DPI
-    bg_color = (255, 255, 255) # White
-    img = Image.new('RGB', (width, height), bg_color)
-    draw = ImageDraw.Draw(img)
-    
-    # Premium Colors
-    navy_blue = (15, 23, 42)    # Slate 900
-    sky_blue = (56, 189, 248)   # Sky 400
-    gold = (245, 158, 11)       # Amber 500
-    light_gray = (241, 245, 249) # Slate 100
-    text_dark = (30, 41, 59)    # Slate 800
-    
-    # Fonts
-    try:
-        # Try to use standard Windows fonts or fallbacks
-        title_font = ImageFont.truetype("seguiemj.ttf", 60) # Segoe UI Emoji for symbols if possible, or standard
-    except:
-        try: title_font = ImageFont.truetype("arialbd.ttf", 60)
-        except: title_font = ImageFont.load_default()
-        
-    try: header_font = ImageFont.truetype("arialbd.ttf", 45)
-    except: header_font = ImageFont.load_default()
-    
-    try: label_font = ImageFont.truetype("arial.ttf", 30)
-    except: label_font = ImageFont.load_default()
-    
-    try: value_font = ImageFont.truetype("arialbd.ttf", 30)
-    except: value_font = ImageFont.load_default()
-    
-    try: footer_font = ImageFont.truetype("ariali.ttf", 22)
-    except: footer_font = ImageFont.load_default()
-
-    # 2. Design Elements
-    
-    # Header Background
-    draw.rectangle([(0, 0), (width, 220)], fill=navy_blue)
-    
-    # Accent Line
-    draw.rectangle([(0, 220), (width, 230)], fill=sky_blue)
-    
-    # Title
-    draw.text((80, 60), "OFFICIAL", font=header_font, fill=sky_blue)
-    draw.text((80, 120), "VOTING RECEIPT", font=title_font, fill=(255, 255, 255))
-    
-    # Logo / Icon (Mockup)
-    # Draw a simple shield or check circle
-    icon_x, icon_y = width - 180, 110
-    r = 70
-    draw.ellipse([(icon_x-r, icon_y-r), (icon_x+r, icon_y+r)], outline=gold, width=5)
-    draw.text((icon_x-25, icon_y-35), "✔", font=title_font, fill=gold)
-    
-    # 3. Watermark
-    cx, cy = width//2, height//2 + 100
-    wr = 350
-    draw.ellipse([(cx-wr, cy-wr), (cx+wr, cy+wr)], outline=light_gray, width=20)
-    
-    # 4. Details Container
-    box_x, box_y = 100, 350
-    box_w = width - 200
-    box_h = 1000
-    
-    # Background for details
-    draw.rectangle([(box_x, box_y), (box_x+box_w, box_y+box_h)], fill=light_gray)
-    draw.rectangle([(box_x, box_y), (box_x+box_w, box_y+box_h)], outline=navy_blue, width=2)
-    
-    # Fields
-    fields = [
-        ("Voter Name", username),
-        ("Voter ID", f"PID-{person_id}"),
-        ("Date & Time", timestamp),
-        ("Election", election),
-        ("Transaction Hash", f"TX-{hash(timestamp + str(person_id)) % 10000000:08x}".upper())
-    ]
-    
-    curr_y = box_y + 60
-    for i, (label, val) in enumerate(fields):
-        # Row bg for alternates if we wanted, but let's keep clean
-        draw.text((box_x + 60, curr_y), label.upper(), font=label_font, fill=text_dark)
-        draw.text((box_x + 400, curr_y), str(val), font=value_font, fill=navy_blue)
-        
-        # Line
-        line_y = curr_y + 60
-        if i < len(fields) - 1:
-            draw.line([(box_x + 40, line_y), (box_x + box_w - 40, line_y)], fill=(200, 200, 200), width=1)
-        
-        curr_y += 100
-        
-    # 5. VOTE HIGHLIGHT (The "Party Voted" Section)
-    vote_y = curr_y + 50
-    draw.rectangle([(box_x, vote_y), (box_x+box_w, vote_y + 250)], fill=navy_blue)
-    
-    draw.text((width//2 - 120, vote_y + 30), "VOTE CAST FOR", font=header_font, fill=sky_blue)
-    
-    party_full = f"{party_symbol} {party_name}"
-    bbox = draw.textbbox((0, 0), party_full, font=title_font)
-    tw = bbox[2] - bbox[0]
-    draw.text(((width - tw)//2, vote_y + 110), party_full, font=title_font, fill=gold)
-    
-    # 6. Verification & Footer
-    footer_y = height - 150
-    
-    # QR Code placeholder (Box)
-    qr_size = 150
-    qr_x = 100
-    qr_y = footer_y - 20
-    draw.rectangle([(qr_x, qr_y), (qr_x+qr_size, qr_y+qr_size)], outline=text_dark, width=2)
-    draw.text((qr_x + 40, qr_y + 60), "QR", font=title_font, fill=text_dark)
-    
-    disclaimer = [
-        "This receipt is an official record of your encrypted vote.",
-        f"Biometric Authentication Confidence: {confidence_score*100:.2f}%",
-        f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}"
-    ]
-    
-    txt_x = 300
-    txt_y = qr_y + 20
-    for line in disclaimer:
-        draw.text((txt_x, txt_y), line, font=footer_font, fill=text_dark)
-        txt_y += 35
-        
-    # Blue bottom bar
-    draw.rectangle([(0, height-40), (width, height)], fill=navy_blue)
-
-    # 7. Save
-    receipt_dir = "receipts"
-    if not os.path.exists(receipt_dir):
-        os.makedirs(receipt_dir)
-        
-    filename = f"vote_receipt_{person_id}_{int(datetime.datetime.now().timestamp())}.pdf"
-    filepath = os.path.join(receipt_dir, filename)
-    
-    if os.path.exists(filepath):
-        os.remove(filepath)
-    img.save(filepath, "PDF", resolution=150.0)
-    return filepath
+    img = render_receipt(person_id, username, party_name, party_symbol, timestamp, confidence_score, election,
+                         proof=proof)
+    return _save_receipt(img, person_id, 'pdf', proof)
 
-def generate_jpeg_receipt(person_id, username, party_name, party_symbol, timestamp, confidence_score, election="General"):
+
+def generate_jpeg_receipt(person_id, username, party_name, party_symbol, timestamp, confidence_score, election="General",
+                          proof=None):
     """
     Generate a high-quality JPEG receipt.
     Same logic as PDF but saves as image.
     """
-    
-    width = 1240
-    height = 1754 
-    bg_color = (255, 255, 255)
-    img = Image.new('RGB', (width, height), bg_color)
-    draw = ImageDraw.Draw(img)
-    
-    navy_blue = (15, 23, 42); sky_blue = (56, 189, 248); gold = (245, 158, 11)
-    light_gray = (241, 245, 249); text_dark = (30, 41, 59)
-    
-    try: title_font = ImageFont.truetype("seguiemj.ttf", 60)
-    except: 
-        try: title_font = ImageFont.truetype("arialbd.ttf", 60)
-        except: title_font = ImageFont.load_default()
-    try: header_font = ImageFont.truetype("arialbd.ttf", 45)
-    except: header_font = ImageFont.load_default()
-    try: label_font = ImageFont.truetype("arial.ttf", 30)
-    except: label_font = ImageFont.load_default()
-    try: value_font = ImageFont.truetype("arialbd.ttf", 30)
-    except: value_font = ImageFont.load_default()
-    try: footer_font = ImageFont.truetype("ariali.ttf", 22)
-    except: footer_font = ImageFont.load_default()
-
-    # Header
-    draw.rectangle([(0, 0), (width, 220)], fill=navy_blue)
-    draw.rectangle([(0, 220), (width, 230)], fill=sky_blue)
-    draw.text((80, 60), "OFFICIAL", font=header_font, fill=sky_blue)
-    draw.text((80, 120), "VOTING RECEIPT", font=title_font, fill=(255, 255, 255))
-    
-    # Icon
-    icon_x, icon_y = width - 180, 110; r = 70
-    draw.ellipse([(icon_x-r, icon_y-r), (icon_x+r, icon_y+r)], outline=gold, width=5)
-    draw.text((icon_x-25, icon_y-35), "✔", font=title_font, fill=gold)
-    
-    # Watermark
-    cx, cy = width//2, height//2 + 100; wr = 350
-    draw.ellipse([(cx-wr, cy-wr), (cx+wr, cy+wr)], outline=light_gray, width=20)
-    
-    # Details
-    box_x, box_y = 100, 350; box_w = width - 200; box_h = 1000
-    draw.rectangle([(box_x, box_y), (box_x+box_w, box_y+box_h)], fill=light_gray)
-    draw.rectangle([(box_x, box_y), (box_x+box_w, box_y+box_h)], outline=navy_blue, width=2)
-    
-    fields = [("Voter Name", username), ("Voter ID", f"PID-{person_id}"),
-              ("Date & Time", timestamp), ("Election", election),
-              ("Transaction Hash", f"TX-{hash(timestamp + str(person_id)) % 10000000:08x}".upper())]
-    
-    curr_y = box_y + 60
-    for i, (label, val) in enumerate(fields):
-        draw.text((box_x + 60, curr_y), label.upper(), font=label_font, fill=text_dark)
-        draw.text((box_x + 400, curr_y), str(val), font=value_font, fill=navy_blue)
-        line_y = curr_y + 60
-        if i < len(fields) - 1: draw.line([(box_x + 40, line_y), (box_x + box_w - 40, line_y)], fill=(200, 200, 200), width=1)
-        curr_y += 100
-        
-    vote_y = curr_y + 50
-    draw.rectangle([(box_x, vote_y), (box_x+box_w, vote_y + 250)], fill=navy_blue)
-    draw.text((width//2 - 120, vote_y + 30), "VOTE CAST FOR", font=header_font, fill=sky_blue)
-    party_full = f"{party_symbol} {party_name}"
-    bbox = draw.textbbox((0, 0), party_full, font=title_font)
-    tw = bbox[2] - bbox[0]
-    draw.text(((width - tw)//2, vote_y + 110), party_full, font=title_font, fill=gold)
-    
-    # Footer
-    footer_y = height - 150
-    qr_size = 150; qr_x = 100; qr_y = footer_y - 20
-    draw.rectangle([(qr_x, qr_y), (qr_x+qr_size, qr_y+qr_size)], outline=text_dark, width=2)
-    draw.text((qr_x + 40, qr_y + 60), "QR", font=title_font, fill=text_dark)
-    
-    disclaimer = ["This receipt is an official record of your encrypted vote.",
-                  f"Biometric Authentication Confidence: {confidence_score*100:.2f}%",
-                  f"Generated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}"]
-    txt_x = 300; txt_y = qr_y + 20
-    for line in disclaimer:
-        draw.text((txt_x, txt_y), line, font=footer_font, fill=text_dark)
-        txt_y += 35
-        
-    draw.rectangle([(0, height-40), (width, height)], fill=navy_blue)
-    
-    # Save as JPEG in receipts folder
-    receipt_dir = "receipts"
-    if not os.path.exists(receipt_dir):
-        os.makedirs(receipt_dir)
-
-    filename = f"vote_receipt_{person_id}_{int(datetime.datetime.now().timestamp())}.jpg"
-    filepath = os.path.join(receipt_dir, filename)
-    
-    if os.path.exists(filepath): os.remove(filepath)
-    img.save(filepath, "JPEG", quality=95)
-    return filepath
+    img = render_receipt(person_id, username, party_name, party_symbol, timestamp, confidence_score, election,
+                         proof=proof)
+    return _save_receipt(img, person_id, 'jpg', proof)
+
+
+# --- Background rendering ---
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers=2):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='Receipt')
+        return _executor
+
+
+def submit_receipt(kind='jpeg', callback=None, **fields) -> Future:
+    """
+    Render a receipt ('jpeg' or 'pdf') on the background pool so the voting
+    UI does not wait for it. The Future resolves to the file path; callback,
+    if given, is called with the path (or None on failure) from the worker
+    thread, so UI code must hand it back to the Tk thread itself.
+    """
+    generate = generate_pdf_receipt if kind == 'pdf' else generate_jpeg_receipt
+    future = _get_executor().submit(generate, **fields)
+
+    def _done(f):
+        if f.exception() is not None:
+            print(f"Receipt Error: {f.exception()}")
+        if callback is not None:
+            try:
+                callback(f.result() if f.exception() is None else None)
+            except Exception as e:
+                print(f"Receipt callback error: {e}")
+
+    future.add_done_callback(_done)
+    return future
+
 
 if __name__ == "__main__":
     # Test
@@ -0,0 +1,51 @@
+import argparse
+import json
+import os
+import sys
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from audit_system import AuditLogger
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Look up audit log events through the event index')
+    parser.add_argument('--log-dir', default='logs', help='audit log directory')
+    parser.add_argument('--event', help="event type, e.g. 'vote_cast_success'")
+    parser.add_argument('--person-id', help='details.person_id')
+    parser.add_argument('--since', help="ISO timestamp (UTC), e.g. '2024-05-01T08:00'")
+    parser.add_argument('--until', help='ISO timestamp (UTC), exclusive')
+    parser.add_argument('--limit', type=int, help='maximum number of records')
+    parser.add_argument('--newest-first', action='store_true')
+    parser.add_argument('--counts', action='store_true', help='print matches per hour instead of records')
+    parser.add_argument('--rebuild', action='store_true', help='re-create the index from the log segments first')
+    args = parser.parse_args()
+
+    logger = AuditLogger(log_dir=args.log_dir)
+    if args.rebuild:
+        print('Indexed {} records'.format(logger.rebuild_index()))
+
+    if args.counts:
+        for hour, count in logger.event_counts(args.event, args.person_id, args.since, args.until).items():
+            print('{}:00Z  {}'.format(hour, count))
+        return
+
+    results = logger.query(args.event, args.person_id, args.since, args.until,
+                           limit=args.limit, newest_first=args.newest_first)
+    failed = 0
+    for entry in results:
+        mark = 'ok' if entry['verified'] else 'FAILED'
+        failed += not entry['verified']
+        print('[{}] segment {} @ {}  {}'.format(mark, entry['segment'], entry['offset'],
+                                                json.dumps(entry['record'], ensure_ascii=False)))
+    print('{} records, {} failed verification'.format(len(results), failed))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Online backups of the project databases (iris_system.db, voting_system.db,
+performance.db, registration.db) with retention, scheduling and optional
+encryption.
+
+The encryption password is read from IRIS_BACKUP_PASSWORD when set
+(encryption needs the cryptography package).
+
+Usage:
+    python scripts/backup_databases.py run [--dir backups] [--keep 14] [--max-age-days 30]
+    python scripts/backup_databases.py schedule --interval 21600
+    python scripts/backup_databases.py list
+    python scripts/backup_databases.py restore 20261019_101500_000000 voting_system.db [--target restored.db]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from backup_manager import PROJECT_DATABASES, BackupManager
+
+
+def _progress(name, done, total):
+    sys.stdout.write('\r{}: {:,}/{:,} pages   '.format(name, done, total))
+    sys.stdout.flush()
+
+
+def _print_report(report):
+    sys.stdout.write('\r')
+    for entry in report['databases']:
+        print('{:<20} {:>10,} pages {:>14,} bytes {:>7.2f}s {:>12,.0f} pages/s  {}{}'.format(
+            os.path.basename(entry['source']), entry['pages'], entry['stored_bytes'], entry['seconds'],
+            entry['pages_per_sec'], entry['snapshot'],
+            ', {} restart(s){}'.format(entry['restarts'], ', finished in one step' if entry['single_step'] else '')
+            if entry['restarts'] else ''))
+    for path in report['skipped']:
+        print('{:<20} not found, skipped'.format(os.path.basename(path)))
+    print('Backup set {}{}: {:,} pages in {:.2f}s ({:,.0f} pages/s)'.format(
+        report['name'], ' (encrypted)' if report['encrypted'] else '', report['pages'], report['seconds'],
+        report['pages_per_sec']))
+    if report['removed']:
+        print('Retention removed: {}'.format(', '.join(report['removed'])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Online SQLite backups')
+    parser.add_argument('--dir', default='backups', help='backup directory')
+    parser.add_argument('--db', action='append', default=None,
+                        help='database to include (repeatable; default: all project databases)')
+    parser.add_argument('--keep', type=int, default=7, help='backup sets to keep (0: no limit)')
+    parser.add_argument('--max-age-days', type=float, default=None, help='also drop sets older than this')
+    parser.add_argument('--pages', type=int, default=1024, help='pages copied per step')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('run', help='take one backup set now')
+    p = sub.add_parser('schedule', help='take a backup set every --interval seconds until interrupted')
+    p.add_argument('--interval', type=float, required=True)
+    sub.add_parser('list', help='list backup sets')
+    p = sub.add_parser('restore', help='restore one database from a set')
+    p.add_argument('name')
+    p.add_argument('database')
+    p.add_argument('--target', default=None, help='restore here instead of over the original path')
+    args = parser.parse_args()
+
+    manager = BackupManager(args.dir, databases=args.db or PROJECT_DATABASES, keep=args.keep or None,
+                            max_age_days=args.max_age_days, password=os.environ.get('IRIS_BACKUP_PASSWORD'),
+                            pages=args.pages)
+
+    if args.command == 'run':
+        _print_report(manager.run(progress=_progress))
+    elif args.command == 'schedule':
+        try:
+            while True:
+                _print_report(manager.run(progress=_progress))
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == 'list':
+        for manifest in manager.list_backups():
+            print('{}  {} database(s)  {:,} bytes{}'.format(manifest['name'], len(manifest['databases']),
+                                                           manifest['bytes'],
+                                                           '  encrypted' if manifest['encrypted'] else ''))
+    else:
+        stats = manager.restore(args.name, args.database, args.target)
+        print('Restored {:,} pages to {} in {:.2f}s'.format(stats['pages'], stats['path'], stats['seconds']))
+
+
+if __name__ == '__main__':
+    main()
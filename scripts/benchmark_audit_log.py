@@ -0,0 +1,97 @@
+"""
+Benchmark: audit events/s under concurrent writers, then verify the chain.
+
+Compares the previous write_audit_log (read the tip, then insert, each on
+its own connection) with the group-commit AuditChainWriter, and checks the
+resulting hash chain with IrisDatabase.verify_audit_chain.
+
+Usage:
+    python scripts/benchmark_audit_log.py [--threads 8] [--events 500]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database_manager import IrisDatabase
+
+
+def legacy_write_audit_log(db_path, actor_username, action, resource=None, details=None):
+    """The pre-group-commit implementation: two connections per event"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    row = conn.execute('SELECT record_hash FROM audit_logs ORDER BY id DESC LIMIT 1').fetchone()
+    conn.close()
+    prev_hash = row[0] if row else None
+    event_time = datetime.now().isoformat()
+    payload = json.dumps({'t': event_time, 'u': actor_username, 'a': action, 'r': resource,
+                          'd': details or {}, 'p': prev_hash}, sort_keys=True)
+    record_hash = hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('''
+        INSERT INTO audit_logs (event_time, actor_username, action, resource, details, prev_hash, record_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (event_time, actor_username, action, resource, json.dumps(details or {}), prev_hash, record_hash))
+    conn.commit()
+    conn.close()
+
+
+def run_concurrent(write, threads: int, events: int) -> float:
+    def worker(n):
+        for i in range(events):
+            write('bench{}'.format(n), 'benchmark_event', 'resource', {'seq': i})
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return threads * events / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark audit log appends under concurrency')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--events', type=int, default=500, help='events per thread')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = IrisDatabase(os.path.join(tmp, 'legacy.db'))
+        legacy_rate = run_concurrent(lambda *a: legacy_write_audit_log(legacy_db.db_path, *a),
+                                     args.threads, args.events)
+        legacy_check = legacy_db.verify_audit_chain()
+
+        database = IrisDatabase(os.path.join(tmp, 'group_commit.db'))
+        rate = run_concurrent(database.write_audit_log, args.threads, args.events)
+        database.audit_writer.close()
+        check = database.verify_audit_chain()
+        batches = database.audit_writer.stats['batches']
+
+        legacy_db.close_connections()
+        database.close_connections()
+
+    print('{} threads x {} events'.format(args.threads, args.events))
+    print('legacy two-connection write : {:>8,.0f} events/s  chain valid={} ({} records{})'.format(
+        legacy_rate, legacy_check['valid'], legacy_check['records'],
+        '' if legacy_check['valid'] else ', first break at id {}'.format(legacy_check['first_invalid_id'])))
+    print('group-commit writer         : {:>8,.0f} events/s  chain valid={} ({} records, {} batches)'.format(
+        rate, check['valid'], check['records'], batches))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark: per-call SQLite connections vs. the pooled IrisDatabase.
+
+Measures ops/s for get_person, log_access and has_voted on a scratch
+database, once with the legacy behaviour (new connection + pragmas on every
+call) and once with the thread-local pooled connections.
+
+Usage:
+    python scripts/benchmark_db_pool.py [--ops 2000] [--persons 200]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database_manager import IrisDatabase, PooledConnection
+
+
+class PerCallConnectionDatabase(IrisDatabase):
+    """IrisDatabase with the pre-pool get_connection (baseline)"""
+
+    @contextmanager
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, factory=PooledConnection)
+        conn.row_factory = sqlite3.Row
+        try:
+            cur = conn.cursor()
+            cur.execute('PRAGMA foreign_keys=ON')
+            cur.execute('PRAGMA journal_mode=WAL')
+            cur.execute('PRAGMA synchronous=NORMAL')
+            cur.close()
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def _seed(database: IrisDatabase, persons: int) -> list:
+    template = np.zeros((64, 64, 3), dtype=np.uint8)
+    ids = []
+    with database.transaction():
+        for i in range(persons):
+            ids.append(database.enroll_person(name='Bench {}'.format(i), iris_template=template))
+    for pid in ids[::2]:
+        database.record_vote(pid, 'bench-election', 0.9)
+    return ids
+
+
+def _rate(fn, ids, ops: int) -> float:
+    n = len(ids)
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(ids[i % n])
+    return ops / (time.perf_counter() - start)
+
+
+def run(database: IrisDatabase, ids: list, ops: int) -> dict:
+    return {
+        'get_person': _rate(database.get_person, ids, ops),
+        'log_access': _rate(lambda pid: database.log_access(pid, 'benchmark', 0.9, True), ids, ops),
+        'has_voted': _rate(lambda pid: database.has_voted(pid, 'bench-election'), ids, ops),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark IrisDatabase connection pooling')
+    parser.add_argument('--ops', type=int, default=2000, help='operations per measurement')
+    parser.add_argument('--persons', type=int, default=200, help='persons to seed')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, cls in (('per-call', PerCallConnectionDatabase), ('pooled', IrisDatabase)):
+            database = cls(os.path.join(tmp, '{}.db'.format(label)))
+            ids = _seed(database, args.persons)
+            results[label] = run(database, ids, args.ops)
+            if hasattr(database, 'close_connections'):
+                database.close_connections()
+
+    print('{:<12} {:>12} {:>12} {:>9}'.format('operation', 'per-call/s', 'pooled/s', 'speedup'))
+    for op in results['pooled']:
+        before, after = results['per-call'][op], results['pooled'][op]
+        print('{:<12} {:>12,.0f} {:>12,.0f} {:>8.1f}x'.format(op, before, after, after / before))
+
+
+if __name__ == '__main__':
+    main()
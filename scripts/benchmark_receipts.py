@@ -0,0 +1,81 @@
+"""
+Benchmark receipt rendering.
+
+Compares rendering every receipt from scratch (fonts and template rebuilt
+per call, as before caching) with the cached template path, then measures
+end-to-end receipts/s (render + encode + write) for JPEG and PDF, serially
+and through the background pool.
+
+Usage:
+    python scripts/benchmark_receipts.py [--receipts 50] [--workers 2]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import receipt_generator
+from receipt_generator import render_receipt
+
+
+def _fields(n):
+    return dict(person_id=1000 + n, username='Voter {}'.format(n), party_name='Democratic Party',
+                party_symbol='🔵', timestamp='2026-02-15 10:{:02d}:00'.format(n % 60),
+                confidence_score=0.95, election='General')
+
+
+def _rate(fn, count):
+    start = time.perf_counter()
+    for n in range(count):
+        fn(n)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark receipt rendering')
+    parser.add_argument('--receipts', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=2)
+    args = parser.parse_args()
+
+    def uncached(n):
+        receipt_generator.load_font.cache_clear()
+        receipt_generator.receipt_template.cache_clear()
+        render_receipt(**_fields(n))
+
+    results = [('render, uncached', _rate(uncached, args.receipts))]
+    render_receipt(**_fields(0))  # Warm the caches
+    results.append(('render, cached template', _rate(lambda n: render_receipt(**_fields(n)), args.receipts)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # Receipts are written to ./receipts
+        results.append(('jpeg file, serial', _rate(lambda n: receipt_generator.generate_jpeg_receipt(**_fields(n)),
+                                                   args.receipts)))
+        results.append(('pdf file, serial', _rate(lambda n: receipt_generator.generate_pdf_receipt(**_fields(n)),
+                                                  args.receipts)))
+        receipt_generator._executor = ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix='Receipt')
+        start = time.perf_counter()
+        futures = [receipt_generator.submit_receipt('jpeg', **_fields(n)) for n in range(args.receipts)]
+        submitted = time.perf_counter() - start
+        for future in futures:
+            future.result()
+        results.append(('jpeg file, pool x{}'.format(args.workers), args.receipts / (time.perf_counter() - start)))
+        receipt_generator._executor.shutdown()
+        os.chdir(PROJECT_ROOT)
+
+    print('{} receipts'.format(args.receipts))
+    for name, rate in results:
+        print('{:<26} {:>8.1f} receipts/s  ({:.1f} ms each)'.format(name, rate, 1000.0 / rate))
+    print('submit_receipt returns in  {:>8.3f} ms per receipt'.format(submitted * 1000.0 / args.receipts))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Concurrency benchmark for VotingSystem.cast_vote.
+
+Several threads cast votes against a scratch database; every voter is
+attempted by more than one thread, so the UNIQUE(person_id, election_id)
+constraint has to reject the extra attempts. Reports votes/s and checks
+that no person ended up with two votes in the same election.
+
+Usage:
+    python scripts/benchmark_voting.py [--voters 2000] [--threads 8] [--attempts 2]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent vote casting')
+    parser.add_argument('--voters', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--attempts', type=int, default=2, help='cast attempts per voter')
+    parser.add_argument('--election', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # voting_system creates its database and audit log in the working directory on import
+        os.chdir(tmp)
+        from voting_system import VotingSystem, audit
+
+        system = VotingSystem(os.path.join(tmp, 'bench_votes.db'))
+        parties = sorted(p['id'] for p in system.get_parties())
+        jobs = [pid for pid in range(1, args.voters + 1) for _ in range(args.attempts)]
+        accepted = [0] * args.threads
+        barrier = threading.Barrier(args.threads)
+
+        def worker(n):
+            barrier.wait()
+            # Interleaved slices: each voter's attempts land on different threads
+            for pid in jobs[n::args.threads]:
+                if system.cast_vote(pid, parties[pid % len(parties)], 0.9, args.election):
+                    accepted[n] += 1
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            audit.flush()
+
+        with sqlite3.connect(system.db_path) as conn:
+            stored = conn.execute('SELECT COUNT(*) FROM votes').fetchone()[0]
+            doubles = conn.execute('''
+                SELECT COUNT(*) FROM (
+                    SELECT person_id FROM votes GROUP BY person_id, election_id HAVING COUNT(*) > 1
+                )
+            ''').fetchone()[0]
+        audit.close()
+        os.chdir(PROJECT_ROOT)
+
+    print('Attempts:       {:,} ({} threads)'.format(len(jobs), args.threads))
+    print('Accepted votes: {:,} (stored {:,}, expected {:,})'.format(sum(accepted), stored, args.voters))
+    print('Double votes:   {}'.format(doubles))
+    print('Throughput:     {:,.0f} attempts/s, {:,.0f} votes/s'.format(len(jobs) / elapsed, sum(accepted) / elapsed))
+    if doubles or stored != args.voters or sum(accepted) != args.voters:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database_manager import IrisDatabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Enroll a voter roll (CSV or JSONL) in bulk')
+    parser.add_argument('roll', help='CSV with a header row, or JSONL')
+    parser.add_argument('--db', default='iris_system.db', help='database path')
+    parser.add_argument('--template-dir', default=None, help='base directory for *_template_path columns')
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=4, help='threads loading template files')
+    parser.add_argument('--defer-indexes', action='store_true', help='drop secondary indexes during the load')
+    args = parser.parse_args()
+
+    database = IrisDatabase(args.db)
+
+    def progress(report):
+        print('  {:,} read, {:,} enrolled, {:,} rejected'.format(report['read'], report['enrolled'], report['rejected']))
+
+    report = database.bulk_enroll(IrisDatabase.read_voter_roll(args.roll),
+                                  chunk_size=args.chunk_size, template_dir=args.template_dir,
+                                  defer_indexes=args.defer_indexes, workers=args.workers,
+                                  progress=progress)
+    database.close_connections()
+
+    print('Enrolled {:,} of {:,} records ({:,} rejected) in {:.1f}s: {:,.0f} rows/s'.format(
+        report['enrolled'], report['read'], report['rejected'], report['elapsed_sec'], report['rows_per_sec']))
+    for position, reason in report['errors'][:20]:
+        print('  record {}: {}'.format(position, reason))
+    if len(report['errors']) > 20:
+        print('  ... {} more'.format(report['rejected'] - 20))
+
+
+if __name__ == '__main__':
+    main()
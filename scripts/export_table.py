@@ -0,0 +1,57 @@
+"""
+Stream a database table (or query) to JSONL, CSV, JSON or columnar .npy.
+
+The format follows the output extension unless --format is given; a .gz or
+.zst suffix compresses the output (zstd needs the zstandard package).
+
+Usage:
+    python scripts/export_table.py --db iris_system.db --table access_logs --out access_logs.jsonl.gz
+    python scripts/export_table.py --db voting_system.db --table votes --out votes.csv.zst
+    python scripts/export_table.py --db voting_system.db --query "SELECT * FROM votes WHERE election_id = 1" --out votes_npy --format npy
+"""
+
+import argparse
+import os
+import sys
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from streaming_export import FORMATS, export_query, export_table
+
+
+def _progress(rows):
+    sys.stdout.write('\r{:,} rows'.format(rows))
+    sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming table export')
+    parser.add_argument('--db', required=True, help='SQLite database')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--table', help='table to export in rowid order')
+    source.add_argument('--query', help='read-only query to export')
+    parser.add_argument('--out', required=True, help='output file (directory for npy)')
+    parser.add_argument('--format', choices=FORMATS, default=None, help='default: from the extension, else jsonl')
+    parser.add_argument('--compression', choices=['auto', 'none', 'gzip', 'zstd'], default='auto',
+                        help='default: from a .gz / .zst suffix')
+    parser.add_argument('--level', type=int, default=None, help='compression level')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='rows fetched per batch')
+    args = parser.parse_args()
+
+    options = dict(fmt=args.format, compression=None if args.compression == 'none' else args.compression,
+                   level=args.level, chunk_size=args.chunk_size, progress=_progress)
+    if args.table:
+        stats = export_table(args.db, args.table, args.out, **options)
+    else:
+        stats = export_query(args.db, args.query, (), args.out, **options)
+    print()
+    print('Exported {rows:,} rows to {path} ({format}, {compression}): {bytes:,} bytes in {seconds:.1f}s, '
+          '{rows_per_sec:,.0f} rows/s'.format(**dict(stats, compression=stats['compression'] or 'uncompressed')))
+
+
+if __name__ == '__main__':
+    main()
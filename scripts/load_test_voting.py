@@ -0,0 +1,113 @@
+"""
+Load test: N booths casting votes against one voting database.
+
+Each booth is a thread casting votes back to back for its own voters
+(closed loop). Runs once with direct cast_vote (a commit per vote) and once
+through the VoteIngestionService (batched single-writer commits), then
+reports sustained votes/s and p50/p99 cast latency as seen by a booth.
+
+Usage:
+    python scripts/load_test_voting.py [--booths 16] [--votes-per-booth 200] [--mode both]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(system, booths: int, votes_per_booth: int, election_id: int) -> dict:
+    parties = sorted(p['id'] for p in system.get_parties())
+    latencies = [[] for _ in range(booths)]
+    failures = [0] * booths
+    barrier = threading.Barrier(booths)
+
+    def booth(n):
+        barrier.wait()
+        base = n * votes_per_booth
+        for i in range(votes_per_booth):
+            person_id = base + i + 1
+            start = time.perf_counter()
+            ok = system.cast_vote(person_id, parties[person_id % len(parties)], 0.95, election_id)
+            latencies[n].append(time.perf_counter() - start)
+            failures[n] += not ok
+
+    threads = [threading.Thread(target=booth, args=(n,)) for n in range(booths)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = sorted(x for booth_latencies in latencies for x in booth_latencies)
+    with sqlite3.connect(system.db_path) as conn:
+        stored = conn.execute('SELECT COUNT(*) FROM votes WHERE election_id = ?', (election_id,)).fetchone()[0]
+    return {
+        'votes': len(all_latencies),
+        'failed': sum(failures),
+        'stored': stored,
+        'rate': len(all_latencies) / elapsed,
+        'p50_ms': _percentile(all_latencies, 50) * 1000,
+        'p99_ms': _percentile(all_latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test vote casting with many booths')
+    parser.add_argument('--booths', type=int, default=16)
+    parser.add_argument('--votes-per-booth', type=int, default=200)
+    parser.add_argument('--mode', choices=['direct', 'queue', 'both'], default='both')
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--max-latency', type=float, default=0.0, help='seconds a batch may linger to fill')
+    args = parser.parse_args()
+
+    modes = ['direct', 'queue'] if args.mode == 'both' else [args.mode]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # voting_system creates its database and audit log in the working directory on import
+        os.chdir(tmp)
+        from voting_system import VotingSystem, audit
+
+        for election_id, mode in enumerate(modes, start=1):
+            system = VotingSystem(os.path.join(tmp, '{}.db'.format(mode)))
+            if mode == 'queue':
+                system.enable_ingestion(batch_size=args.batch_size, max_latency=args.max_latency)
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[mode] = run(system, args.booths, args.votes_per_booth, election_id)
+                if system.ingestion is not None:
+                    results[mode]['batches'] = system.ingestion.stats['batches']
+                    system.ingestion.close()
+                audit.flush()
+        audit.close()
+        os.chdir(PROJECT_ROOT)
+
+    print('{} booths x {} votes'.format(args.booths, args.votes_per_booth))
+    print('{:<8} {:>10} {:>9} {:>9} {:>8} {:>8}'.format('mode', 'votes/s', 'p50 ms', 'p99 ms', 'failed', 'stored'))
+    for mode, r in results.items():
+        print('{:<8} {:>10,.0f} {:>9.2f} {:>9.2f} {:>8} {:>8}'.format(
+            mode, r['rate'], r['p50_ms'], r['p99_ms'], r['failed'], r['stored']))
+        if 'batches' in r:
+            print('         {} batches, {:.1f} votes/batch'.format(r['batches'], r['votes'] / max(1, r['batches'])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import os
+import sys
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database_manager import IrisDatabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rewrite pickled iris/face templates in the binary template format')
+    parser.add_argument('--db', default='iris_system.db', help='database path')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--quantize', choices=['none', 'float16', 'uint8'], default='none',
+                        help='quantization for float templates (integer templates are stored as-is)')
+    parser.add_argument('--no-vacuum', action='store_true', help='skip VACUUM after rewriting')
+    args = parser.parse_args()
+
+    database = IrisDatabase(args.db)
+    size_before = os.path.getsize(args.db)
+    stats = database.migrate_templates(batch_size=args.batch_size, quantize=args.quantize,
+                                       vacuum=not args.no_vacuum)
+    database.close_connections()
+    size_after = os.path.getsize(args.db)
+
+    print('Templates rewritten: {} in {} rows ({} failed)'.format(stats['templates'], stats['rows'], stats['failed']))
+    print('Template bytes:      {:,} -> {:,}'.format(stats['bytes_before'], stats['bytes_after']))
+    print('Database file:       {:,} -> {:,} bytes'.format(size_before, size_after))
+
+
+if __name__ == '__main__':
+    main()
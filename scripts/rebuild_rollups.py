@@ -0,0 +1,26 @@
+import argparse
+import os
+import sys
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from database_manager import IrisDatabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill/rebuild the daily and hourly statistics rollups')
+    parser.add_argument('--db', default='iris_system.db', help='database path')
+    args = parser.parse_args()
+
+    database = IrisDatabase(args.db)
+    stats = database.rebuild_rollups()
+    database.close_connections()
+    print('Rebuilt {} daily and {} hourly rollup rows in {:.2f}s'.format(stats['days'], stats['hours'], stats['elapsed_sec']))
+
+
+if __name__ == '__main__':
+    main()
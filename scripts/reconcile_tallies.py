@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from voting_system import VotingSystem
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute vote tallies from the raw votes and report drift')
+    parser.add_argument('--db', default='voting_system.db', help='voting database path')
+    parser.add_argument('--check-only', action='store_true', help='report drift without repairing it')
+    args = parser.parse_args()
+
+    report = VotingSystem(args.db).reconcile_tallies(repair=not args.check_only)
+    print('Total votes:  tally {tally}, actual {actual}'.format(**report['total_votes']))
+    print('Total voters: tally {tally}, actual {actual}'.format(**report['total_voters']))
+    for row in report['drift']:
+        print('  election {election_id} party {party_id}: tally {tally}, actual {actual}'.format(**row))
+    if report['consistent']:
+        print('Tallies are consistent')
+    elif report['repaired']:
+        print('Tallies repaired')
+    else:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
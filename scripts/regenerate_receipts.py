@@ -0,0 +1,56 @@
+"""
+Regenerate receipts for every vote into an archive or per-booth PDFs.
+
+Re-running with the same output directory resumes from its checkpoint (or
+picks up only votes cast since the last run).
+
+Usage:
+    python scripts/regenerate_receipts.py --db voting_system.db --out receipt_export [--mode zip] [--kind pdf]
+    python scripts/regenerate_receipts.py --db central_votes.db --out booth_receipts --mode booth-pdf --workers 4
+"""
+
+import argparse
+import os
+import sys
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from receipt_archive import regenerate_receipts
+
+
+def _progress(state):
+    eta = '{:.0f}s'.format(state['eta']) if state['eta'] is not None else '?'
+    sys.stdout.write('\r{rendered:,}/{todo:,} receipts  {rate:,.1f}/s  ETA {eta}   '.format(eta=eta, **{
+        k: v for k, v in state.items() if k != 'eta'}))
+    sys.stdout.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk receipt regeneration')
+    parser.add_argument('--db', default='voting_system.db', help='voting database')
+    parser.add_argument('--out', required=True, help='output directory (holds the checkpoint)')
+    parser.add_argument('--mode', choices=['zip', 'booth-pdf'], default='zip')
+    parser.add_argument('--kind', choices=['pdf', 'jpeg'], default='pdf', help='receipt format in zip mode')
+    parser.add_argument('--workers', type=int, default=None, help='render processes (default: CPU count)')
+    parser.add_argument('--chunk-size', type=int, default=32, help='votes per worker task')
+    parser.add_argument('--part-size', type=int, default=1000, help='receipts per archive part / checkpoint')
+    parser.add_argument('--people-db', default='iris_system.db', help='database with voter names (optional)')
+    args = parser.parse_args()
+
+    report = regenerate_receipts(args.db, args.out, mode=args.mode, kind=args.kind, chunk_size=args.chunk_size,
+                                 part_size=args.part_size, workers=args.workers, people_db=args.people_db,
+                                 progress=_progress)
+    print()
+    if report['resumed_after']:
+        print('Resumed after vote {:,}'.format(report['resumed_after']))
+    print('Rendered {rendered:,} receipts ({bytes:,} bytes) in {seconds:.1f}s: {receipts_per_sec:,.1f} receipts/s'.format(
+        **report))
+    print('{} receipts in {}: {}'.format(report['total_receipts'], args.out, ', '.join(report['files']) or '-'))
+
+
+if __name__ == '__main__':
+    main()
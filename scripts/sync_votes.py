@@ -0,0 +1,70 @@
+"""
+Export booth vote deltas and merge them into a central database.
+
+Usage:
+    python scripts/sync_votes.py export --db voting_system.db --out outbox [--booth booth-07] [--with-audit]
+    python scripts/sync_votes.py merge --central central_votes.db inbox/* [--workers 4] [--archive audit_archive]
+"""
+
+import argparse
+import os
+import sys
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from vote_sync import export_delta, merge_bundles
+
+
+def cmd_export(args):
+    from voting_system import VotingSystem, audit
+    manifest = export_delta(VotingSystem(args.db), args.out, booth_id=args.booth,
+                            audit_logger=audit if args.with_audit else None)
+    if manifest is None:
+        print('Nothing to export')
+        return
+    print('Exported {} votes and {} audit segments to {}'.format(
+        manifest['votes'], len(manifest['audit_segments']), os.path.join(args.out, manifest['name'])))
+
+
+def cmd_merge(args):
+    bundles = sorted(p for p in args.bundles if os.path.isfile(os.path.join(p, 'manifest.json')))
+    report = merge_bundles(args.central, bundles, workers=args.workers, archive_dir=args.archive)
+    print('Bundles:    {merged_bundles} merged, {skipped_bundles} already merged, '
+          '{failed} failed'.format(failed=len(report['failed_bundles']), **report))
+    print('Votes:      {votes_read:,} read, {inserted:,} inserted, {duplicates:,} duplicates, '
+          '{conflicts:,} conflicts'.format(**report))
+    print('Throughput: {votes_per_sec:,.0f} votes/s (read {read_seconds:.2f}s, merge {merge_seconds:.2f}s)'.format(**report))
+    for failure in report['failed_bundles']:
+        print('  FAILED {path}: {error}'.format(**failure))
+    if report['failed_bundles']:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Booth vote export and central merge')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_export = sub.add_parser('export', help='write the votes cast since the last export as a bundle')
+    p_export.add_argument('--db', default='voting_system.db', help='booth voting database')
+    p_export.add_argument('--out', required=True, help='directory to write the bundle into')
+    p_export.add_argument('--booth', default=None, help='booth id (default: hostname)')
+    p_export.add_argument('--with-audit', action='store_true', help='seal and include new audit segments')
+    p_export.set_defaults(func=cmd_export)
+
+    p_merge = sub.add_parser('merge', help='merge bundles into the central database')
+    p_merge.add_argument('bundles', nargs='+', help='bundle directories')
+    p_merge.add_argument('--central', default='central_votes.db', help='central voting database')
+    p_merge.add_argument('--workers', type=int, default=None, help='bundle reader processes')
+    p_merge.add_argument('--archive', default=None, help='directory to archive booth audit segments in')
+    p_merge.set_defaults(func=cmd_merge)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
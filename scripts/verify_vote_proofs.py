@@ -0,0 +1,250 @@
+"""
+Verify the vote Merkle tree and receipt inclusion proofs.
+
+Usage:
+    python scripts/verify_vote_proofs.py root --db voting_system.db [--expected <root> | --results voting_results.json]
+    python scripts/verify_vote_proofs.py issue --db voting_system.db --person 42 [--election 1] [--size <published size>]
+    python scripts/verify_vote_proofs.py proof --vote-hash <hash> --proof vmp1.... --root <root> [--size N] [--bench 10000]
+    python scripts/verify_vote_proofs.py consistency --db voting_system.db --old-size 17 --old-root <root> --results voting_results.json
+    python scripts/verify_vote_proofs.py receipt receipts/*.pdf --results voting_results.json [--db voting_system.db]
+
+A receipt's proof is against the tree at the time the vote was cast. It is
+checked against the published root directly when the sizes match; otherwise
+the receipt's root must be shown to be a prefix of the published tree with a
+consistency proof from the voting database (--db), or the voter re-issues
+the proof at the published size (issue --size).
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+# Ensure project root is on sys.path when executed from scripts/
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(CURRENT_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from vote_merkle import TOMBSTONE_PREFIX, VoteMerkle, decode_proof, recompute_root, verify_consistency, verify_proof
+
+
+def _published_root(args):
+    if getattr(args, 'results', None):
+        with open(args.results, 'r', encoding='utf-8') as f:
+            merkle = json.load(f)['vote_merkle']
+        return merkle['root'], merkle['tree_size']
+    return getattr(args, 'expected', None) or getattr(args, 'root', None), getattr(args, 'size', None)
+
+
+def cmd_root(args):
+    conn = sqlite3.connect(args.db, timeout=30)
+    tree = VoteMerkle()
+    start = time.perf_counter()
+    result = recompute_root(tree.leaves(conn))
+    elapsed = time.perf_counter() - start
+    if not result['valid']:
+        print('INVALID: {}'.format(result['reason']))
+        sys.exit(1)
+    size, stored_root = tree.root(conn)
+    # Votes gone from the votes table without a tombstone leaf recording their removal
+    removed = conn.execute('''
+        SELECT COUNT(*) FROM vote_merkle_leaves l
+        WHERE substr(l.vote_hash, 1, ?) != ?
+          AND NOT EXISTS (SELECT 1 FROM votes v WHERE v.vote_hash = l.vote_hash)
+          AND NOT EXISTS (SELECT 1 FROM vote_merkle_leaves t WHERE t.vote_hash = ? || l.vote_hash)
+    ''', (len(TOMBSTONE_PREFIX), TOMBSTONE_PREFIX, TOMBSTONE_PREFIX)).fetchone()[0]
+    tombstones = conn.execute('''
+        SELECT COUNT(*) FROM vote_merkle_leaves WHERE substr(vote_hash, 1, ?) = ?
+    ''', (len(TOMBSTONE_PREFIX), TOMBSTONE_PREFIX)).fetchone()[0]
+    untracked = conn.execute('''
+        SELECT COUNT(*) FROM votes v WHERE NOT EXISTS (SELECT 1 FROM vote_merkle_leaves l WHERE l.vote_hash = v.vote_hash)
+    ''').fetchone()[0]
+
+    print('Leaves:      {:,} ({:,.0f} leaves/s streamed)'.format(result['tree_size'], result['tree_size'] / elapsed if elapsed else 0))
+    print('Root:        {}'.format(result['root']))
+    ok = result['root'] == stored_root and result['tree_size'] == size
+    print('Stored tree: {}'.format('matches' if ok else 'MISMATCH (stored root {})'.format(stored_root)))
+    expected, expected_size = _published_root(args)
+    if expected:
+        # A published root covers a prefix of the tree: recompute at that size
+        if expected_size is not None and expected_size != result['tree_size']:
+            prefix = recompute_root(leaf for leaf in tree.leaves(conn) if leaf[0] < expected_size)
+            matches = prefix['root'] == expected
+        else:
+            matches = result['root'] == expected
+        print('Published:   {}'.format('matches' if matches else 'MISMATCH'))
+        ok = ok and matches
+    if tombstones:
+        print('Recorded vote removals: {:,}'.format(tombstones))
+    if removed:
+        print('Votes removed without a tombstone in the tree: {:,}'.format(removed))
+    if untracked:
+        print('Votes missing from the tree: {:,}'.format(untracked))
+    if not ok or untracked or removed:
+        sys.exit(1)
+
+
+def cmd_issue(args):
+    from voting_system import VotingSystem
+    proof = VotingSystem(args.db).get_vote_proof(args.person, args.election, args.size)
+    if proof is None:
+        print('No vote found for person {}{}'.format(
+            args.person, '' if args.size is None else ' in the tree of size {}'.format(args.size)))
+        sys.exit(1)
+    print(json.dumps({k: proof[k] for k in ('vote_hash', 'leaf_index', 'tree_size', 'root', 'compact')}, indent=2))
+
+
+def cmd_proof(args):
+    ok = verify_proof(args.vote_hash, args.proof, args.root, args.size)
+    print('Proof {}'.format('VALID' if ok else 'INVALID'))
+    if args.bench:
+        start = time.perf_counter()
+        for _ in range(args.bench):
+            verify_proof(args.vote_hash, args.proof, args.root, args.size)
+        print('{:.1f} us per verification'.format((time.perf_counter() - start) * 1e6 / args.bench))
+    if not ok:
+        sys.exit(1)
+
+
+def _receipt_metadata(path):
+    if path.lower().endswith('.pdf'):
+        from PIL.PdfParser import PdfName, PdfParser, decode_text
+        parser = PdfParser(path)
+        try:
+            subject = parser.info.get(PdfName(b'Subject'))
+            subject = decode_text(subject) if subject else None
+        finally:
+            parser.close()
+        return json.loads(subject) if subject else None
+    from PIL import Image
+    with Image.open(path) as img:
+        comment = img.info.get('comment')
+    if isinstance(comment, bytes):
+        comment = comment.decode('utf-8')
+    return json.loads(comment) if comment else None
+
+
+def _consistency(conn, old_size, old_root, new_size, new_root):
+    try:
+        proof = VoteMerkle().consistency_proof(conn, old_size, new_size)
+    except ValueError:
+        return False
+    return verify_consistency(old_size, old_root, new_size, new_root, proof)
+
+
+def cmd_consistency(args):
+    root, size = _published_root(args)
+    if root is None or size is None:
+        print('A published root and its tree size are required (--results, or --root with --size)')
+        sys.exit(2)
+    conn = sqlite3.connect(args.db, timeout=30)
+    try:
+        proof = VoteMerkle().consistency_proof(conn, args.old_size, size)
+    except ValueError as e:
+        print('ERROR {}'.format(e))
+        sys.exit(1)
+    ok = verify_consistency(args.old_size, args.old_root, size, root, proof)
+    print(json.dumps({'old_size': args.old_size, 'new_size': size, 'proof': proof}, indent=2))
+    print('Consistency {}'.format('VALID' if ok else 'INVALID'))
+    if not ok:
+        sys.exit(1)
+
+
+def _check_receipt(meta, root, size, conn):
+    """(ok, reason) for one receipt's embedded proof against the published root and size"""
+    try:
+        _, proof_size, _ = decode_proof(meta['proof'])
+    except (ValueError, TypeError):
+        return False, 'malformed proof'
+    if conn is not None and VoteMerkle().is_removed(conn, meta['vote_hash']):
+        return False, 'vote was removed (tombstone in the tree)'
+    if proof_size == size:
+        return verify_proof(meta['vote_hash'], meta['proof'], root, size), 'against the published root'
+    if conn is None:
+        return False, 'proof is for tree size {} but the published size is {}; pass --db or re-issue it with ' \
+                      'issue --size {}'.format(proof_size, size, size)
+    if proof_size > size:
+        return False, 'proof is for tree size {}, after the published size {}'.format(proof_size, size)
+    if not verify_proof(meta['vote_hash'], meta['proof'], meta['root'], proof_size):
+        return False, 'proof does not match the receipt root'
+    if not _consistency(conn, proof_size, meta['root'], size, root):
+        return False, 'receipt root (size {}) is not a prefix of the published tree'.format(proof_size)
+    return True, 'receipt root (size {}) consistent with the published root'.format(proof_size)
+
+
+def cmd_receipt(args):
+    root, size = _published_root(args)
+    if root is None or size is None:
+        print('A published root and its tree size are required (--results, or --root with --size)')
+        sys.exit(2)
+    conn = sqlite3.connect(args.db, timeout=30) if args.db else None
+    failed = 0
+    for path in args.receipts:
+        try:
+            meta = _receipt_metadata(path)
+        except Exception as e:
+            meta, error = None, e
+        else:
+            error = 'no vote proof embedded'
+        if meta is None:
+            print('{}: ERROR {}'.format(path, error))
+            failed += 1
+            continue
+        ok, reason = _check_receipt(meta, root, size, conn)
+        print('{}: {} (vote {}..., {})'.format(path, 'VALID' if ok else 'INVALID', meta['vote_hash'][:12], reason))
+        failed += not ok
+    if failed:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vote Merkle tree and inclusion proof verification')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('root', help='recompute the root from the leaves in one streaming pass')
+    p.add_argument('--db', default='voting_system.db')
+    p.add_argument('--expected', default=None, help='published root to compare with')
+    p.add_argument('--results', default=None, help='results export holding the published root')
+    p.set_defaults(func=cmd_root)
+
+    p = sub.add_parser('issue', help='print the inclusion proof for a person\'s vote')
+    p.add_argument('--db', default='voting_system.db')
+    p.add_argument('--person', type=int, required=True)
+    p.add_argument('--election', type=int, default=None)
+    p.add_argument('--size', type=int, default=None, help='issue against the tree of this size (a published root)')
+    p.set_defaults(func=cmd_issue)
+
+    p = sub.add_parser('proof', help='verify a compact proof offline')
+    p.add_argument('--vote-hash', required=True)
+    p.add_argument('--proof', required=True)
+    p.add_argument('--root', required=True)
+    p.add_argument('--size', type=int, default=None, help='tree size the root was published for')
+    p.add_argument('--bench', type=int, default=0, help='repeat the check N times and report the time per check')
+    p.set_defaults(func=cmd_proof)
+
+    p = sub.add_parser('consistency', help='check that an earlier root is a prefix of the published tree')
+    p.add_argument('--db', default='voting_system.db')
+    p.add_argument('--old-size', type=int, required=True)
+    p.add_argument('--old-root', required=True)
+    p.add_argument('--root', default=None, help='published root')
+    p.add_argument('--size', type=int, default=None, help='tree size of the published root')
+    p.add_argument('--results', default=None, help='results export holding the published root')
+    p.set_defaults(func=cmd_consistency)
+
+    p = sub.add_parser('receipt', help='verify proofs embedded in receipt files against a published root')
+    p.add_argument('receipts', nargs='+')
+    p.add_argument('--root', default=None, help='published root')
+    p.add_argument('--size', type=int, default=None, help='tree size of the published root')
+    p.add_argument('--results', default=None, help='results export holding the published root')
+    p.add_argument('--db', default=None, help='voting database, for consistency proofs from older receipts')
+    p.set_defaults(func=cmd_receipt)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
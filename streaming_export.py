@@ -0,0 +1,275 @@
+"""
+Streaming, optionally compressed export of SQLite tables and queries.
+
+Features:
+- Rows are pulled from the cursor with fetchmany(chunk_size) and written as
+  they arrive, so memory stays constant however large the table is
+- Formats: 'jsonl' (one object per line), 'csv' (header row), 'json' (one
+  array, written incrementally) and 'npy' (columnar: a directory with one
+  .npy file per column; text/blob columns as offsets + UTF-8 bytes, NULLs
+  in a separate validity mask)
+- Compression: 'gzip', or 'zstd' when the zstandard package is installed;
+  inferred from a .gz / .zst suffix by default
+- Blobs become base64 in text formats
+
+Usage:
+    stats = export_table('voting_system.db', 'votes', 'votes.jsonl.gz')
+    stats = export_query('iris_system.db', 'SELECT * FROM access_logs WHERE access_granted = 1', (),
+                         'granted.csv.zst')
+"""
+
+import base64
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+from numpy.lib import format as npy_format
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+FORMATS = ('jsonl', 'csv', 'json', 'npy')
+_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+
+
+def _infer(path: str, fmt: Optional[str], compression: Optional[str]):
+    """Format from the argument or extension (default jsonl), compression from the argument or a .gz/.zst suffix"""
+    base, ext = os.path.splitext(path.rstrip('/\\'))
+    if compression == 'auto':
+        compression = _SUFFIXES.get(ext.lower())
+    if ext.lower() in _SUFFIXES:
+        ext = os.path.splitext(base)[1]
+    fmt = fmt or {'.csv': 'csv', '.json': 'json', '.npy': 'npy'}.get(ext.lower(), 'jsonl')
+    if fmt not in FORMATS:
+        raise ValueError('format must be one of {}'.format(', '.join(FORMATS)))
+    if compression not in (None, 'gzip', 'zstd'):
+        raise ValueError('compression must be gzip or zstd')
+    if compression == 'zstd' and not ZSTD_AVAILABLE:
+        raise RuntimeError('zstd compression needs the zstandard package (pip install zstandard)')
+    return fmt, compression
+
+
+def open_compressed(path: str, compression: Optional[str], level: Optional[int] = None):
+    """Binary writer for path with gzip/zstd (or no) compression"""
+    if compression == 'gzip':
+        return gzip.open(path, 'wb', compresslevel=level or 6)
+    if compression == 'zstd':
+        raw = open(path, 'wb')
+        return zstandard.ZstdCompressor(level=level or 3).stream_writer(raw, closefd=True)
+    return open(path, 'wb')
+
+
+def _text_value(value):
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode('ascii')
+    return value
+
+
+class _NpyColumn:
+    """
+    One column streamed to temp files and assembled into .npy files at the
+    end (the header needs the final length): int64 / float64 values, or
+    offsets + bytes for text and blobs, plus a validity mask if any NULLs.
+    """
+
+    def __init__(self, name: str, tmp_dir: str, stem: str):
+        self.name = name
+        self.kind = None  # 'int', 'float', 'str' or 'bytes', from the first non-NULL value
+        self.rows = 0
+        self.leading_nulls = 0
+        self.has_null = False
+        self.data_bytes = 0
+        # Temp files use a stem, not the column name, which may not be a valid file name
+        self._values = open(os.path.join(tmp_dir, stem + '.values'), 'w+b')
+        self._data = open(os.path.join(tmp_dir, stem + '.data'), 'w+b')
+        self._valid = open(os.path.join(tmp_dir, stem + '.valid'), 'w+b')
+
+    def _start(self, value) -> None:
+        self.kind = ('int' if isinstance(value, int) else 'float' if isinstance(value, float)
+                     else 'bytes' if isinstance(value, bytes) else 'str')
+        if self.kind in ('str', 'bytes'):
+            self._values.write(np.zeros(1, dtype=np.int64).tobytes())  # offsets start at 0
+        for _ in range(self.leading_nulls):
+            self._write_null()
+
+    def _write_null(self) -> None:
+        if self.kind in ('str', 'bytes'):
+            self._values.write(np.int64(self.data_bytes).tobytes())
+        elif self.kind == 'float':
+            self._values.write(np.float64(np.nan).tobytes())
+        else:
+            self._values.write(np.int64(0).tobytes())
+
+    def _promote_to_float(self) -> None:
+        """SQLite columns are not typed: an integer column that meets a REAL is rewritten as float64"""
+        self._values.flush()
+        self._values.seek(0)
+        ints = np.fromfile(self._values, dtype=np.int64)
+        self._valid.flush()
+        self._valid.seek(0)
+        valid = np.fromfile(self._valid, dtype=bool, count=len(ints))
+        self._valid.seek(0, os.SEEK_END)
+        floats = ints.astype(np.float64)
+        floats[~valid] = np.nan
+        self._values.seek(0)
+        self._values.truncate()
+        self._values.write(floats.tobytes())
+        self.kind = 'float'
+
+    def write(self, values: Sequence) -> None:
+        valid = np.fromiter((v is not None for v in values), dtype=bool, count=len(values))
+        self._valid.write(valid.tobytes())
+        self.rows += len(values)
+        if not valid.all():
+            self.has_null = True
+        if self.kind is None:
+            first = next((i for i, v in enumerate(values) if v is not None), None)
+            if first is None:
+                self.leading_nulls += len(values)
+                return
+            self.leading_nulls += first
+            self._start(values[first])
+            values = values[first:]
+        if self.kind == 'int' and any(isinstance(v, float) for v in values):
+            self._promote_to_float()
+        if self.kind == 'int':
+            try:
+                self._values.write(np.array([0 if v is None else v for v in values], dtype=np.int64).tobytes())
+            except (TypeError, ValueError, OverflowError):
+                raise ValueError('column {} mixes integers with other types; export it as jsonl or csv'.format(self.name))
+        elif self.kind == 'float':
+            try:
+                self._values.write(np.array([np.nan if v is None else v for v in values], dtype=np.float64).tobytes())
+            except (TypeError, ValueError):
+                raise ValueError('column {} mixes numbers with other types; export it as jsonl or csv'.format(self.name))
+        else:
+            chunks = [b'' if v is None else v if isinstance(v, bytes) else str(v).encode('utf-8') for v in values]
+            ends = self.data_bytes + np.cumsum([len(c) for c in chunks], dtype=np.int64)
+            self._data.write(b''.join(chunks))
+            self._values.write(ends.tobytes())
+            self.data_bytes = int(ends[-1]) if len(ends) else self.data_bytes
+
+    def _emit(self, out_dir: str, suffix: str, src, dtype, count: int, compression, level) -> str:
+        path = os.path.join(out_dir, self.name + suffix + '.npy') + {'gzip': '.gz', 'zstd': '.zst'}.get(compression, '')
+        with open_compressed(path, compression, level) as f:
+            npy_format.write_array_header_1_0(f, {'descr': npy_format.dtype_to_descr(np.dtype(dtype)),
+                                                  'fortran_order': False, 'shape': (count,)})
+            src.seek(0)
+            shutil.copyfileobj(src, f, 1 << 20)
+        return os.path.basename(path)
+
+    def finish(self, out_dir: str, compression, level) -> Dict:
+        if self.kind is None:
+            self.kind = 'int'  # Only NULLs: zeros with an all-False mask
+            self._values.write(np.zeros(self.rows, dtype=np.int64).tobytes())
+        files = {}
+        if self.kind in ('str', 'bytes'):
+            files['offsets'] = self._emit(out_dir, '.offsets', self._values, np.int64, self.rows + 1, compression, level)
+            files['data'] = self._emit(out_dir, '.data', self._data, np.uint8, self.data_bytes, compression, level)
+        else:
+            dtype = np.int64 if self.kind == 'int' else np.float64
+            files['values'] = self._emit(out_dir, '', self._values, dtype, self.rows, compression, level)
+        if self.has_null:
+            files['valid'] = self._emit(out_dir, '.valid', self._valid, np.bool_, self.rows, compression, level)
+        for f in (self._values, self._data, self._valid):
+            f.close()
+        return {'name': self.name, 'kind': self.kind, 'files': files}
+
+
+def export_cursor(cursor, output_path: str, fmt: Optional[str] = None, compression: Optional[str] = 'auto',
+                  chunk_size: int = 5000, level: Optional[int] = None,
+                  progress: Optional[Callable[[int], None]] = None) -> Dict:
+    """
+    Write the rows of an executed cursor to output_path (a directory for
+    'npy'). Returns {'rows', 'bytes', 'seconds', 'rows_per_sec', ...}.
+    """
+    fmt, compression = _infer(output_path, fmt, compression)
+    columns = [d[0] for d in cursor.description]
+    start = time.perf_counter()
+    rows = 0
+
+    if fmt == 'npy':
+        os.makedirs(output_path, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=output_path) as tmp_dir:
+            cols = [_NpyColumn(name, tmp_dir, 'c{}'.format(i)) for i, name in enumerate(columns)]
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                for i, col in enumerate(cols):
+                    col.write([row[i] for row in chunk])
+                rows += len(chunk)
+                if progress is not None:
+                    progress(rows)
+            schema = []
+            for col in cols:
+                schema.append(col.finish(output_path, compression, level))
+        with open(os.path.join(output_path, 'schema.json'), 'w', encoding='utf-8') as f:
+            json.dump({'rows': rows, 'columns': schema}, f, indent=2)
+        size = sum(os.path.getsize(os.path.join(output_path, n)) for n in os.listdir(output_path))
+    else:
+        with open_compressed(output_path, compression, level) as raw:
+            out = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+            writer = csv.writer(out) if fmt == 'csv' else None
+            if writer is not None:
+                writer.writerow(columns)
+            elif fmt == 'json':
+                out.write('[')
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                if writer is not None:
+                    writer.writerows([[_text_value(v) for v in row] for row in chunk])
+                else:
+                    lines = [json.dumps(dict(zip(columns, map(_text_value, row))), default=str) for row in chunk]
+                    if fmt == 'json':
+                        out.write((',\n' if rows else '\n') + ',\n'.join(lines))
+                    else:
+                        out.write('\n'.join(lines) + '\n')
+                rows += len(chunk)
+                if progress is not None:
+                    progress(rows)
+            if fmt == 'json':
+                out.write('\n]\n')
+            out.flush()
+            out.detach()
+        size = os.path.getsize(output_path)
+
+    seconds = time.perf_counter() - start
+    return {'path': output_path, 'format': fmt, 'compression': compression, 'columns': columns, 'rows': rows,
+            'bytes': size, 'seconds': seconds, 'rows_per_sec': rows / seconds if seconds > 0 else 0.0}
+
+
+def export_query(db_path: str, query: str, params: Sequence, output_path: str, **options) -> Dict:
+    """Stream the result of a read query to a file; see export_cursor for options"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        return export_cursor(conn.execute(query, tuple(params)), output_path, **options)
+    finally:
+        conn.close()
+
+
+def export_table(db_path: str, table: str, output_path: str, **options) -> Dict:
+    """Stream a whole table (in rowid order where it has one) to a file"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        if row is None:
+            raise ValueError('no table named {!r} in {}'.format(table, db_path))
+        order = '' if 'WITHOUT ROWID' in (row[0] or '').upper() else ' ORDER BY rowid'
+        cursor = conn.execute('SELECT * FROM "{}"{}'.format(table.replace('"', '""'), order))
+        return export_cursor(cursor, output_path, **options)
+    finally:
+        conn.close()
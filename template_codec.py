@@ -0,0 +1,153 @@
+"""
+Versioned binary format for biometric templates stored in SQLite BLOBs.
+
+Features:
+- 8-byte aligned little-endian header (magic, format version, dtype, shape,
+  extractor version, quantization and its scale/offset) followed by the raw
+  C-order array buffer
+- Optional float16 or affine uint8 quantization for float templates
+- decode_template() returns an np.frombuffer view over the BLOB (read-only,
+  no copy) unless uint8-quantized floats have to be scaled back
+- Rows still holding legacy pickle BLOBs are read through a restricted
+  unpickler that only admits NumPy array reconstruction
+
+Usage:
+    blob = encode_template(iris, quantize='float16')
+    template = decode_template(blob)
+    info = template_info(blob)   # header only, nothing decoded
+"""
+
+import io
+import pickle
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+TEMPLATE_MAGIC = b'IRTP'
+TEMPLATE_FORMAT_VERSION = 1
+# Bump when the iris/face feature extraction changes incompatibly
+TEMPLATE_EXTRACTOR_VERSION = 1
+
+QUANT_NONE = 0
+QUANT_FLOAT16 = 1
+QUANT_UINT8 = 2
+_QUANT_CODES = {None: QUANT_NONE, 'none': QUANT_NONE, 'float16': QUANT_FLOAT16, 'uint8': QUANT_UINT8}
+
+_DTYPES = {
+    1: np.dtype('<u1'), 2: np.dtype('<f2'), 3: np.dtype('<f4'), 4: np.dtype('<f8'),
+    5: np.dtype('<i2'), 6: np.dtype('<u2'), 7: np.dtype('<i4'), 8: np.dtype('<i8'),
+    9: np.dtype('?'),
+}
+_DTYPE_CODES = {dt: code for code, dt in _DTYPES.items()}
+
+# magic, format version, dtype code, quantization, ndim, extractor version, scale, offset
+_HEADER = struct.Struct('<4sBBBBHxxff')
+_DIM = struct.Struct('<I')
+
+
+def _header_size(ndim: int) -> int:
+    size = _HEADER.size + ndim * _DIM.size
+    return (size + 7) & ~7  # Keep the payload 8-byte aligned
+
+
+def is_encoded_template(blob) -> bool:
+    return blob is not None and bytes(blob[:4]) == TEMPLATE_MAGIC
+
+
+def encode_template(template: np.ndarray, quantize: Optional[str] = None,
+                    extractor_version: int = TEMPLATE_EXTRACTOR_VERSION) -> bytes:
+    """Serialize an array as header + raw buffer, optionally quantized"""
+    arr = np.asarray(template)
+    quant = _QUANT_CODES.get(quantize)
+    if quant is None:
+        raise ValueError("Unknown template quantization: {}".format(quantize))
+    scale, offset = 1.0, 0.0
+    if quant != QUANT_NONE and arr.dtype.kind != 'f':
+        quant = QUANT_NONE  # Integer templates are already compact and exact
+    if quant == QUANT_FLOAT16:
+        arr = arr.astype('<f2')
+    elif quant == QUANT_UINT8:
+        lo = float(arr.min()) if arr.size else 0.0
+        hi = float(arr.max()) if arr.size else 0.0
+        scale = (hi - lo) / 255.0 or 1.0
+        offset = lo
+        arr = np.clip(np.rint((arr - lo) / scale), 0, 255).astype(np.uint8)
+    arr = np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder('<'))
+    dtype_code = _DTYPE_CODES.get(arr.dtype)
+    if dtype_code is None:
+        raise ValueError("Unsupported template dtype: {}".format(arr.dtype))
+    if arr.ndim > 255:
+        raise ValueError("Template has too many dimensions")
+
+    header = bytearray(_header_size(arr.ndim))
+    _HEADER.pack_into(header, 0, TEMPLATE_MAGIC, TEMPLATE_FORMAT_VERSION, dtype_code,
+                      quant, arr.ndim, extractor_version, scale, offset)
+    for i, dim in enumerate(arr.shape):
+        _DIM.pack_into(header, _HEADER.size + i * _DIM.size, dim)
+    return bytes(header) + arr.tobytes()
+
+
+def _read_header(blob) -> Tuple[Dict, int]:
+    if len(blob) < _HEADER.size:
+        raise ValueError("Template BLOB is truncated")
+    magic, version, dtype_code, quant, ndim, extractor, scale, offset = _HEADER.unpack_from(blob, 0)
+    if magic != TEMPLATE_MAGIC:
+        raise ValueError("Not an encoded template")
+    if version > TEMPLATE_FORMAT_VERSION:
+        raise ValueError("Template format version {} is newer than supported".format(version))
+    if dtype_code not in _DTYPES:
+        raise ValueError("Unknown template dtype code: {}".format(dtype_code))
+    shape = tuple(_DIM.unpack_from(blob, _HEADER.size + i * _DIM.size)[0] for i in range(ndim))
+    info = {
+        'format_version': version,
+        'dtype': _DTYPES[dtype_code],
+        'shape': shape,
+        'quantization': {QUANT_NONE: None, QUANT_FLOAT16: 'float16', QUANT_UINT8: 'uint8'}.get(quant),
+        'extractor_version': extractor,
+        'scale': scale,
+        'offset': offset,
+    }
+    return info, _header_size(ndim)
+
+
+def template_info(blob) -> Dict:
+    """Header fields of an encoded template, without touching the payload"""
+    return _read_header(blob)[0]
+
+
+def decode_template(blob, dequantize: bool = True) -> np.ndarray:
+    """
+    Decode a template BLOB.
+
+    Unquantized and float16 templates come back as a read-only view over
+    the BLOB. uint8-quantized floats are scaled back to float32 unless
+    dequantize is False. Legacy pickle BLOBs are still accepted.
+    """
+    if not is_encoded_template(blob):
+        return _load_legacy_pickle(blob)
+    info, data_offset = _read_header(blob)
+    count = int(np.prod(info['shape'], dtype=np.int64))
+    arr = np.frombuffer(blob, dtype=info['dtype'], count=count, offset=data_offset)
+    arr = arr.reshape(info['shape'])
+    if info['quantization'] == 'uint8' and dequantize:
+        arr = arr.astype(np.float32) * np.float32(info['scale']) + np.float32(info['offset'])
+    return arr
+
+
+class _NumpyOnlyUnpickler(pickle.Unpickler):
+    """Unpickler for legacy template rows that refuses anything but ndarrays"""
+
+    _ALLOWED = {'_reconstruct', 'ndarray', 'dtype', 'scalar', '_frombuffer'}
+
+    def find_class(self, module, name):
+        if module.split('.')[0] == 'numpy' and name in self._ALLOWED:
+            return super().find_class(module, name)
+        if (module, name) == ('_codecs', 'encode'):
+            # Protocol 2 pickles carry the array bytes through codecs.encode
+            return super().find_class(module, name)
+        raise pickle.UnpicklingError("Refusing to load {}.{} from a template".format(module, name))
+
+
+def _load_legacy_pickle(blob) -> np.ndarray:
+    return _NumpyOnlyUnpickler(io.BytesIO(bytes(blob))).load()
@@ -2,7 +2,6 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import cv2
-import PIL.Image, PIL.ImageTk
 import time
 import threading
 import sys
@@ -19,6 +18,8 @@ try:
 except ImportError:
     THEME_AVAILABLE = False
 
+from video_presenter import VideoPresenter
+
 # Import Biometric Core
 try:
     from live_recognition import LiveIrisRecognition
@@ -186,6 +187,10 @@ class EnrollmentInterface(LiveIrisRecognition):
             
         self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
         
+        # Single reused PhotoImage, painted at display rate from the UI thread
+        self.presenter = VideoPresenter(self.video_label, size=(640, 480))
+        self.presenter.start()
+        
         self.is_capturing = True
         self.thread = threading.Thread(target=self._capture_loop, daemon=True)
         self.thread.start()
@@ -249,12 +254,8 @@ class EnrollmentInterface(LiveIrisRecognition):
             except Exception as e:
                 print(f"Error: {e}")
 
-            # Display
-            rgb = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-            rgb = cv2.resize(rgb, (640, 480))
-            img = PIL.ImageTk.PhotoImage(image=PIL.Image.fromarray(rgb))
-            self.root.after(10, lambda i=img: self.video_label.configure(image=i))
-            self.video_label.image = img # Limit GC
+            # Display (latest-frame-wins, rate limited; no per-frame after() callbacks)
+            self.presenter.submit(display_frame)
             
             time.sleep(0.01)
 
@@ -308,6 +309,7 @@ class EnrollmentInterface(LiveIrisRecognition):
     def close(self):
         self.is_capturing = False
         self.stop_event.set()
+        if hasattr(self, 'presenter'): self.presenter.stop()
         if hasattr(self, 'cap'): self.cap.release()
         try:
             self.root.destroy()
@@ -8,7 +8,6 @@ import threading
 import time
 import cv2
 import numpy as np
-from PIL import Image, ImageTk
 
 # Import theme support
 try:
@@ -31,6 +30,11 @@ try:
 except ImportError:
     LIVE_REC_AVAILABLE = False
 
+try:
+    from video_presenter import VideoPresenter
+except ImportError:
+    VideoPresenter = None
+
 # Import Keras for model loading
 try:
     from tensorflow.keras.models import model_from_json
@@ -49,6 +53,8 @@ class IntegratedVotingAuthenticator(LiveIrisRecognition if LIVE_REC_AVAILABLE el
         if LIVE_REC_AVAILABLE:
             super().__init__(model=model, iris_extractor=True)
         self.video_label = video_label
+        # Single reused PhotoImage, painted at display rate from the UI thread
+        self.presenter = VideoPresenter(video_label, size=(640, 480)) if VideoPresenter else None
         self.status_var = status_var
         self.target_person_id = int(target_person_id) if target_person_id else None
         self.on_success = on_success
@@ -71,12 +77,16 @@ class IntegratedVotingAuthenticator(LiveIrisRecognition if LIVE_REC_AVAILABLE el
             return
 
         self.is_running = True
+        if self.presenter:
+            self.presenter.start()
         self.thread = threading.Thread(target=self._auth_loop, daemon=True)
         self.thread.start()
 
     def stop(self):
         self.is_running = False
         self.stop_event.set()
+        if self.presenter:
+            self.presenter.stop()
         if hasattr(self, 'cap') and self.cap:
             self.cap.release()
         
@@ -181,24 +191,12 @@ class IntegratedVotingAuthenticator(LiveIrisRecognition if LIVE_REC_AVAILABLE el
             # Update UI
             self.status_var.set(status_text)
             
-            # Convert to Tkinter image
+            # Hand the frame to the presenter (latest-frame-wins, rate limited)
             try:
-                rgb = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-                # Resize specifically for UI speed
-                rgb = cv2.resize(rgb, (640, 480)) 
-                img = Image.fromarray(rgb)
-                imgtk = ImageTk.PhotoImage(image=img)
-                
-                # Schedule update on main thread
-                if self.is_running:
-                     self.video_label.after(10, lambda i=imgtk: self._update_label(i))
+                if self.is_running and self.presenter:
+                    self.presenter.submit(display_frame)
             except Exception as e:
                 print(f"Error updating video: {e}")
-                
-    def _update_label(self, imgtk):
-        if not self.is_running: return
-        self.video_label.configure(image=imgtk)
-        self.video_label.image = imgtk
 
 class UserPortal:
     def __init__(self, root, user_data, logout_callback=None):
@@ -485,12 +483,12 @@ class UserPortal:
              p = db.get_person(self.person_id)
              if p and p.get('iris_template') is not None:
                  tpl = p.get('iris_template')
-                 # Ensure it is a numpy array (it might be bytes/blob from pickle)
+                 # Ensure it is a numpy array (it might be a raw template BLOB)
                  if isinstance(tpl, bytes):
-                     import pickle
+                     from template_codec import decode_template
                      try:
-                         tpl = pickle.loads(tpl)
-                     except:
+                         tpl = decode_template(tpl)
+                     except Exception:
                          pass # data might be raw bytes or different format
                  
                  if isinstance(tpl, np.ndarray):
@@ -0,0 +1,107 @@
+"""
+Rate-limited video presenter for Tkinter labels.
+
+Features:
+- One PhotoImage per label, updated in place with paste() instead of a new
+  image per frame
+- Frames can be submitted from any thread; only the latest one is pending
+- A single UI-thread tick at the display rate paints it, so after() callbacks
+  never pile up when Tk falls behind
+- present() for callers that already run on the Tk thread (video playback)
+
+Usage:
+    presenter = VideoPresenter(video_label, size=(640, 480), fps=30)
+    presenter.start()              # on the Tk thread
+    presenter.submit(bgr_frame)    # from the capture thread
+    presenter.stop()
+"""
+
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+from PIL import Image, ImageTk
+
+
+class VideoPresenter:
+    """Coalesces frames onto a Tk label at a bounded refresh rate."""
+
+    def __init__(self, label, size: Optional[Tuple[int, int]] = (640, 480),
+                 fps: float = 30.0, bgr: bool = True):
+        self.label = label
+        self.size = size  # (width, height); None keeps the frame size
+        self.interval = 1.0 / fps
+        self.bgr = bgr
+        self._lock = threading.Lock()
+        self._pending = None  # Latest converted PIL image, not yet painted
+        self._last_accept = 0.0
+        self._photo = None
+        self._running = False
+        self.presented = 0
+        self.dropped = 0
+
+    def _convert(self, frame, size: Optional[Tuple[int, int]]):
+        if size is not None and (frame.shape[1], frame.shape[0]) != tuple(size):
+            frame = cv2.resize(frame, tuple(size))
+        if self.bgr:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return Image.fromarray(frame)
+
+    def _paint(self, image) -> None:
+        photo = self._photo
+        if photo is None or (photo.width(), photo.height()) != image.size:
+            # Size changed (or first frame): the only time a PhotoImage is created
+            photo = self._photo = ImageTk.PhotoImage(image=image)
+            self.label.configure(image=photo)
+            self.label.image = photo  # Keep a reference against GC
+        else:
+            photo.paste(image)
+        self.presented += 1
+
+    def submit(self, frame, size: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        Offer a frame from any thread. Frames arriving faster than the display
+        rate are dropped before conversion; a frame still waiting to be painted
+        is replaced by the newer one.
+        """
+        now = time.monotonic()
+        if now - self._last_accept < self.interval:
+            self.dropped += 1
+            return False
+        self._last_accept = now
+        image = self._convert(frame, size or self.size)
+        with self._lock:
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = image
+        return True
+
+    def present(self, frame, size: Optional[Tuple[int, int]] = None) -> None:
+        """Paint a frame immediately; must be called on the Tk thread."""
+        self._paint(self._convert(frame, size or self.size))
+
+    def start(self) -> None:
+        """Start the UI-thread refresh tick; call from the Tk thread."""
+        if self._running:
+            return
+        self._running = True
+        self._tick()
+
+    def stop(self) -> None:
+        self._running = False
+        with self._lock:
+            self._pending = None
+
+    def _tick(self) -> None:
+        if not self._running:
+            return
+        with self._lock:
+            image, self._pending = self._pending, None
+        try:
+            if image is not None:
+                self._paint(image)
+            self.label.after(max(1, int(self.interval * 1000)), self._tick)
+        except Exception:
+            # Label destroyed (window closed)
+            self._running = False
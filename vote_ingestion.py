@@ -0,0 +1,235 @@
+"""
+Single-writer vote ingestion for voting_system.db.
+
+Features:
+- Booths submit votes to a bounded queue and get a Future per vote
+- One writer thread commits them in small batches (one transaction and one
+  fsync per batch) instead of one commit per booth, so booths never contend
+  for the SQLite write lock
+- Group commit with bounded latency: a batch is whatever queued up while
+  the previous one was committing, capped at batch_size; max_latency
+  optionally lingers that long after the first vote for a fuller batch
+- Per-vote outcome ('accepted', 'duplicate', 'invalid_party', 'error'); the
+  UNIQUE(person_id, election_id) index still decides duplicates, also
+  within one batch
+- Lock errors retry the whole batch with backoff; the tally cache, tally
+  subscribers and audit trail are updated once the batch is committed
+- A vote whose Future is cancelled before the writer takes it is never
+  written (the writer claims votes with set_running_or_notify_cancel)
+
+Usage:
+    service = voting_system.enable_ingestion(batch_size=64)
+    future = service.submit(person_id, party_id, 0.97, election_id)
+    accepted = future.result()['status'] == 'accepted'
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+
+class VoteIngestionService:
+    """Queues votes from many booths and commits them from one thread."""
+
+    _STOP = object()
+
+    def __init__(self, voting_system, batch_size: int = 64, max_latency: float = 0.0,
+                 queue_size: int = 10000, max_retries: int = 8):
+        self.voting_system = voting_system
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.max_retries = max_retries
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.stats = {'submitted': 0, 'accepted': 0, 'duplicates': 0, 'rejected': 0,
+                      'errors': 0, 'cancelled': 0, 'batches': 0, 'retries': 0}
+        atexit.register(self.close)
+
+    def submit(self, person_id: int, party_id: int, confidence_score: float,
+               election_id: Optional[int] = None) -> Future:
+        """
+        Queue a vote. The Future resolves to {'status', 'vote_hash', 'error'}
+        once the vote's batch is committed (or failed). Blocks while the queue
+        is full rather than dropping votes. future.cancel() withdraws the vote
+        if the writer has not taken it yet.
+        """
+        future = Future()
+        vote = {
+            'person_id': person_id,
+            'party_id': party_id,
+            'confidence_score': confidence_score,
+            'election_id': election_id,
+            'future': future,
+        }
+        self._ensure_started()
+        self._queue.put(vote)
+        self.stats['submitted'] += 1
+        return future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='VoteIngestion', daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout: Optional[float] = 10.0) -> bool:
+        """Wait until everything submitted so far is committed. Returns False on timeout."""
+        if self._thread is None:
+            return True
+        marker = Future()
+        self._queue.put({'future': marker, 'marker': True})
+        try:
+            marker.result(timeout)
+            return True
+        except Exception:
+            return False
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            batch = [item]
+            stop = False
+            # Take what is queued (up to batch_size), lingering up to max_latency for more
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._process(batch)
+            except Exception as e:
+                # Whatever failed, no caller may be left waiting on its Future
+                self._fail(batch, e)
+            if stop:
+                return
+
+    def _fail(self, batch: List[Dict], error: Exception) -> None:
+        for item in batch:
+            future = item['future']
+            if future.done():
+                continue
+            if item.get('marker'):
+                future.set_result(None)
+            else:
+                future.set_result({'status': 'error', 'vote_hash': None, 'error': str(error)})
+                self.stats['errors'] += 1
+
+    def _process(self, batch: List[Dict]) -> None:
+        system = self.voting_system
+        votes = []
+        for vote in batch:
+            if vote.get('marker'):
+                continue
+            # Claim the vote: from here on cancel() fails and the batch decides its outcome
+            if vote['future'].set_running_or_notify_cancel():
+                votes.append(vote)
+            else:
+                self.stats['cancelled'] += 1
+        for vote in votes:
+            vote['vote_hash'] = None
+            try:
+                vote['election_key'] = system._election_key(vote['election_id'])
+                vote['vote_hash'] = system._vote_hash(vote['person_id'], vote['party_id'], vote['election_id'])
+                vote['status'] = 'accepted' if system.is_valid_party(vote['party_id']) else 'invalid_party'
+            except Exception as e:
+                vote['status'], vote['error'] = 'error', e
+
+        error = None
+        committed = None
+        delay = 0.01
+        pending = [v for v in votes if v['status'] != 'error']
+        for attempt in range(self.max_retries + 1 if pending else 0):
+            try:
+                version, committed = self._write(pending)
+                break
+            except sqlite3.OperationalError as e:
+                # 'database is locked' from another process: the batch rolled back, retry it whole
+                error = e
+                self.stats['retries'] += 1
+                time.sleep(delay)
+                delay = min(delay * 2, 1.0)
+            except Exception as e:
+                error = e
+                break
+
+        if not pending:
+            pass
+        elif committed is None:
+            for vote in pending:
+                if vote['status'] == 'accepted':
+                    vote['status'], vote['error'] = 'error', error
+        else:
+            self.stats['batches'] += 1
+            try:
+                system._apply_votes_to_tally(committed, version)
+            except Exception as e:
+                print("⚠️ Tally cache update failed after a committed batch: {}".format(e))
+                system._tally_changed()  # Reloaded from the tally tables on next read
+
+        for vote in votes:
+            status = vote['status']
+            try:
+                if status in ('accepted', 'duplicate'):
+                    system._voters.add(vote['person_id'], vote['election_key'])
+                system._log_vote_outcome(status, vote['person_id'], vote['party_id'], vote['election_id'],
+                                         vote['confidence_score'], vote['vote_hash'] if status == 'accepted' else None,
+                                         error=vote.get('error'))
+            except Exception as e:
+                print("⚠️ Post-commit bookkeeping failed for person {}: {}".format(vote['person_id'], e))
+            self.stats[{'accepted': 'accepted', 'duplicate': 'duplicates',
+                        'invalid_party': 'rejected', 'error': 'errors'}[status]] += 1
+            vote['future'].set_result({
+                'status': status,
+                'vote_hash': vote['vote_hash'] if status == 'accepted' else None,
+                'error': str(vote.get('error')) if status == 'error' else None,
+            })
+        for item in batch:
+            if item.get('marker'):
+                item['future'].set_result(None)
+
+    def _write(self, votes: List[Dict]):
+        """One transaction for the batch; returns (tally version, committed tally deltas)"""
+        system = self.voting_system
+        conn = system._connection()
+        committed = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for vote in votes:
+                if vote['status'] == 'invalid_party':
+                    continue
+                first_vote = system._insert_vote(conn, vote['person_id'], vote['party_id'],
+                                                 vote['confidence_score'], vote['election_key'], vote['vote_hash'])
+                vote['status'] = 'duplicate' if first_vote is None else 'accepted'
+                if first_vote is not None:
+                    committed.append((vote['election_key'], vote['party_id'], first_vote))
+            version = system._tally_version(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            for vote in votes:
+                if vote['status'] == 'duplicate':
+                    vote['status'] = 'accepted'  # Re-decided on retry
+            raise
+        return version, committed
@@ -0,0 +1,312 @@
+"""
+Append-only Merkle accumulator over votes.vote_hash.
+
+Features:
+- Same tree shape and domain-separated hashing as audit_merkle (unpaired
+  nodes promoted), i.e. the RFC 6962 tree over the votes in cast order
+- Stored in the voting database next to the votes: leaves in
+  vote_merkle_leaves, completed interior nodes in vote_merkle_nodes, both
+  written in the vote's own transaction, so a rolled-back vote never
+  reaches the tree
+- O(log n) per appended vote (amortised two node writes), O(log n) root
+  and inclusion proofs from the stored nodes
+- Compact proofs (leaf index, tree size, sibling hashes) as a short string
+  for receipts; verify_proof() checks one in microseconds without the
+  database
+- Consistency proofs (RFC 9162) between two tree sizes, so a receipt's
+  proof against the tree at cast time can be tied to a later published root
+- Removed votes are recorded, not erased: a tombstone leaf ('removed:' +
+  vote_hash) is appended, so the published root commits to the deletion
+- Streaming root recomputation over the leaves with O(log n) memory, for
+  auditors
+
+Usage:
+    tree = VoteMerkle()
+    tree.append(conn, vote_hash)            # inside the vote's transaction
+    size, root = tree.root(conn)
+    proof = tree.proof(conn, vote_hash)     # {'leaf_index', 'tree_size', 'root', 'siblings'}
+    assert verify_proof(vote_hash, encode_proof(proof), root)
+    assert verify_consistency(old_size, old_root, size, root, tree.consistency_proof(conn, old_size, size))
+"""
+
+import base64
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from audit_merkle import NODE_PREFIX, leaf_hash
+
+PROOF_VERSION = 'vmp1'
+TOMBSTONE_PREFIX = 'removed:'
+EMPTY_ROOT = hashlib.sha256(b'').digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def vote_leaf(leaf_index: int, vote_hash: str) -> bytes:
+    return leaf_hash(leaf_index, vote_hash)
+
+
+class MerkleFrontier:
+    """
+    Roots of the perfect subtrees covering the leaves seen so far (one per
+    set bit of the leaf count): enough to append and to compute the root.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self.stack: List[Tuple[int, bytes]] = []  # (level, hash), largest subtree first
+
+    def append(self, leaf: bytes) -> None:
+        level, node = 0, leaf
+        while self.stack and self.stack[-1][0] == level:
+            node = _node_hash(self.stack.pop()[1], node)
+            level += 1
+        self.stack.append((level, node))
+        self.size += 1
+
+    def root(self) -> bytes:
+        if not self.stack:
+            return EMPTY_ROOT
+        node = self.stack[-1][1]
+        for _, left in reversed(self.stack[:-1]):
+            node = _node_hash(left, node)
+        return node
+
+
+class VoteMerkle:
+    """Accumulator tables in a voting database; all methods take the caller's connection."""
+
+    def create_schema(self, cursor) -> None:
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vote_merkle_leaves (
+                leaf_index INTEGER PRIMARY KEY,
+                vote_hash TEXT UNIQUE NOT NULL
+            )
+        ''')
+        # Completed interior nodes: (level, index) covers leaves [index << level, (index + 1) << level)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vote_merkle_nodes (
+                level INTEGER NOT NULL,
+                idx INTEGER NOT NULL,
+                hash BLOB NOT NULL,
+                PRIMARY KEY (level, idx)
+            ) WITHOUT ROWID
+        ''')
+
+    def size(self, conn) -> int:
+        row = conn.execute('SELECT MAX(leaf_index) FROM vote_merkle_leaves').fetchone()
+        return 0 if row[0] is None else row[0] + 1
+
+    def _node(self, conn, level: int, idx: int) -> bytes:
+        if level == 0:
+            row = conn.execute('SELECT vote_hash FROM vote_merkle_leaves WHERE leaf_index = ?', (idx,)).fetchone()
+            return vote_leaf(idx, row[0])
+        return conn.execute('SELECT hash FROM vote_merkle_nodes WHERE level = ? AND idx = ?', (level, idx)).fetchone()[0]
+
+    def append(self, conn, vote_hash: str) -> int:
+        """Add a vote inside the caller's write transaction; returns its leaf index"""
+        index = self.size(conn)
+        conn.execute('INSERT INTO vote_merkle_leaves (leaf_index, vote_hash) VALUES (?, ?)', (index, vote_hash))
+        level, idx, node = 0, index, vote_leaf(index, vote_hash)
+        while idx & 1:  # A right child completes its parent
+            node = _node_hash(self._node(conn, level, idx - 1), node)
+            level, idx = level + 1, idx >> 1
+            conn.execute('INSERT INTO vote_merkle_nodes (level, idx, hash) VALUES (?, ?, ?)', (level, idx, node))
+        return index
+
+    def remove(self, conn, vote_hash: str) -> Optional[int]:
+        """
+        Record a vote's deletion inside the caller's write transaction by
+        appending its tombstone leaf; returns the leaf index, or None if the
+        vote was never in the tree or is already tombstoned.
+        """
+        row = conn.execute('SELECT 1 FROM vote_merkle_leaves WHERE vote_hash IN (?, ?)',
+                           (vote_hash, TOMBSTONE_PREFIX + vote_hash)).fetchall()
+        if len(row) != 1:
+            return None
+        return self.append(conn, TOMBSTONE_PREFIX + vote_hash)
+
+    def is_removed(self, conn, vote_hash: str) -> bool:
+        return conn.execute('SELECT 1 FROM vote_merkle_leaves WHERE vote_hash = ?',
+                            (TOMBSTONE_PREFIX + vote_hash,)).fetchone() is not None
+
+    def catch_up(self, conn) -> int:
+        """Append votes not yet in the tree (older databases, bulk merges) in id order; returns how many"""
+        missing = conn.execute('''
+            SELECT v.vote_hash FROM votes v
+            WHERE NOT EXISTS (SELECT 1 FROM vote_merkle_leaves l WHERE l.vote_hash = v.vote_hash)
+            ORDER BY v.id
+        ''').fetchall()
+        for (vote_hash,) in missing:
+            self.append(conn, vote_hash)
+        return len(missing)
+
+    def _subtree(self, conn, start: int, end: int) -> bytes:
+        """Root of leaves [start, end): stored if perfect and aligned, else split as RFC 6962 does"""
+        n = end - start
+        if n & (n - 1) == 0:
+            level = n.bit_length() - 1
+            return self._node(conn, level, start >> level)
+        k = 1 << ((n - 1).bit_length() - 1)
+        return _node_hash(self._subtree(conn, start, start + k), self._subtree(conn, start + k, end))
+
+    def root(self, conn, size: Optional[int] = None) -> Tuple[int, str]:
+        """(tree size, hex root); size defaults to the current size"""
+        size = self.size(conn) if size is None else size
+        return size, (self._subtree(conn, 0, size) if size else EMPTY_ROOT).hex()
+
+    def proof(self, conn, vote_hash: str, size: Optional[int] = None) -> Optional[Dict]:
+        """Inclusion proof for a vote against the tree of `size` leaves, or None if it is not in it"""
+        row = conn.execute('SELECT leaf_index FROM vote_merkle_leaves WHERE vote_hash = ?', (vote_hash,)).fetchone()
+        size = self.size(conn) if size is None else size
+        if row is None or row[0] >= size:
+            return None
+        index = row[0]
+        siblings = []
+        start, end = 0, size
+        while end - start > 1:  # Top-down, then reversed to leaf-to-root order
+            k = 1 << ((end - start - 1).bit_length() - 1)
+            if index < start + k:
+                siblings.append(self._subtree(conn, start + k, end))
+                end = start + k
+            else:
+                siblings.append(self._subtree(conn, start, start + k))
+                start = start + k
+        siblings.reverse()
+        return {'vote_hash': vote_hash, 'leaf_index': index, 'tree_size': size,
+                'root': self.root(conn, size)[1], 'siblings': [s.hex() for s in siblings]}
+
+    def consistency_proof(self, conn, old_size: int, new_size: Optional[int] = None) -> List[str]:
+        """RFC 9162 consistency proof that the tree of old_size leaves is a prefix of the tree of new_size"""
+        new_size = self.size(conn) if new_size is None else new_size
+        if not 0 < old_size <= new_size or new_size > self.size(conn):
+            raise ValueError('no consistency proof from size {} to {}'.format(old_size, new_size))
+        nodes = []
+
+        def subproof(m: int, start: int, end: int, complete: bool) -> None:
+            n = end - start
+            if m == n:
+                if not complete:
+                    nodes.append(self._subtree(conn, start, end))
+                return
+            k = 1 << ((n - 1).bit_length() - 1)
+            if m <= k:
+                subproof(m, start, start + k, complete)
+                nodes.append(self._subtree(conn, start + k, end))
+            else:
+                subproof(m - k, start + k, end, False)
+                nodes.append(self._subtree(conn, start, start + k))
+
+        subproof(old_size, 0, new_size, True)
+        return [node.hex() for node in nodes]
+
+    def leaves(self, conn, batch: int = 10000) -> Iterable[Tuple[int, str]]:
+        last = -1
+        while True:
+            rows = conn.execute('''
+                SELECT leaf_index, vote_hash FROM vote_merkle_leaves
+                WHERE leaf_index > ? ORDER BY leaf_index LIMIT ?
+            ''', (last, batch)).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last = rows[-1][0]
+
+
+def recompute_root(leaves: Iterable[Tuple[int, str]]) -> Dict:
+    """Streaming pass over (leaf_index, vote_hash) in order; O(log n) memory"""
+    frontier = MerkleFrontier()
+    for index, vote_hash in leaves:
+        if index != frontier.size:
+            return {'valid': False, 'reason': 'leaf {} out of sequence'.format(index), 'tree_size': frontier.size}
+        frontier.append(vote_leaf(index, vote_hash))
+    return {'valid': True, 'tree_size': frontier.size, 'root': frontier.root().hex()}
+
+
+# --- Compact proofs ---
+def encode_proof(proof: Dict) -> str:
+    """'vmp1.<leaf index>.<tree size>.<siblings, base64url>' for receipts"""
+    raw = b''.join(bytes.fromhex(s) for s in proof['siblings'])
+    return '{}.{}.{}.{}'.format(PROOF_VERSION, proof['leaf_index'], proof['tree_size'],
+                                base64.urlsafe_b64encode(raw).decode('ascii').rstrip('='))
+
+
+def decode_proof(text: str) -> Tuple[int, int, List[bytes]]:
+    version, index, size, siblings = text.strip().split('.')
+    if version != PROOF_VERSION:
+        raise ValueError('unsupported proof version {}'.format(version))
+    raw = base64.urlsafe_b64decode(siblings + '=' * (-len(siblings) % 4))
+    if len(raw) % 32:
+        raise ValueError('truncated proof')
+    return int(index), int(size), [raw[i:i + 32] for i in range(0, len(raw), 32)]
+
+
+def root_from_proof(vote_hash: str, index: int, size: int, siblings: List[bytes]) -> Optional[bytes]:
+    """RFC 9162 inclusion verification: the root implied by a proof, or None if it is malformed"""
+    if not 0 <= index < size:
+        return None
+    fn, sn = index, size - 1
+    node = vote_leaf(index, vote_hash)
+    for sibling in siblings:
+        if sn == 0:
+            return None
+        if fn & 1 or fn == sn:
+            node = _node_hash(sibling, node)
+            while not fn & 1 and fn:
+                fn >>= 1
+                sn >>= 1
+        else:
+            node = _node_hash(node, sibling)
+        fn >>= 1
+        sn >>= 1
+    return node if sn == 0 else None
+
+
+def verify_proof(vote_hash: str, proof: str, root: str, tree_size: Optional[int] = None) -> bool:
+    """Check a compact proof against a published root (and tree size, if given)"""
+    try:
+        index, size, siblings = decode_proof(proof)
+    except (ValueError, TypeError):
+        return False
+    if tree_size is not None and size != tree_size:
+        return False
+    computed = root_from_proof(vote_hash, index, size, siblings)
+    return computed is not None and computed.hex() == root.lower()
+
+
+def verify_consistency(old_size: int, old_root: str, new_size: int, new_root: str, proof: List[str]) -> bool:
+    """RFC 9162 consistency verification: the old root's tree is a prefix of the new root's"""
+    try:
+        old, new = bytes.fromhex(old_root), bytes.fromhex(new_root)
+        path = [bytes.fromhex(p) for p in proof]
+    except (ValueError, TypeError):
+        return False
+    if not 0 < old_size <= new_size:
+        return False
+    if old_size == new_size:
+        return not path and old == new
+    if old_size & (old_size - 1) == 0:
+        path = [old] + path  # The old tree is a complete subtree: its root starts the path
+    if not path:
+        return False
+    fn, sn = old_size - 1, new_size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = path[0]
+    for node in path[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = _node_hash(node, fr)
+            sr = _node_hash(node, sr)
+            while not fn & 1 and fn:
+                fn >>= 1
+                sn >>= 1
+        else:
+            sr = _node_hash(sr, node)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and fr == old and sr == new
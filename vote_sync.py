@@ -0,0 +1,356 @@
+"""
+Booth-to-central vote consolidation.
+
+Features:
+- Booths export append-only delta bundles: the votes cast since the last
+  export (keyed by vote_hash, with party names so ids can differ between
+  booths) plus the audit segments sealed since then, under a manifest with
+  SHA-256 digests
+- The central merge reads and checks bundles in a process pool, then applies
+  them in one transaction with set operations on a temp table: vote_hash
+  anti-join for dedup, (person_id, election_id) joins for conflicts with
+  already merged votes and between booths, and a single bulk INSERT
+- Conflicts (the same person voting at two booths) are recorded in
+  vote_conflicts; the earliest vote stands, as with the one-vote constraint
+- Idempotent: merged bundles are remembered and votes dedup by vote_hash,
+  so re-running a merge changes nothing
+
+Usage:
+    bundle = export_delta(voting_system, 'outbox', booth_id='booth-07', audit_logger=audit)
+    report = merge_bundles('central_votes.db', ['inbox/booth-07-000001', ...])
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from vote_merkle import VoteMerkle
+
+BUNDLE_FORMAT = 'vote-delta'
+BUNDLE_VERSION = 1
+_VOTE_FIELDS = ('vote_hash', 'booth_vote_id', 'person_id', 'party_id', 'party_name', 'election_id',
+                'confidence_score', 'timestamp', 'verification_method')
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# --- Booth side ---
+
+def _ensure_sync_state(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            booth_id TEXT PRIMARY KEY,
+            seq INTEGER NOT NULL DEFAULT 0,
+            last_vote_id INTEGER NOT NULL DEFAULT 0,
+            last_audit_segment INTEGER NOT NULL DEFAULT -1,
+            exported_at TIMESTAMP
+        )
+    ''')
+
+
+def export_delta(voting_system, out_dir: str, booth_id: Optional[str] = None,
+                 audit_logger=None) -> Optional[Dict]:
+    """
+    Write the votes cast since the last export (and audit segments sealed
+    since then) as a bundle directory under out_dir. Returns the manifest,
+    or None if there is nothing new. Deleted votes are not propagated.
+    """
+    booth_id = booth_id or socket.gethostname()
+    with sqlite3.connect(voting_system.db_path, timeout=30) as conn:
+        _ensure_sync_state(conn)
+        conn.execute('INSERT OR IGNORE INTO sync_state (booth_id) VALUES (?)', (booth_id,))
+        conn.commit()  # Booths keep voting while the bundle is built: hold no write lock from here on
+
+        # State and delta from one read snapshot
+        conn.execute('BEGIN')
+        seq, last_vote_id, last_segment = conn.execute(
+            'SELECT seq, last_vote_id, last_audit_segment FROM sync_state WHERE booth_id = ?', (booth_id,)).fetchone()
+        rows = conn.execute('''
+            SELECT v.vote_hash, v.id, v.person_id, v.party_id, p.name, v.election_id,
+                   v.confidence_score, v.timestamp, v.verification_method
+            FROM votes v LEFT JOIN parties p ON p.id = v.party_id
+            WHERE v.id > ? ORDER BY v.id
+        ''', (last_vote_id,)).fetchall()
+        conn.commit()
+
+        segments = []
+        if audit_logger is not None:
+            audit_logger.rotate()  # Seal what was logged so far so it travels with these votes
+            segments = [s for s in audit_logger.sealed_segments() if s['index'] > last_segment]
+        if not rows and not segments:
+            return None
+
+        seq += 1
+        name = '{}-{:06d}'.format(booth_id, seq)
+        bundle_dir = os.path.join(out_dir, name)
+        tmp_dir = bundle_dir + '.tmp'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(os.path.join(tmp_dir, 'audit'))
+
+        votes_path = os.path.join(tmp_dir, 'votes.jsonl.gz')
+        with gzip.open(votes_path, 'wt', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(_VOTE_FIELDS, row)), ensure_ascii=False) + '\n')
+        audit_files = {}
+        for seal in segments:
+            for src in (seal['path'], seal['path'].rsplit('.jsonl', 1)[0] + '.seal.json'):
+                dst = os.path.join(tmp_dir, 'audit', os.path.basename(src))
+                shutil.copyfile(src, dst)
+                audit_files[os.path.basename(src)] = _sha256_file(dst)
+
+        manifest = {
+            'format': BUNDLE_FORMAT,
+            'version': BUNDLE_VERSION,
+            'booth_id': booth_id,
+            'seq': seq,
+            'name': name,
+            'first_vote_id': rows[0][1] if rows else None,
+            'last_vote_id': rows[-1][1] if rows else last_vote_id,
+            'votes': len(rows),
+            'votes_sha256': _sha256_file(votes_path),
+            'audit_segments': [s['index'] for s in segments],
+            'audit_files': audit_files,
+            'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_dir, bundle_dir)
+
+        # Only advance the high-water mark once the bundle is complete on disk (short write transaction)
+        conn.execute('''
+            UPDATE sync_state SET seq = ?, last_vote_id = ?, last_audit_segment = ?, exported_at = CURRENT_TIMESTAMP
+            WHERE booth_id = ?
+        ''', (seq, manifest['last_vote_id'], max([last_segment] + manifest['audit_segments']), booth_id))
+        conn.commit()
+    return manifest
+
+
+# --- Central side ---
+
+def read_bundle(bundle_dir: str) -> Dict:
+    """
+    Load and check one bundle; top-level so bundles are parsed in worker
+    processes. Returns the manifest with 'rows' (tuples) or an 'error'.
+    """
+    try:
+        with open(os.path.join(bundle_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != BUNDLE_FORMAT or manifest.get('version', 0) > BUNDLE_VERSION:
+            raise ValueError('not a supported vote delta bundle')
+        votes_path = os.path.join(bundle_dir, 'votes.jsonl.gz')
+        if _sha256_file(votes_path) != manifest['votes_sha256']:
+            raise ValueError('votes.jsonl.gz does not match its manifest digest')
+        for name, digest in manifest.get('audit_files', {}).items():
+            if _sha256_file(os.path.join(bundle_dir, 'audit', name)) != digest:
+                raise ValueError('audit file {} does not match its manifest digest'.format(name))
+        rows = []
+        with gzip.open(votes_path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                vote = json.loads(line)
+                rows.append(tuple(vote[k] for k in _VOTE_FIELDS))
+        if len(rows) != manifest['votes']:
+            raise ValueError('bundle holds {} votes, manifest says {}'.format(len(rows), manifest['votes']))
+        manifest['rows'] = rows
+    except Exception as e:
+        manifest = {'error': str(e)}
+    manifest['path'] = bundle_dir
+    return manifest
+
+
+def _ensure_merge_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS merged_bundles (
+            booth_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            votes_sha256 TEXT NOT NULL,
+            votes INTEGER NOT NULL,
+            merged_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (booth_id, seq)
+        );
+        CREATE TABLE IF NOT EXISTS vote_sources (
+            vote_hash TEXT PRIMARY KEY,
+            booth_id TEXT NOT NULL,
+            booth_vote_id INTEGER,
+            bundle TEXT
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS vote_conflicts (
+            vote_hash TEXT PRIMARY KEY,
+            person_id INTEGER NOT NULL,
+            election_id INTEGER NOT NULL,
+            booth_id TEXT NOT NULL,
+            kept_vote_hash TEXT NOT NULL,
+            kept_booth_id TEXT,
+            detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID;
+    ''')
+
+
+def _party_ids(conn: sqlite3.Connection, bundles: List[Dict]) -> Dict[str, int]:
+    """Central party id per party name, creating parties only a booth knows"""
+    names = {row[4] for b in bundles for row in b['rows'] if row[4]}
+    existing = dict(conn.execute('SELECT name, id FROM parties'))
+    missing = sorted(names - set(existing))
+    if missing:
+        conn.executemany('INSERT INTO parties (name) VALUES (?)', [(n,) for n in missing])
+        existing = dict(conn.execute('SELECT name, id FROM parties'))
+    return existing
+
+
+def merge_bundles(central_db: str, bundle_dirs: List[str], workers: Optional[int] = None,
+                  archive_dir: Optional[str] = None) -> Dict:
+    """
+    Merge booth bundles into the central voting database. Returns a report
+    with per-stage counts and throughput.
+    """
+    from voting_system import VotingSystem
+    VotingSystem(central_db)  # Schema, unique (person, election) index and tally triggers
+
+    report = {'bundles': len(bundle_dirs), 'merged_bundles': 0, 'skipped_bundles': 0, 'failed_bundles': [],
+              'votes_read': 0, 'duplicates': 0, 'conflicts': 0, 'inserted': 0, 'audit_files': 0}
+    start = time.perf_counter()
+    if len(bundle_dirs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            bundles = list(pool.map(read_bundle, bundle_dirs))
+    else:
+        bundles = [read_bundle(path) for path in bundle_dirs]
+    report['read_seconds'] = time.perf_counter() - start
+
+    merge_start = time.perf_counter()
+    conn = sqlite3.connect(central_db, timeout=60)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        _ensure_merge_schema(conn)
+        merged = {(b, s): digest for b, s, digest in conn.execute('SELECT booth_id, seq, votes_sha256 FROM merged_bundles')}
+        todo = []
+        for bundle in bundles:
+            if 'error' in bundle:
+                report['failed_bundles'].append({'path': bundle['path'], 'error': bundle['error']})
+                continue
+            key = (bundle['booth_id'], bundle['seq'])
+            if key in merged or key in {(b['booth_id'], b['seq']) for b in todo}:
+                if merged.get(key, bundle['votes_sha256']) != bundle['votes_sha256']:
+                    report['failed_bundles'].append({'path': bundle['path'],
+                                                     'error': 'bundle was already merged with different content'})
+                else:
+                    report['skipped_bundles'] += 1
+                continue
+            todo.append(bundle)
+
+        conn.execute('BEGIN IMMEDIATE')
+        parties = _party_ids(conn, todo)
+        conn.execute('''
+            CREATE TEMP TABLE incoming (
+                vote_hash TEXT PRIMARY KEY,
+                person_id INTEGER NOT NULL,
+                party_id INTEGER NOT NULL,
+                election_id INTEGER NOT NULL,
+                confidence_score REAL NOT NULL,
+                timestamp TIMESTAMP,
+                verification_method TEXT,
+                booth_id TEXT NOT NULL,
+                booth_vote_id INTEGER,
+                bundle TEXT
+            )
+        ''')
+        for bundle in todo:
+            booth_id, name = bundle['booth_id'], bundle['name']
+            report['votes_read'] += len(bundle['rows'])
+            conn.executemany('INSERT OR IGNORE INTO incoming VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', [
+                (vote_hash, person_id, parties.get(party_name, party_id), election_id, confidence, ts, method,
+                 booth_id, booth_vote_id, name)
+                for vote_hash, booth_vote_id, person_id, party_id, party_name, election_id, confidence, ts, method
+                in bundle['rows']])
+        conn.execute('CREATE INDEX temp.idx_incoming_person ON incoming(person_id, election_id)')
+
+        # Dedup: votes already merged (anti-join on the vote_hash index)
+        report['duplicates'] = report['votes_read'] - conn.execute('SELECT COUNT(*) FROM incoming').fetchone()[0]
+        report['duplicates'] += conn.execute('''
+            DELETE FROM incoming WHERE EXISTS (SELECT 1 FROM votes v WHERE v.vote_hash = incoming.vote_hash)
+        ''').rowcount
+
+        # Conflicts with votes already in the central database: those stand
+        conn.execute('''
+            INSERT OR IGNORE INTO vote_conflicts (vote_hash, person_id, election_id, booth_id, kept_vote_hash, kept_booth_id)
+            SELECT i.vote_hash, i.person_id, i.election_id, i.booth_id, v.vote_hash, s.booth_id
+            FROM incoming i
+            JOIN votes v ON v.person_id = i.person_id AND v.election_id = i.election_id
+            LEFT JOIN vote_sources s ON s.vote_hash = v.vote_hash
+        ''')
+        report['conflicts'] += conn.execute('''
+            DELETE FROM incoming WHERE EXISTS (
+                SELECT 1 FROM votes v WHERE v.person_id = incoming.person_id AND v.election_id = incoming.election_id)
+        ''').rowcount
+
+        # Conflicts between incoming votes: the earliest cast stands
+        conn.execute('''
+            CREATE TEMP TABLE winners AS
+            SELECT person_id, election_id, MIN(COALESCE(timestamp, '') || '|' || vote_hash) AS win_key
+            FROM incoming GROUP BY person_id, election_id HAVING COUNT(*) > 1
+        ''')
+        conn.execute('''
+            INSERT OR IGNORE INTO vote_conflicts (vote_hash, person_id, election_id, booth_id, kept_vote_hash, kept_booth_id)
+            SELECT i.vote_hash, i.person_id, i.election_id, i.booth_id, k.vote_hash, k.booth_id
+            FROM winners w
+            JOIN incoming i ON i.person_id = w.person_id AND i.election_id = w.election_id
+            JOIN incoming k ON k.vote_hash = substr(w.win_key, instr(w.win_key, '|') + 1)
+            WHERE i.vote_hash != k.vote_hash
+        ''')
+        report['conflicts'] += conn.execute('''
+            DELETE FROM incoming WHERE vote_hash IN (
+                SELECT i.vote_hash FROM winners w
+                JOIN incoming i ON i.person_id = w.person_id AND i.election_id = w.election_id
+                WHERE COALESCE(i.timestamp, '') || '|' || i.vote_hash != w.win_key)
+        ''').rowcount
+
+        report['inserted'] = conn.execute('''
+            INSERT INTO votes (person_id, party_id, confidence_score, vote_hash, timestamp, verification_method, election_id)
+            SELECT person_id, party_id, confidence_score, vote_hash, COALESCE(timestamp, CURRENT_TIMESTAMP),
+                   COALESCE(verification_method, 'iris'), election_id
+            FROM incoming ORDER BY timestamp, vote_hash
+        ''').rowcount
+        conn.execute('''
+            INSERT OR IGNORE INTO vote_sources (vote_hash, booth_id, booth_vote_id, bundle)
+            SELECT vote_hash, booth_id, booth_vote_id, bundle FROM incoming
+        ''')
+        VoteMerkle().catch_up(conn)  # Merged votes join the central vote Merkle tree in id order
+        conn.executemany('INSERT INTO merged_bundles (booth_id, seq, votes_sha256, votes) VALUES (?, ?, ?, ?)',
+                         [(b['booth_id'], b['seq'], b['votes_sha256'], b['votes']) for b in todo])
+        conn.execute('DROP TABLE temp.winners')
+        conn.execute('DROP TABLE temp.incoming')
+        conn.commit()
+        report['merged_bundles'] = len(todo)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    report['merge_seconds'] = time.perf_counter() - merge_start
+
+    # Booth audit segments are archived as shipped; their HMACs need the booth's secret to verify
+    if archive_dir:
+        for bundle in todo:
+            target = os.path.join(archive_dir, bundle['booth_id'])
+            os.makedirs(target, exist_ok=True)
+            for name in bundle.get('audit_files', {}):
+                dst = os.path.join(target, name)
+                if not os.path.exists(dst):
+                    shutil.copyfile(os.path.join(bundle['path'], 'audit', name), dst)
+                    report['audit_files'] += 1
+
+    elapsed = report['read_seconds'] + report['merge_seconds']
+    report['votes_per_sec'] = report['votes_read'] / elapsed if elapsed > 0 else 0.0
+    return report
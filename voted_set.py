@@ -0,0 +1,249 @@
+"""
+In-memory voted sets for O(1) has_voted checks.
+
+Features:
+- VotedSet: NumPy bit array indexed by person id (one bit per voter id),
+  growing by doubling; ids outside the array range go to a small side set
+- VoterIndex: one VotedSet for "voted in any election" plus one per
+  election, built from the votes table and kept current by the cast path
+- Snapshot next to the database (np.savez) for a fast restart: on load only
+  the votes added since the snapshot are read; if anything else changed the
+  votes table (a delete, an update, a tally rewrite) the index is rebuilt
+- Consistency check against the trigger-maintained tally totals on load
+
+Usage:
+    index = VoterIndex.open('voting_system.db')
+    index.has_voted(person_id)            # any election
+    index.has_voted(person_id, election_id)
+    index.add(person_id, election_id)     # after a committed vote
+    index.save()
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Ids beyond this are kept in the side set instead of growing the array to match
+MAX_BITMAP_ID = 1 << 32
+
+
+class VotedSet:
+    """Set of non-negative integer ids as a bit array (thread-safe writes)."""
+
+    def __init__(self, bits: Optional[np.ndarray] = None, others: Iterable[int] = ()):
+        self._bits = bits if bits is not None else np.zeros(1024, dtype=np.uint8)
+        self._others = set(others)
+        self._lock = threading.Lock()
+        self._count = int(np.unpackbits(self._bits).sum()) + len(self._others)
+
+    def __contains__(self, person_id: int) -> bool:
+        i = int(person_id)
+        if 0 <= i < MAX_BITMAP_ID:
+            byte = i >> 3
+            return byte < len(self._bits) and bool((self._bits[byte] >> (i & 7)) & 1)
+        return i in self._others
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _grow(self, byte: int) -> None:
+        size = len(self._bits)
+        while size <= byte:
+            size *= 2
+        bits = np.zeros(size, dtype=np.uint8)
+        bits[:len(self._bits)] = self._bits
+        self._bits = bits
+
+    def add(self, person_id: int) -> bool:
+        """Add an id; returns True if it was not already present"""
+        i = int(person_id)
+        with self._lock:
+            if not 0 <= i < MAX_BITMAP_ID:
+                if i in self._others:
+                    return False
+                self._others.add(i)
+            else:
+                byte, mask = i >> 3, np.uint8(1 << (i & 7))
+                if byte >= len(self._bits):
+                    self._grow(byte)
+                if self._bits[byte] & mask:
+                    return False
+                self._bits[byte] |= mask
+            self._count += 1
+            return True
+
+    def add_many(self, person_ids: np.ndarray) -> None:
+        """Vectorised add for bulk loads"""
+        ids = np.asarray(person_ids, dtype=np.int64)
+        in_range = (ids >= 0) & (ids < MAX_BITMAP_ID)
+        with self._lock:
+            self._others.update(int(i) for i in ids[~in_range])
+            ids = ids[in_range]
+            if len(ids):
+                if (int(ids.max()) >> 3) >= len(self._bits):
+                    self._grow(int(ids.max()) >> 3)
+                np.bitwise_or.at(self._bits, ids >> 3, (1 << (ids & 7)).astype(np.uint8))
+            self._count = int(np.unpackbits(self._bits).sum()) + len(self._others)
+
+    def discard(self, person_id: int) -> None:
+        i = int(person_id)
+        with self._lock:
+            if i not in self:
+                return
+            if 0 <= i < MAX_BITMAP_ID:
+                self._bits[i >> 3] &= np.uint8(~(1 << (i & 7)) & 0xFF)
+            else:
+                self._others.discard(i)
+            self._count -= 1
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._bits.nbytes)
+
+
+class VoterIndex:
+    """
+    Who has voted, per election and overall. Mirrors the votes table as of
+    tally version `version` (the trigger-maintained counter in tally_totals)
+    and vote id `max_id`; votes committed by other processes are picked up
+    by refresh().
+    """
+
+    def __init__(self, db_path: str, snapshot_path: Optional[str] = None):
+        # Absolute, so a chdir before the exit-time save() cannot redirect it
+        self.db_path = os.path.abspath(db_path) if db_path != ':memory:' else db_path
+        if snapshot_path is None and db_path != ':memory:':
+            snapshot_path = self.db_path + '.voted.npz'
+        self.snapshot_path = snapshot_path
+        self.voted = VotedSet()
+        self.elections: Dict[int, VotedSet] = {}
+        self.version = -1
+        self.max_id = 0
+        self._refresh_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, db_path: str, snapshot_path: Optional[str] = None) -> 'VoterIndex':
+        """Load the snapshot if it still matches the database, else build from the votes table"""
+        index = cls(db_path, snapshot_path)
+        if not index._load_snapshot() or not index.refresh():
+            index.rebuild()
+        return index
+
+    # --- Lookups and updates ---
+    def has_voted(self, person_id: int, election_id: Optional[int] = None) -> bool:
+        if election_id is None:
+            return person_id in self.voted
+        voted = self.elections.get(int(election_id))
+        return voted is not None and person_id in voted
+
+    def add(self, person_id: int, election_id: int) -> None:
+        """Record a committed vote (the next refresh() reads it back from the table anyway)"""
+        self.voted.add(person_id)
+        voted = self.elections.get(election_id)
+        if voted is None:
+            voted = self.elections.setdefault(election_id, VotedSet())
+        voted.add(person_id)
+
+    def remove_person(self, person_id: int) -> None:
+        self.voted.discard(person_id)
+        for voted in self.elections.values():
+            voted.discard(person_id)
+
+    def clear(self) -> None:
+        self.voted = VotedSet()
+        self.elections = {}
+
+    def stats(self) -> Dict:
+        return {
+            'voters': len(self.voted),
+            'elections': {e: len(v) for e, v in self.elections.items()},
+            'bytes': self.voted.nbytes + sum(v.nbytes for v in self.elections.values()),
+            'version': self.version,
+            'max_id': self.max_id,
+        }
+
+    # --- Sync with the votes table ---
+    def rebuild(self) -> None:
+        """Build from a full scan of the votes table"""
+        with self._refresh_lock, sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.execute('BEGIN')  # One read snapshot for the version and the rows
+            version = conn.execute('SELECT version FROM tally_totals WHERE id = 1').fetchone()[0]
+            rows = np.array(conn.execute('SELECT id, person_id, election_id FROM votes').fetchall(),
+                            dtype=np.int64).reshape(-1, 3)
+            conn.rollback()
+        voted, elections = VotedSet(), {}
+        voted.add_many(rows[:, 1])
+        for election_id in np.unique(rows[:, 2]):
+            elections[int(election_id)] = VotedSet()
+            elections[int(election_id)].add_many(rows[rows[:, 2] == election_id, 1])
+        self.voted, self.elections = voted, elections
+        self.version = version
+        self.max_id = int(rows[:, 0].max()) if len(rows) else 0
+
+    def refresh(self) -> bool:
+        """
+        Catch up with votes added since the last sync. Returns False if the
+        table changed in any other way or the result disagrees with the
+        tally totals, in which case rebuild() is needed.
+        """
+        with self._refresh_lock, sqlite3.connect(self.db_path, timeout=30) as conn:
+            conn.execute('BEGIN')
+            version, total_voters = conn.execute(
+                'SELECT version, total_voters FROM tally_totals WHERE id = 1').fetchone()
+            if version == self.version:
+                conn.rollback()
+                return True
+            rows = conn.execute('SELECT id, person_id, election_id FROM votes WHERE id > ?',
+                                (self.max_id,)).fetchall()
+            per_election = dict(conn.execute('SELECT election_id, SUM(votes) FROM vote_tally GROUP BY election_id'))
+            conn.rollback()
+        if version != self.version + len(rows):
+            return False  # Deletes, updates or a tally rewrite since the last sync
+        for _, person_id, election_id in rows:
+            self.add(person_id, election_id)
+        if len(self.voted) != total_voters or any(
+                len(self.elections.get(e, ())) != n for e, n in per_election.items() if n):
+            return False
+        self.version = version
+        self.max_id = max([self.max_id] + [row[0] for row in rows])
+        return True
+
+    # --- Snapshot ---
+    def save(self) -> bool:
+        """Write a snapshot as of the current database state; returns False if there is nowhere to write it"""
+        if not self.snapshot_path or not os.path.exists(self.db_path):
+            return False  # Nothing to snapshot (and connecting would create an empty database)
+        if not self.refresh():
+            self.rebuild()
+        arrays = {
+            'meta': np.array([self.version, self.max_id], dtype=np.int64),
+            'any': self.voted._bits,
+            'any_others': np.array(sorted(self.voted._others), dtype=np.int64),
+        }
+        for election_id, voted in self.elections.items():
+            arrays['e{}'.format(election_id)] = voted._bits
+            arrays['e{}_others'.format(election_id)] = np.array(sorted(voted._others), dtype=np.int64)
+        tmp = self.snapshot_path + '.tmp.npz'
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, self.snapshot_path)
+        return True
+
+    def _load_snapshot(self) -> bool:
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with np.load(self.snapshot_path) as data:
+                self.version, self.max_id = (int(x) for x in data['meta'])
+                self.voted = VotedSet(data['any'].copy(), data['any_others'].tolist())
+                self.elections = {}
+                for key in data.files:
+                    if key.startswith('e') and not key.endswith('_others'):
+                        self.elections[int(key[1:])] = VotedSet(data[key].copy(), data[key + '_others'].tolist())
+            return True
+        except Exception:
+            self.clear()
+            self.version, self.max_id = -1, 0
+            return False
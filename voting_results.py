@@ -407,9 +407,6 @@ def show_voting_results():
     results_window.geometry("1200x800")
     results_window.configure(bg='#1a1a2e')
     
-    # Get voting results
-    results_data = voting_system.get_voting_results()
-    
     # Header
     header_frame = tk.Frame(results_window, bg='#1a1a2e')
     header_frame.pack(fill=tk.X, padx=20, pady=20)
@@ -427,26 +424,23 @@ def show_voting_results():
     stats_container = tk.Frame(stats_frame, bg='#2d2d44')
     stats_container.pack(pady=15)
     
-    # Total votes
-    noisy_total = int(differential_privacy_count(results_data['total_votes']))
+    # Total votes (label texts are filled in by render() below)
     total_votes_label = tk.Label(stats_container,
-                                text="📊 Total Votes (DP): {}".format(noisy_total),
+                                text="📊 Total Votes (DP): -",
                                 font=('Segoe UI', 14, 'bold'),
                                 fg='#4CAF50', bg='#2d2d44')
     total_votes_label.pack(side=tk.LEFT, padx=20)
 
     # Total voters
-    noisy_voters = int(differential_privacy_count(results_data['total_voters']))
     total_voters_label = tk.Label(stats_container,
-                                 text="👥 Total Voters (DP): {}".format(noisy_voters),
+                                 text="👥 Total Voters (DP): -",
                                  font=('Segoe UI', 14, 'bold'),
                                  fg='#2196F3', bg='#2d2d44')
     total_voters_label.pack(side=tk.LEFT, padx=20)
 
-    # Turnout percentage (assuming 108 registered voters)
-    turnout = (results_data['total_voters'] / 108) * 100 if results_data['total_voters'] > 0 else 0
+    # Turnout percentage against the registered voter roll
     turnout_label = tk.Label(stats_container,
-                            text="📈 Turnout: {:.1f}%".format(turnout),
+                            text="📈 Turnout: -",
                             font=('Segoe UI', 14, 'bold'),
                             fg='#FF9800', bg='#2d2d44')
     turnout_label.pack(side=tk.LEFT, padx=20)
@@ -459,84 +453,90 @@ def show_voting_results():
     updated_label.pack(side=tk.RIGHT, padx=20)
 
     # WINNER ANNOUNCEMENT SECTION - NEW FEATURE
-    if results_data['total_votes'] > 0:
-        # Find the winning party (highest votes)
-        winning_party = max(results_data['results'], key=lambda x: x['votes'])
-
-        # Check if there's a clear winner (not a tie)
-        max_votes = winning_party['votes']
-        parties_with_max_votes = [p for p in results_data['results'] if p['votes'] == max_votes]
-
-        # Winner announcement frame
-        winner_frame = tk.Frame(results_window, bg='#1a1a2e')
-        winner_frame.pack(fill=tk.X, padx=20, pady=(10, 0))
-
-        # Winner container with special styling
-        winner_container = tk.Frame(winner_frame, bg='#4CAF50', relief='solid', bd=3)
-        winner_container.pack(fill=tk.X, pady=10)
-
-        if len(parties_with_max_votes) == 1 and max_votes > 0:
-            # Clear winner
-            winner_title = tk.Label(winner_container,
-                                  text="🏆 ELECTION WINNER 🏆",
-                                  font=('Segoe UI', 18, 'bold'),
-                                  fg='white', bg='#4CAF50')
-            winner_title.pack(pady=(15, 5))
-
-            winner_party = tk.Label(winner_container,
-                                  text="{} {}".format(winning_party['symbol'], winning_party['party']),
-                                  font=('Segoe UI', 24, 'bold'),
-                                  fg='white', bg='#4CAF50')
-            winner_party.pack(pady=5)
-
-            winner_stats = tk.Label(winner_container,
-                                  text="{} votes ({:.1f}% of total votes)".format(
-                                      winning_party['votes'],
-                                      winning_party['percentage']),
-                                  font=('Segoe UI', 14),
-                                  fg='white', bg='#4CAF50')
-            winner_stats.pack(pady=(5, 15))
-
-        elif len(parties_with_max_votes) > 1 and max_votes > 0:
-            # Tie situation
-            winner_container.configure(bg='#FF9800')  # Orange for tie
-
-            tie_title = tk.Label(winner_container,
-                               text="🤝 ELECTION TIE 🤝",
-                               font=('Segoe UI', 18, 'bold'),
-                               fg='white', bg='#FF9800')
-            tie_title.pack(pady=(15, 5))
-
-            tie_parties_text = " & ".join(["{} {}".format(p['symbol'], p['party']) for p in parties_with_max_votes])
-            tie_parties = tk.Label(winner_container,
-                                 text=tie_parties_text,
-                                 font=('Segoe UI', 20, 'bold'),
-                                 fg='white', bg='#FF9800')
-            tie_parties.pack(pady=5)
-
-            tie_stats = tk.Label(winner_container,
-                               text="Each with {} votes ({:.1f}% of total votes)".format(
-                                   max_votes,
-                                   (max_votes / results_data['total_votes']) * 100),
-                               font=('Segoe UI', 14),
-                               fg='white', bg='#FF9800')
-            tie_stats.pack(pady=(5, 15))
+    winner_holder = tk.Frame(results_window, bg='#1a1a2e')
+    winner_holder.pack(fill=tk.X)
 
-        else:
-            # No votes cast yet
-            winner_container.configure(bg='#607D8B')  # Gray for no votes
+    def render_winner(results_data):
+        for child in winner_holder.winfo_children():
+            child.destroy()
+        if results_data['total_votes'] > 0:
+            # Find the winning party (highest votes)
+            winning_party = max(results_data['results'], key=lambda x: x['votes'])
+
+            # Check if there's a clear winner (not a tie)
+            max_votes = winning_party['votes']
+            parties_with_max_votes = [p for p in results_data['results'] if p['votes'] == max_votes]
+
+            # Winner announcement frame
+            winner_frame = tk.Frame(winner_holder, bg='#1a1a2e')
+            winner_frame.pack(fill=tk.X, padx=20, pady=(10, 0))
+
+            # Winner container with special styling
+            winner_container = tk.Frame(winner_frame, bg='#4CAF50', relief='solid', bd=3)
+            winner_container.pack(fill=tk.X, pady=10)
+
+            if len(parties_with_max_votes) == 1 and max_votes > 0:
+                # Clear winner
+                winner_title = tk.Label(winner_container,
+                                      text="🏆 ELECTION WINNER 🏆",
+                                      font=('Segoe UI', 18, 'bold'),
+                                      fg='white', bg='#4CAF50')
+                winner_title.pack(pady=(15, 5))
+
+                winner_party = tk.Label(winner_container,
+                                      text="{} {}".format(winning_party['symbol'], winning_party['party']),
+                                      font=('Segoe UI', 24, 'bold'),
+                                      fg='white', bg='#4CAF50')
+                winner_party.pack(pady=5)
+
+                winner_stats = tk.Label(winner_container,
+                                      text="{} votes ({:.1f}% of total votes)".format(
+                                          winning_party['votes'],
+                                          winning_party['percentage']),
+                                      font=('Segoe UI', 14),
+                                      fg='white', bg='#4CAF50')
+                winner_stats.pack(pady=(5, 15))
+
+            elif len(parties_with_max_votes) > 1 and max_votes > 0:
+                # Tie situation
+                winner_container.configure(bg='#FF9800')  # Orange for tie
+
+                tie_title = tk.Label(winner_container,
+                                   text="🤝 ELECTION TIE 🤝",
+                                   font=('Segoe UI', 18, 'bold'),
+                                   fg='white', bg='#FF9800')
+                tie_title.pack(pady=(15, 5))
+
+                tie_parties_text = " & ".join(["{} {}".format(p['symbol'], p['party']) for p in parties_with_max_votes])
+                tie_parties = tk.Label(winner_container,
+                                     text=tie_parties_text,
+                                     font=('Segoe UI', 20, 'bold'),
+                                     fg='white', bg='#FF9800')
+                tie_parties.pack(pady=5)
+
+                tie_stats = tk.Label(winner_container,
+                                   text="Each with {} votes ({:.1f}% of total votes)".format(
+                                       max_votes,
+                                       (max_votes / results_data['total_votes']) * 100),
+                                   font=('Segoe UI', 14),
+                                   fg='white', bg='#FF9800')
+                tie_stats.pack(pady=(5, 15))
+
+            else:
+                # No votes cast yet
+                winner_container.configure(bg='#607D8B')  # Gray for no votes
 
-            no_votes_title = tk.Label(winner_container,
-                                    text="📊 NO VOTES CAST YET",
-                                    font=('Segoe UI', 18, 'bold'),
-                                    fg='white', bg='#607D8B')
-            no_votes_title.pack(pady=(15, 5))
+                no_votes_title = tk.Label(winner_container,
+                                        text="📊 NO VOTES CAST YET",
+                                        font=('Segoe UI', 18, 'bold'),
+                                        fg='white', bg='#607D8B')
+                no_votes_title.pack(pady=(15, 5))
 
-            no_votes_msg = tk.Label(winner_container,
-                                  text="Start voting to see election results!",
-                                  font=('Segoe UI', 14),
-                                  fg='white', bg='#607D8B')
-            no_votes_msg.pack(pady=(5, 15))
+                no_votes_msg = tk.Label(winner_container,
+                                      text="Start voting to see election results!",
+                                      font=('Segoe UI', 14),
+                                      fg='white', bg='#607D8B')
+                no_votes_msg.pack(pady=(5, 15))
     
     # Main content frame
     content_frame = tk.Frame(results_window, bg='#1a1a2e')
@@ -587,46 +587,49 @@ def show_voting_results():
     results_scrollbar.pack(side="right", fill="y")
     
     # Add results rows
-    for i, result in enumerate(results_data['results']):
-        row_bg = '#2d2d44' if i % 2 == 0 else '#3d3d54'
+    def render_rows(results_data):
+        for child in results_scrollable.winfo_children():
+            child.destroy()
+        for i, result in enumerate(results_data['results']):
+            row_bg = '#2d2d44' if i % 2 == 0 else '#3d3d54'
         
-        row_frame = tk.Frame(results_scrollable, bg=row_bg)
-        row_frame.pack(fill=tk.X, padx=2, pady=1)
+            row_frame = tk.Frame(results_scrollable, bg=row_bg)
+            row_frame.pack(fill=tk.X, padx=2, pady=1)
         
-        # Party name with symbol
-        party_label = tk.Label(row_frame,
-                              text="{} {}".format(result['symbol'], result['party']),
-                              font=('Segoe UI', 11),
-                              fg='white', bg=row_bg, width=20, anchor='w')
-        party_label.pack(side=tk.LEFT, padx=5, pady=5)
-
-        # Vote count
-        votes_label = tk.Label(row_frame,
-                              text=str(result['votes']),
-                              font=('Segoe UI', 11, 'bold'),
-                              fg='#4CAF50', bg=row_bg, width=10)
-        votes_label.pack(side=tk.LEFT, padx=5, pady=5)
-
-        # Percentage
-        percentage_label = tk.Label(row_frame,
-                                   text="{:.1f}%".format(result['percentage']),
-                                   font=('Segoe UI', 11),
-                                   fg='#2196F3', bg=row_bg, width=12)
-        percentage_label.pack(side=tk.LEFT, padx=5, pady=5)
+            # Party name with symbol
+            party_label = tk.Label(row_frame,
+                                  text="{} {}".format(result['symbol'], result['party']),
+                                  font=('Segoe UI', 11),
+                                  fg='white', bg=row_bg, width=20, anchor='w')
+            party_label.pack(side=tk.LEFT, padx=5, pady=5)
+
+            # Vote count
+            votes_label = tk.Label(row_frame,
+                                  text=str(result['votes']),
+                                  font=('Segoe UI', 11, 'bold'),
+                                  fg='#4CAF50', bg=row_bg, width=10)
+            votes_label.pack(side=tk.LEFT, padx=5, pady=5)
+
+            # Percentage
+            percentage_label = tk.Label(row_frame,
+                                       text="{:.1f}%".format(result['percentage']),
+                                       font=('Segoe UI', 11),
+                                       fg='#2196F3', bg=row_bg, width=12)
+            percentage_label.pack(side=tk.LEFT, padx=5, pady=5)
         
-        # Progress bar
-        bar_frame = tk.Frame(row_frame, bg=row_bg, width=200, height=20)
-        bar_frame.pack(side=tk.LEFT, padx=5, pady=5)
-        bar_frame.pack_propagate(False)
+            # Progress bar
+            bar_frame = tk.Frame(row_frame, bg=row_bg, width=200, height=20)
+            bar_frame.pack(side=tk.LEFT, padx=5, pady=5)
+            bar_frame.pack_propagate(False)
         
-        if results_data['total_votes'] > 0:
-            bar_width = int((result['percentage'] / 100) * 180)
-            if bar_width > 0:
-                bar_canvas = tk.Canvas(bar_frame, bg=row_bg, highlightthickness=0, width=200, height=20)
-                bar_canvas.pack()
-                bar_canvas.create_rectangle(0, 2, bar_width, 18, fill=result['color'], outline="")
-                bar_canvas.create_text(90, 10, text="{:.1f}%".format(result['percentage']),
-                                     fill='white', font=('Segoe UI', 8, 'bold'))
+            if results_data['total_votes'] > 0:
+                bar_width = int((result['percentage'] / 100) * 180)
+                if bar_width > 0:
+                    bar_canvas = tk.Canvas(bar_frame, bg=row_bg, highlightthickness=0, width=200, height=20)
+                    bar_canvas.pack()
+                    bar_canvas.create_rectangle(0, 2, bar_width, 18, fill=result['color'], outline="")
+                    bar_canvas.create_text(90, 10, text="{:.1f}%".format(result['percentage']),
+                                         fill='white', font=('Segoe UI', 8, 'bold'))
     
     # Right side - Chart
     right_frame = tk.Frame(content_frame, bg='#1a1a2e')
@@ -639,70 +642,123 @@ def show_voting_results():
     chart_label.pack(pady=(0, 10))
     
     # Create chart
-    if results_data['total_votes'] > 0:
-        # Prepare data for chart
-        parties = [r['party'] for r in results_data['results'] if r['votes'] > 0]
-        votes = [r['votes'] for r in results_data['results'] if r['votes'] > 0]
-        colors = [r['color'] for r in results_data['results'] if r['votes'] > 0]
+    chart_holder = tk.Frame(right_frame, bg='#1a1a2e')
+    chart_holder.pack(fill=tk.BOTH, expand=True)
+    chart_state = {'figure': None}
+
+    def render_chart(results_data):
+        for child in chart_holder.winfo_children():
+            child.destroy()
+        if chart_state['figure'] is not None:
+            plt.close(chart_state['figure'])
+            chart_state['figure'] = None
+        if results_data['total_votes'] > 0:
+            # Prepare data for chart
+            parties = [r['party'] for r in results_data['results'] if r['votes'] > 0]
+            votes = [r['votes'] for r in results_data['results'] if r['votes'] > 0]
+            colors = [r['color'] for r in results_data['results'] if r['votes'] > 0]
         
-        if parties:  # Only create chart if there are votes
-            # Create matplotlib figure
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(6, 8))
-            fig.patch.set_facecolor('#1a1a2e')
+            if parties:  # Only create chart if there are votes
+                # Create matplotlib figure
+                fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(6, 8))
+                chart_state['figure'] = fig
+                fig.patch.set_facecolor('#1a1a2e')
             
-            # Pie chart
-            ax1.pie(votes, labels=parties, colors=colors, autopct='%1.1f%%', startangle=90)
-            ax1.set_title('Vote Distribution', color='white', fontsize=14, fontweight='bold')
-            ax1.set_facecolor('#1a1a2e')
+                # Pie chart
+                ax1.pie(votes, labels=parties, colors=colors, autopct='%1.1f%%', startangle=90)
+                ax1.set_title('Vote Distribution', color='white', fontsize=14, fontweight='bold')
+                ax1.set_facecolor('#1a1a2e')
             
-            # Bar chart
-            bars = ax2.bar(parties, votes, color=colors)
-            ax2.set_title('Vote Counts', color='white', fontsize=14, fontweight='bold')
-            ax2.set_xlabel('Political Parties', color='white')
-            ax2.set_ylabel('Number of Votes', color='white')
-            ax2.set_facecolor('#1a1a2e')
-            ax2.tick_params(colors='white')
+                # Bar chart
+                bars = ax2.bar(parties, votes, color=colors)
+                ax2.set_title('Vote Counts', color='white', fontsize=14, fontweight='bold')
+                ax2.set_xlabel('Political Parties', color='white')
+                ax2.set_ylabel('Number of Votes', color='white')
+                ax2.set_facecolor('#1a1a2e')
+                ax2.tick_params(colors='white')
             
-            # Rotate x-axis labels for better readability
-            plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
+                # Rotate x-axis labels for better readability
+                plt.setp(ax2.get_xticklabels(), rotation=45, ha='right')
             
-            # Add value labels on bars
-            for bar in bars:
-                height = bar.get_height()
-                ax2.text(bar.get_x() + bar.get_width()/2., height,
-                        '{}'.format(int(height)), ha='center', va='bottom', color='white')
+                # Add value labels on bars
+                for bar in bars:
+                    height = bar.get_height()
+                    ax2.text(bar.get_x() + bar.get_width()/2., height,
+                            '{}'.format(int(height)), ha='center', va='bottom', color='white')
             
-            plt.tight_layout()
+                plt.tight_layout()
             
-            # Embed chart in tkinter
-            chart_canvas = FigureCanvasTkAgg(fig, right_frame)
-            chart_canvas.draw()
-            chart_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+                # Embed chart in tkinter
+                chart_canvas = FigureCanvasTkAgg(fig, chart_holder)
+                chart_canvas.draw()
+                chart_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            else:
+                # No votes yet
+                no_votes_label = tk.Label(chart_holder,
+                                         text="📊 No votes cast yet\n\nStart voting to see results!",
+                                         font=('Segoe UI', 14),
+                                         fg='#888888', bg='#1a1a2e',
+                                         justify=tk.CENTER)
+                no_votes_label.pack(expand=True)
         else:
             # No votes yet
-            no_votes_label = tk.Label(right_frame,
+            no_votes_label = tk.Label(chart_holder,
                                      text="📊 No votes cast yet\n\nStart voting to see results!",
                                      font=('Segoe UI', 14),
                                      fg='#888888', bg='#1a1a2e',
                                      justify=tk.CENTER)
             no_votes_label.pack(expand=True)
-    else:
-        # No votes yet
-        no_votes_label = tk.Label(right_frame,
-                                 text="📊 No votes cast yet\n\nStart voting to see results!",
-                                 font=('Segoe UI', 14),
-                                 fg='#888888', bg='#1a1a2e',
-                                 justify=tk.CENTER)
-        no_votes_label.pack(expand=True)
     
+    def render():
+        """Redraw from the tally cache; O(parties) regardless of votes cast"""
+        results_data = voting_system.get_voting_results()
+        total_votes_label.configure(
+            text="📊 Total Votes (DP): {}".format(int(differential_privacy_count(results_data['total_votes']))))
+        total_voters_label.configure(
+            text="👥 Total Voters (DP): {}".format(int(differential_privacy_count(results_data['total_voters']))))
+        turnout = voting_system.get_turnout(results_data['total_voters'])
+        turnout_label.configure(text="📈 Turnout: {}".format('-' if turnout is None else '{:.1f}%'.format(turnout)))
+        updated_label.configure(text="🕒 Updated: {}".format(datetime.now().strftime('%H:%M:%S')))
+        render_winner(results_data)
+        render_rows(results_data)
+        render_chart(results_data)
+        live_state['version'] = voting_system.get_tally()['version']
+        return results_data
+
+    # Live updates: votes cast in this process mark the view dirty (from the
+    # casting thread, so only a flag is set there); the Tk tick redraws. Votes
+    # written by other processes show up as a new tally version.
+    live_state = {'dirty': False, 'version': None, 'ticks': 0}
+    unsubscribe = voting_system.subscribe(lambda: live_state.update(dirty=True))
+
+    def live_tick():
+        if not results_window.winfo_exists():
+            return
+        live_state['ticks'] += 1
+        if not live_state['dirty'] and live_state['ticks'] % 10 == 0:
+            live_state['dirty'] = voting_system.get_tally()['version'] != live_state['version']
+        if live_state['dirty']:
+            live_state['dirty'] = False
+            render()
+        results_window.after(500, live_tick)
+
+    def on_destroy(event):
+        if event.widget is results_window:
+            unsubscribe()
+            if chart_state['figure'] is not None:
+                plt.close(chart_state['figure'])
+
+    results_window.bind('<Destroy>', on_destroy)
+    results_data = render()
+    results_window.after(500, live_tick)
+
     # Bottom buttons
     buttons_frame = tk.Frame(results_window, bg='#1a1a2e')
     buttons_frame.pack(fill=tk.X, padx=20, pady=(0, 20))
     
     # Refresh button
     def refresh_results():
-        results_window.destroy()
-        show_voting_results()
+        render()
     
     refresh_btn = tk.Button(buttons_frame,
                            text="🔄 Refresh Results",
@@ -6,32 +6,65 @@ Secure biometric voting using iris recognition
 
 import sqlite3
 import os
+import atexit
 import json
 import hashlib
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import tkinter as tk
 from tkinter import messagebox, ttk
 from audit_system import default_audit_logger as audit
+from voted_set import VoterIndex
+from vote_merkle import VoteMerkle, encode_proof
 try:
     from database_manager import db  # for phone lookup
     from sms_utils import send_sms, format_voting_receipt
-    from receipt_generator import generate_pdf_receipt, generate_jpeg_receipt
+    from receipt_generator import generate_pdf_receipt, generate_jpeg_receipt, submit_receipt
     _SMS_SUPPORT = True
 except Exception:
     _SMS_SUPPORT = False
     def generate_pdf_receipt(*args, **kwargs): return None
     def generate_jpeg_receipt(*args, **kwargs): return None
+    def submit_receipt(*args, **kwargs): return None
 
 class VotingSystem:
     """
     Comprehensive voting system with iris authentication
     """
-    
+
+    # election_id stored for votes cast outside a specific election
+    GENERAL_ELECTION_ID = 0
+
     def __init__(self, db_path="voting_system.db"):
         self.db_path = db_path
+        self._local = threading.local()
+        self._party_ids = frozenset()
+        self._parties_by_id = None
+        self._tally_lock = threading.Lock()
+        self._tally = None  # In-process copy of the tally tables, see get_tally()
+        self._subscribers = []
+        self.ingestion = None  # VoteIngestionService once enable_ingestion() is called
+        self._merkle = VoteMerkle()  # Append-only Merkle tree over vote hashes, see get_vote_proof()
+        self._roll = (None, 0.0)  # (registered voters, monotonic time read), see get_registered_voters()
         self.init_database()
         self.load_parties()
+        self._voters = VoterIndex.open(db_path)  # In-memory voted sets behind has_voted()
+        self._voters_checked = 0.0  # monotonic time of has_voted()'s last tally version check
+        atexit.register(self.save_voted_snapshot)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection for the vote hot path (reopened after fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
     
     def init_database(self):
         """Initialize voting database"""
@@ -82,9 +115,242 @@ class VotingSystem:
                 cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_votes_unique_hash ON votes(vote_hash)')
             except Exception:
                 pass
-            
+
+            self._migrate_vote_elections(cursor)
+            if not self._create_tally_schema(cursor):
+                # First start with tallies: count the votes already cast once
+                self._write_tallies(cursor, *self._count_raw_votes(cursor))
+            self._merkle.create_schema(cursor)
+            self._merkle.catch_up(conn)
             conn.commit()
+
+    def _migrate_vote_elections(self, cursor):
+        """Give votes an election_id and enforce one vote per person per election"""
+        cursor.execute('PRAGMA table_info(votes)')
+        if 'election_id' not in [row[1] for row in cursor.fetchall()]:
+            cursor.execute('ALTER TABLE votes ADD COLUMN election_id INTEGER NOT NULL DEFAULT {}'.format(
+                self.GENERAL_ELECTION_ID))
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'idx_votes_person_election'")
+        if cursor.fetchone():
+            return
+        # Votes that slipped through the old check-then-insert race: the first one cast stands
+        cursor.execute('''
+            SELECT id, person_id, election_id FROM votes
+            WHERE id NOT IN (SELECT MIN(id) FROM votes GROUP BY person_id, election_id)
+        ''')
+        duplicates = cursor.fetchall()
+        if duplicates:
+            cursor.executemany('DELETE FROM votes WHERE id = ?', [(row[0],) for row in duplicates])
+            print("⚠️ Removed {} duplicate vote(s) before adding the one-vote constraint".format(len(duplicates)))
+            try:
+                audit.log_event('vote_duplicates_removed', {
+                    'votes': [{'vote_id': r[0], 'person_id': r[1], 'election_id': r[2]} for r in duplicates]
+                })
+            except Exception:
+                pass
+        cursor.execute('CREATE UNIQUE INDEX idx_votes_person_election ON votes(person_id, election_id)')
     
+    def _create_tally_schema(self, cursor) -> bool:
+        """
+        Tally tables kept current by triggers on votes, in the same
+        transaction as the vote itself. Returns True if they already existed.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tally_totals'")
+        existed = cursor.fetchone() is not None
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS vote_tally (
+                election_id INTEGER NOT NULL,
+                party_id INTEGER NOT NULL,
+                votes INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (election_id, party_id)
+            ) WITHOUT ROWID
+        ''')
+        # Single row; version changes with every tally change so caches can validate cheaply
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS tally_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_votes INTEGER NOT NULL DEFAULT 0,
+                total_voters INTEGER NOT NULL DEFAULT 0,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('INSERT OR IGNORE INTO tally_totals (id) VALUES (1)')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_votes_tally_insert AFTER INSERT ON votes
+            BEGIN
+                INSERT INTO vote_tally (election_id, party_id, votes) VALUES (NEW.election_id, NEW.party_id, 1)
+                ON CONFLICT(election_id, party_id) DO UPDATE SET votes = votes + 1;
+                UPDATE tally_totals SET
+                    total_votes = total_votes + 1,
+                    total_voters = total_voters + NOT EXISTS (
+                        SELECT 1 FROM votes WHERE person_id = NEW.person_id AND id != NEW.id),
+                    version = version + 1
+                WHERE id = 1;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_votes_tally_delete AFTER DELETE ON votes
+            BEGIN
+                UPDATE vote_tally SET votes = votes - 1
+                WHERE election_id = OLD.election_id AND party_id = OLD.party_id;
+                UPDATE tally_totals SET
+                    total_votes = total_votes - 1,
+                    total_voters = total_voters - NOT EXISTS (
+                        SELECT 1 FROM votes WHERE person_id = OLD.person_id),
+                    version = version + 1
+                WHERE id = 1;
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_votes_tally_update AFTER UPDATE OF party_id, election_id ON votes
+            BEGIN
+                UPDATE vote_tally SET votes = votes - 1
+                WHERE election_id = OLD.election_id AND party_id = OLD.party_id;
+                INSERT INTO vote_tally (election_id, party_id, votes) VALUES (NEW.election_id, NEW.party_id, 1)
+                ON CONFLICT(election_id, party_id) DO UPDATE SET votes = votes + 1;
+                UPDATE tally_totals SET version = version + 1 WHERE id = 1;
+            END
+        ''')
+        return existed
+
+    def _count_raw_votes(self, cursor) -> Tuple[Dict[Tuple[int, int], int], int, int]:
+        cursor.execute('SELECT election_id, party_id, COUNT(*) FROM votes GROUP BY election_id, party_id')
+        counts = {(row[0], row[1]): row[2] for row in cursor.fetchall()}
+        cursor.execute('SELECT COUNT(*), COUNT(DISTINCT person_id) FROM votes')
+        total_votes, total_voters = cursor.fetchone()
+        return counts, total_votes, total_voters
+
+    def _write_tallies(self, cursor, counts: Dict[Tuple[int, int], int], total_votes: int, total_voters: int):
+        cursor.execute('DELETE FROM vote_tally')
+        cursor.executemany('INSERT INTO vote_tally (election_id, party_id, votes) VALUES (?, ?, ?)',
+                           [(e, p, n) for (e, p), n in counts.items()])
+        cursor.execute('''
+            UPDATE tally_totals SET total_votes = ?, total_voters = ?, version = version + 1
+            WHERE id = 1
+        ''', (total_votes, total_voters))
+
+    def reconcile_tallies(self, repair: bool = True) -> Dict:
+        """
+        Recompute the tallies from the raw votes and report any drift.
+        With repair=True the tally tables are rewritten to match.
+        """
+        with sqlite3.connect(self.db_path, timeout=30) as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')  # Hold off new votes while comparing
+            counts, total_votes, total_voters = self._count_raw_votes(cursor)
+            cursor.execute('SELECT election_id, party_id, votes FROM vote_tally')
+            tallied = {(row[0], row[1]): row[2] for row in cursor.fetchall()}
+            cursor.execute('SELECT total_votes, total_voters FROM tally_totals WHERE id = 1')
+            totals = cursor.fetchone() or (0, 0)
+
+            drift = []
+            for key in sorted(set(counts) | set(tallied)):
+                actual, recorded = counts.get(key, 0), tallied.get(key, 0)
+                if actual != recorded:
+                    drift.append({'election_id': key[0], 'party_id': key[1],
+                                  'tally': recorded, 'actual': actual})
+            report = {
+                'drift': drift,
+                'total_votes': {'tally': totals[0], 'actual': total_votes},
+                'total_voters': {'tally': totals[1], 'actual': total_voters},
+            }
+            report['consistent'] = not drift and tuple(totals) == (total_votes, total_voters)
+
+            if repair and not report['consistent']:
+                self._write_tallies(cursor, counts, total_votes, total_voters)
+            report['repaired'] = bool(repair and not report['consistent'])
+            conn.commit()
+
+        if not report['consistent']:
+            print("⚠️ Vote tally drift: {} party tallies, totals {} / {}".format(
+                len(drift), report['total_votes'], report['total_voters']))
+            try:
+                audit.log_event('tally_drift_detected', report)
+            except Exception:
+                pass
+        if report['repaired']:
+            self._tally_changed()
+        return report
+
+    # --- Tally cache and subscriptions ---
+    def _load_tally(self) -> Dict:
+        conn = self._connection()
+        version, total_votes, total_voters = conn.execute(
+            'SELECT version, total_votes, total_voters FROM tally_totals WHERE id = 1').fetchone()
+        counts = {(row[0], row[1]): row[2] for row in conn.execute(
+            'SELECT election_id, party_id, votes FROM vote_tally WHERE votes != 0')}
+        return {'version': version, 'counts': counts, 'total_votes': total_votes, 'total_voters': total_voters}
+
+    def get_tally(self) -> Dict:
+        """
+        Current tally: {'version', 'counts': {(election_id, party_id): votes},
+        'total_votes', 'total_voters'}. Served from the in-process cache after
+        a one-row version check, so writes by other processes are picked up.
+        """
+        version = self._connection().execute('SELECT version FROM tally_totals WHERE id = 1').fetchone()[0]
+        with self._tally_lock:
+            if self._tally is not None and self._tally['version'] == version:
+                return self._tally
+        tally = self._load_tally()
+        with self._tally_lock:
+            if self._tally is None or tally['version'] >= self._tally['version']:
+                self._tally = tally
+            return self._tally
+
+    def _apply_votes_to_tally(self, votes: List[Tuple[int, int, bool]], version: int) -> None:
+        """
+        Fold committed (election_id, party_id, first_vote) votes into the cache
+        if they directly follow the cached version; otherwise drop the cache.
+        """
+        if not votes:
+            return
+        with self._tally_lock:
+            tally = self._tally
+            if tally is not None and tally['version'] == version - len(votes):
+                counts = dict(tally['counts'])
+                for election_id, party_id, _ in votes:
+                    counts[(election_id, party_id)] = counts.get((election_id, party_id), 0) + 1
+                self._tally = {'version': version, 'counts': counts,
+                               'total_votes': tally['total_votes'] + len(votes),
+                               'total_voters': tally['total_voters'] + sum(v[2] for v in votes)}
+            else:
+                self._tally = None
+        self._notify_subscribers()
+
+    def _tally_changed(self) -> None:
+        with self._tally_lock:
+            self._tally = None
+        self._notify_subscribers()
+
+    def subscribe(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Call callback() after every tally change made through this process.
+        It runs on the thread that cast the vote, so UI code should only
+        mark itself dirty there. Returns a function that unsubscribes.
+        """
+        with self._tally_lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._tally_lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _notify_subscribers(self) -> None:
+        with self._tally_lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def _party_info(self) -> Dict[int, Dict]:
+        if self._parties_by_id is None or set(self._parties_by_id) != set(self._party_ids):
+            self._parties_by_id = {p['id']: p for p in self.get_parties()}
+        return self._parties_by_id
+
     def load_parties(self):
         """Load or create default political parties"""
         with sqlite3.connect(self.db_path) as conn:
@@ -111,6 +377,17 @@ class VotingSystem:
                 ''', default_parties)
                 
                 conn.commit()
+
+            cursor.execute('SELECT id FROM parties')
+            self._party_ids = frozenset(row[0] for row in cursor.fetchall())
+
+    def is_valid_party(self, party_id: int) -> bool:
+        """Check a party id against the cached set, reloading once for parties added since"""
+        if party_id in self._party_ids:
+            return True
+        with sqlite3.connect(self.db_path) as conn:
+            self._party_ids = frozenset(row[0] for row in conn.execute('SELECT id FROM parties'))
+        return party_id in self._party_ids
     
     def get_parties(self) -> List[Dict]:
         """Get all available parties"""
@@ -155,35 +432,36 @@ class VotingSystem:
                 })
             return elections
     
-    def has_voted(self, person_id: int) -> bool:
-        """Check if person has already voted"""
+    VOTED_CHECK_INTERVAL = 1.0  # seconds between has_voted()'s tally version checks
+
+    def has_voted(self, person_id: int, election_id: Optional[int] = None) -> bool:
+        """
+        Check if person has already voted (in any election unless election_id
+        is given). Answered from the in-memory voted sets, refreshed when a
+        throttled one-row tally version check shows the votes changed (e.g.
+        written by another process).
+        """
+        now = time.monotonic()
+        if now - self._voters_checked >= self.VOTED_CHECK_INTERVAL:
+            self._voters_checked = now
+            try:
+                if self._tally_version(self._connection()) != self._voters.version:
+                    self.refresh_voted_set()
+            except sqlite3.Error as e:
+                print("⚠️ Voted-set refresh failed, answering from memory: {}".format(e))
+        return self._voters.has_voted(person_id, election_id)
+
+    def refresh_voted_set(self) -> None:
+        """Pick up votes written to the database outside this VotingSystem"""
+        if not self._voters.refresh():
+            self._voters.rebuild()
+
+    def save_voted_snapshot(self) -> bool:
+        """Persist the voted sets next to the database for a fast restart"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT COUNT(*) FROM votes WHERE person_id = ?
-                ''', (person_id,))
-
-                count = cursor.fetchone()[0]
-                print(f"DEBUG: Person {person_id} vote count: {count}")
-                try:
-                    audit.log_event('vote_status_check', {
-                        'person_id': person_id,
-                        'vote_count': int(count)
-                    })
-                except Exception:
-                    pass
-                return count > 0
+            return self._voters.save()
         except Exception as e:
-            print(f"Error checking vote status: {e}")
-            try:
-                audit.log_event('vote_status_error', {
-                    'person_id': person_id,
-                    'error': str(e)
-                })
-            except Exception:
-                pass
-            # If there's an error, assume they haven't voted to allow voting
+            print(f"Error saving voted-set snapshot: {e}")
             return False
 
     def clear_vote(self, person_id: int) -> bool:
@@ -200,11 +478,15 @@ class VotingSystem:
                 vote_count = cursor.fetchone()[0]
 
                 if vote_count > 0:
-                    # Delete the vote(s)
+                    # Record the removal in the vote Merkle tree, then delete the vote(s)
+                    self._record_removals(conn, 'SELECT vote_hash FROM votes WHERE person_id = ? ORDER BY id',
+                                          (person_id,))
                     cursor.execute('''
                         DELETE FROM votes WHERE person_id = ?
                     ''', (person_id,))
                     conn.commit()
+                    self._tally_changed()
+                    self._voters.remove_person(person_id)
                     print(f"DEBUG: Cleared {vote_count} vote(s) for person {person_id}")
                     try:
                         audit.log_event('vote_cleared', {
@@ -235,125 +517,202 @@ class VotingSystem:
                 pass
             return False
     
-    def cast_vote(self, person_id: int, party_id: int, confidence_score: float, election_id: Optional[int] = None) -> bool:
-        """Cast a vote for a person"""
+    def _record_removals(self, conn: sqlite3.Connection, query: str, params: tuple = ()) -> int:
+        """
+        Append a tombstone leaf for each vote the query selects, inside the
+        caller's transaction, so the published root commits to the deletion
+        and old receipts for those votes no longer pass an audit.
+        """
+        removed = 0
+        for (vote_hash,) in conn.execute(query, params).fetchall():
+            removed += self._merkle.remove(conn, vote_hash) is not None
+        return removed
+
+    def _election_key(self, election_id: Optional[int]) -> int:
+        return int(election_id) if election_id else self.GENERAL_ELECTION_ID
+
+    def _vote_hash(self, person_id: int, party_id: int, election_id: Optional[int]) -> str:
+        # Create vote hash for security - using safe string operations
+        timestamp_str = datetime.now().isoformat()
+        vote_data = str(person_id) + "_" + str(party_id) + "_" + (str(election_id) if election_id else "general") + "_" + timestamp_str
+        return hashlib.sha256(vote_data.encode('utf-8')).hexdigest()
+
+    def _insert_vote(self, conn: sqlite3.Connection, person_id: int, party_id: int,
+                     confidence_score: float, election_key: int, vote_hash: str) -> Optional[bool]:
+        """
+        INSERT one vote inside the caller's transaction, and its leaf in the
+        vote Merkle tree. The UNIQUE(person_id, election_id) index turns a
+        second vote in the same election into a no-op: returns None for that,
+        else whether this is the person's first vote in any election.
+        """
+        cursor = conn.execute('''
+            INSERT INTO votes (person_id, party_id, confidence_score, vote_hash, election_id)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(person_id, election_id) DO NOTHING
+        ''', (person_id, party_id, confidence_score, vote_hash, election_key))
+        if not cursor.rowcount:
+            return None
+        self._merkle.append(conn, vote_hash)
+        return conn.execute('SELECT COUNT(*) FROM votes WHERE person_id = ?', (person_id,)).fetchone()[0] == 1
+
+    def _tally_version(self, conn: sqlite3.Connection) -> int:
+        return conn.execute('SELECT version FROM tally_totals WHERE id = 1').fetchone()[0]
+
+    def _log_vote_outcome(self, status: str, person_id: int, party_id: int, election_id: Optional[int],
+                          confidence_score: float, vote_hash: Optional[str] = None, error: Optional[str] = None):
+        """Console and audit trail for a cast attempt ('accepted', 'duplicate', 'invalid_party', 'error')"""
+        if status == 'accepted':
+            print(f"DEBUG: Successfully cast vote for person {person_id}, party {party_id}")
+            event, details = 'vote_cast_success', {
+                'person_id': person_id,
+                'party_id': party_id,
+                'election_id': election_id,
+                'vote_hash': vote_hash
+            }
+        elif status == 'duplicate':
+            print(f"DEBUG: Person {person_id} has already voted, cannot cast new vote")
+            event, details = 'vote_cast_blocked_already_voted', {
+                'person_id': person_id,
+                'party_id': party_id,
+                'election_id': election_id,
+                'confidence_score': float(confidence_score)
+            }
+        elif status == 'invalid_party':
+            print(f"ERROR: Party ID {party_id} does not exist")
+            event, details = 'vote_cast_error_invalid_party', {
+                'person_id': person_id,
+                'party_id': party_id
+            }
+        else:
+            print("Error casting vote: " + str(error))
+            event, details = 'vote_cast_error', {
+                'person_id': person_id,
+                'party_id': party_id,
+                'error': str(error)
+            }
         try:
-            # Double-check if already voted (with fresh database connection)
-            if self.has_voted(person_id):
-                print(f"DEBUG: Person {person_id} has already voted, cannot cast new vote")
-                try:
-                    audit.log_event('vote_cast_blocked_already_voted', {
-                        'person_id': person_id,
-                        'party_id': party_id,
-                        'confidence_score': float(confidence_score)
-                    })
-                except Exception:
-                    pass
-                return False
+            audit.log_event(event, details)
+        except Exception:
+            pass
 
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+    def enable_ingestion(self, **options):
+        """
+        Route cast_vote through a VoteIngestionService (one writer thread
+        committing small batches) instead of a commit per caller. Options are
+        passed to the service; returns it.
+        """
+        if self.ingestion is None:
+            from vote_ingestion import VoteIngestionService
+            self.ingestion = VoteIngestionService(self, **options)
+        return self.ingestion
 
-                # Verify party exists
-                cursor.execute('SELECT COUNT(*) FROM parties WHERE id = ?', (party_id,))
-                if cursor.fetchone()[0] == 0:
-                    print(f"ERROR: Party ID {party_id} does not exist")
-                    try:
-                        audit.log_event('vote_cast_error_invalid_party', {
-                            'person_id': person_id,
-                            'party_id': party_id
-                        })
-                    except Exception:
-                        pass
-                    return False
+    CAST_TIMEOUT = 30.0  # seconds cast_vote waits for a queued vote's batch
 
-                # Create vote hash for security - using safe string operations
-                timestamp_str = datetime.now().isoformat()
-                vote_data = str(person_id) + "_" + str(party_id) + "_" + (str(election_id) if election_id else "general") + "_" + timestamp_str
-                vote_hash = hashlib.sha256(vote_data.encode('utf-8')).hexdigest()
+    def cast_vote(self, person_id: int, party_id: int, confidence_score: float, election_id: Optional[int] = None) -> bool:
+        """
+        Cast a vote for a person. A single INSERT decides, so concurrent
+        casts cannot double-vote. With ingestion enabled the vote is queued
+        and this waits for its batch to commit; a vote still queued after
+        CAST_TIMEOUT is withdrawn, so a False never hides a later commit.
+        """
+        if self.ingestion is not None:
+            future = self.ingestion.submit(person_id, party_id, confidence_score, election_id)
+            try:
+                return future.result(timeout=self.CAST_TIMEOUT)['status'] == 'accepted'
+            except FutureTimeoutError:
+                pass
+            # Never block the caller (the Tk thread) indefinitely on a stuck writer
+            if future.cancel():
+                self._log_vote_outcome('error', person_id, party_id, election_id, confidence_score,
+                                       error='vote not written within {:g}s; withdrawn'.format(self.CAST_TIMEOUT))
+                return False
+            # The writer already holds it: its batch decides (and audits) the outcome
+            try:
+                return future.result(timeout=self.CAST_TIMEOUT)['status'] == 'accepted'
+            except FutureTimeoutError:
+                print("⚠️ Vote for person {} still being committed; its outcome is recorded when the batch "
+                      "finishes".format(person_id))
+                return False
 
-                # Insert vote with transaction safety
-                cursor.execute('''
-                    INSERT INTO votes (person_id, party_id, confidence_score, vote_hash)
-                    VALUES (?, ?, ?, ?)
-                ''', (person_id, party_id, confidence_score, vote_hash))
+        election_key = self._election_key(election_id)
+        try:
+            if not self.is_valid_party(party_id):
+                self._log_vote_outcome('invalid_party', person_id, party_id, election_id, confidence_score)
+                return False
 
-                conn.commit()
-                print(f"DEBUG: Successfully cast vote for person {person_id}, party {party_id}")
-                try:
-                    audit.log_event('vote_cast_success', {
-                        'person_id': person_id,
-                        'party_id': party_id,
-                        'election_id': election_id,
-                        'vote_hash': vote_hash
-                    })
-                except Exception:
-                    pass
-                return True
+            vote_hash = self._vote_hash(person_id, party_id, election_id)
+            conn = self._connection()
+            with conn:
+                first_vote = self._insert_vote(conn, person_id, party_id, confidence_score, election_key, vote_hash)
+                if first_vote is not None:
+                    # Read back inside the transaction: the version the triggers just wrote
+                    version = self._tally_version(conn)
+
+            # Either way the database now holds a vote for this person in this election
+            self._voters.add(person_id, election_key)
+            if first_vote is None:
+                self._log_vote_outcome('duplicate', person_id, party_id, election_id, confidence_score)
+                return False
+
+            self._apply_votes_to_tally([(election_key, party_id, first_vote)], version)
+            self._log_vote_outcome('accepted', person_id, party_id, election_id, confidence_score, vote_hash)
+            return True
 
         except Exception as e:
-            error_msg = "Error casting vote: " + str(e)
-            print(error_msg)
-            try:
-                audit.log_event('vote_cast_error', {
-                    'person_id': person_id,
-                    'party_id': party_id,
-                    'error': str(e)
-                })
-            except Exception:
-                pass
+            self._log_vote_outcome('error', person_id, party_id, election_id, confidence_score, error=e)
             return False
-    
-    def get_voting_results(self) -> Dict:
+
+    def get_party_votes(self, election_id: Optional[int] = None) -> List[Dict]:
+        """Per-party vote counts from the tally cache, most votes first; O(parties)"""
+        tally = self.get_tally()
+        votes_by_party = {}
+        for (election, party_id), votes in tally['counts'].items():
+            if election_id is None or election == election_id:
+                votes_by_party[party_id] = votes_by_party.get(party_id, 0) + votes
+        parties = self._party_info()
+        rows = [{
+            'party_id': party_id,
+            'party': party['name'],
+            'symbol': party['symbol'],
+            'color': party['color'],
+            'votes': votes_by_party.get(party_id, 0)
+        } for party_id, party in parties.items()]
+        rows.sort(key=lambda r: r['votes'], reverse=True)
+        return rows
+
+    def get_voting_results(self, election_id: Optional[int] = None) -> Dict:
         """Get comprehensive voting results"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Get vote counts by party
-            cursor.execute('''
-                SELECT p.name, p.symbol, p.color, COUNT(v.id) as vote_count
-                FROM parties p
-                LEFT JOIN votes v ON p.id = v.party_id
-                GROUP BY p.id, p.name, p.symbol, p.color
-                ORDER BY vote_count DESC
-            ''')
-            
-            results = []
-            total_votes = 0
-            
-            for row in cursor.fetchall():
-                vote_count = row[3]
-                total_votes += vote_count
-                results.append({
-                    'party': row[0],
-                    'symbol': row[1],
-                    'color': row[2],
-                    'votes': vote_count
-                })
-            
-            # Calculate percentages
-            for result in results:
-                if total_votes > 0:
-                    result['percentage'] = (result['votes'] / total_votes) * 100
-                else:
-                    result['percentage'] = 0
-            
-            # Determine winner information
-            winner_info = self.get_election_winner(results, total_votes)
+        results = []
+        total_votes = 0
+        for row in self.get_party_votes(election_id):
+            total_votes += row['votes']
+            results.append({
+                'party': row['party'],
+                'symbol': row['symbol'],
+                'color': row['color'],
+                'votes': row['votes']
+            })
+
+        # Calculate percentages
+        for result in results:
+            if total_votes > 0:
+                result['percentage'] = (result['votes'] / total_votes) * 100
+            else:
+                result['percentage'] = 0
+
+        # Determine winner information
+        winner_info = self.get_election_winner(results, total_votes)
+
+        return {
+            'results': results,
+            'total_votes': total_votes,
+            'total_voters': self.get_total_voters(),
+            'winner': winner_info
+        }
 
-            return {
-                'results': results,
-                'total_votes': total_votes,
-                'total_voters': self.get_total_voters(),
-                'winner': winner_info
-            }
-    
     def get_total_voters(self) -> int:
         """Get total number of unique voters"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT COUNT(DISTINCT person_id) FROM votes')
-            return cursor.fetchone()[0]
+        return self.get_tally()['total_voters']
 
     def get_election_winner(self, results: List[Dict], total_votes: int) -> Dict:
         """Determine the election winner based on vote counts"""
@@ -398,6 +757,51 @@ class VotingSystem:
                 'tied_parties': winners
             }
     
+    def get_merkle_root(self) -> Dict:
+        """Current root of the vote Merkle tree: {'tree_size', 'root'}"""
+        size, root = self._merkle.root(self._connection())
+        return {'tree_size': size, 'root': root}
+
+    def get_vote_proof(self, person_id: int, election_id: Optional[int] = None,
+                       tree_size: Optional[int] = None) -> Optional[Dict]:
+        """
+        Inclusion proof for a person's vote in an election: {'vote_hash',
+        'leaf_index', 'tree_size', 'root', 'siblings', 'compact'}. Against the
+        current tree unless tree_size is given; re-issue it at the size of a
+        published root (results export 'vote_merkle') to check it against
+        that root. None if they have not voted or the vote is not in a tree
+        of that size.
+        """
+        conn = self._connection()
+        row = conn.execute('SELECT vote_hash FROM votes WHERE person_id = ? AND election_id = ?',
+                           (person_id, self._election_key(election_id))).fetchone()
+        if row is None:
+            return None
+        conn.execute('BEGIN')  # Size, path and root from one snapshot
+        try:
+            proof = self._merkle.proof(conn, row[0], tree_size)
+        finally:
+            conn.rollback()
+        if proof is not None:
+            proof['compact'] = encode_proof(proof)
+        return proof
+
+    def get_consistency_proof(self, old_size: int, new_size: Optional[int] = None) -> Dict:
+        """
+        RFC 9162 consistency proof that the tree a receipt was issued against
+        (old_size leaves) is a prefix of a later one (default: the current
+        tree): {'old_size', 'old_root', 'new_size', 'new_root', 'proof'}.
+        """
+        conn = self._connection()
+        conn.execute('BEGIN')
+        try:
+            new_size = self._merkle.size(conn) if new_size is None else new_size
+            proof = self._merkle.consistency_proof(conn, old_size, new_size)
+            return {'old_size': old_size, 'old_root': self._merkle.root(conn, old_size)[1],
+                    'new_size': new_size, 'new_root': self._merkle.root(conn, new_size)[1], 'proof': proof}
+        finally:
+            conn.rollback()
+
     def get_vote_by_person(self, person_id: int) -> Optional[Dict]:
         """Get vote information for a specific person"""
         with sqlite3.connect(self.db_path) as conn:
@@ -419,6 +823,28 @@ class VotingSystem:
                 }
             return None
     
+    ROLL_TTL = 30.0  # seconds a registered-voter count is reused
+
+    def get_registered_voters(self) -> Optional[int]:
+        """Active enrolled persons (the voter roll), cached briefly; None if the person database is unavailable"""
+        count, read_at = self._roll
+        if count is None or time.monotonic() - read_at > self.ROLL_TTL:
+            try:
+                from database_manager import db as person_db
+                count = person_db.count_active_persons()
+            except Exception as e:
+                print("⚠️ Registered voter count unavailable: {}".format(e))
+                return count
+            self._roll = (count, time.monotonic())
+        return count
+
+    def get_turnout(self, total_voters: int) -> Optional[float]:
+        """Turnout percentage against the registered voter roll, None if it is unknown or empty"""
+        registered = self.get_registered_voters()
+        if not registered:
+            return None
+        return total_voters / registered * 100
+
     def export_results(self, filename: str = None) -> str:
         """Export voting results to JSON file"""
         if not filename:
@@ -433,10 +859,13 @@ class VotingSystem:
             'election_info': {
                 'total_votes': results['total_votes'],
                 'total_voters': results['total_voters'],
-                'turnout_percentage': (results['total_voters'] / 108) * 100  # Assuming 108 registered persons
+                'registered_voters': self.get_registered_voters(),
+                'turnout_percentage': self.get_turnout(results['total_voters'])
             },
             'winner_info': results['winner'],
-            'results': results['results']
+            'results': results['results'],
+            # Voters check their receipt's inclusion proof against this published root
+            'vote_merkle': self.get_merkle_root()
         }
 
         with open(filename, 'w') as f:
@@ -453,13 +882,38 @@ class VotingSystem:
 
         return filename
 
+    def export_votes(self, output_path: str, fmt: Optional[str] = None, compression: Optional[str] = 'auto',
+                     election_id: Optional[int] = None, chunk_size: int = 5000) -> Dict:
+        """
+        Stream the raw vote rows (optionally one election's) to a JSONL, CSV
+        or columnar .npy export, gzip/zstd-compressed by suffix; memory stays
+        flat however many votes there are. Returns the export stats.
+        """
+        from streaming_export import export_query
+        query = ('SELECT id, person_id, party_id, election_id, timestamp, confidence_score, verification_method, '
+                 'vote_hash FROM votes')
+        params = ()
+        if election_id is not None:
+            query += ' WHERE election_id = ?'
+            params = (election_id,)
+        stats = export_query(self.db_path, query + ' ORDER BY id', params, output_path, fmt=fmt,
+                             compression=compression, chunk_size=chunk_size)
+        try:
+            audit.log_event('votes_exported', {'file': output_path, 'rows': stats['rows'], 'format': stats['format']})
+        except Exception:
+            pass
+        return stats
+
     def clear_all_votes(self) -> bool:
         """Clear all votes from the database (for testing purposes)"""
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
+                self._record_removals(conn, 'SELECT vote_hash FROM votes ORDER BY id')
                 cursor.execute('DELETE FROM votes')
                 conn.commit()
+                self._tally_changed()
+                self._voters.clear()
                 print("DEBUG: All votes cleared from database")
                 return True
         except Exception as e:
@@ -469,33 +923,14 @@ class VotingSystem:
     def get_vote_statistics(self) -> Dict:
         """Get detailed voting statistics"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                # Total votes
-                cursor.execute('SELECT COUNT(*) FROM votes')
-                total_votes = cursor.fetchone()[0]
-
-                # Unique voters
-                cursor.execute('SELECT COUNT(DISTINCT person_id) FROM votes')
-                unique_voters = cursor.fetchone()[0]
-
-                # Votes per party
-                cursor.execute('''
-                    SELECT p.name, p.symbol, COUNT(v.id) as vote_count
-                    FROM parties p
-                    LEFT JOIN votes v ON p.id = v.party_id
-                    GROUP BY p.id, p.name, p.symbol
-                    ORDER BY vote_count DESC
-                ''')
-                party_votes = cursor.fetchall()
-
-                return {
-                    'total_votes': total_votes,
-                    'unique_voters': unique_voters,
-                    'party_votes': party_votes,
-                    'database_status': 'operational'
-                }
+            tally = self.get_tally()
+            party_votes = [(row['party'], row['symbol'], row['votes']) for row in self.get_party_votes()]
+            return {
+                'total_votes': tally['total_votes'],
+                'unique_voters': tally['total_voters'],
+                'party_votes': party_votes,
+                'database_status': 'operational'
+            }
         except Exception as e:
             print(f"Error getting vote statistics: {e}")
             return {
@@ -508,8 +943,19 @@ class VotingSystem:
 # Global voting system instance
 voting_system = VotingSystem()
 
-def show_voting_interface(person_id: int, confidence_score: float):
-    """Show voting interface for authenticated person"""
+def _open_receipt(path: Optional[str]) -> None:
+    """Receipt worker callback: open the finished receipt (os.startfile needs no Tk thread)"""
+    if not path:
+        return
+    print(f"Official Voting Receipt Generated: {path}")
+    try:
+        os.startfile(path)
+    except Exception:
+        pass
+
+
+def show_voting_interface(person_id: int, confidence_score: float, username="Voter"):
+    """Show voting interface for authenticated person (username is printed on the receipt)"""
     
     # Check if already voted
     if voting_system.has_voted(person_id):
@@ -649,29 +1095,24 @@ def show_voting_interface(person_id: int, confidence_score: float):
                                  "Person ID: " + str(person_id) + "\n" +
                                  "Time: " + current_time)
 
-                messagebox.showinfo("Vote Cast Successfully", success_message)
-                # Save receipt locally (JSON)
-                # Generate Beautiful JPEG Receipt (Replacing JSON)
+                # Render the JPEG receipt in the background while the voter reads the confirmation
                 try:
-                    jpeg_path = generate_jpeg_receipt(
+                    submit_receipt(
+                        'jpeg',
+                        callback=_open_receipt,
                         person_id=person_id,
                         username=username,
                         party_name=str(selected_party_name),
                         party_symbol=str(selected_party_symbol),
                         timestamp=current_time,
                         confidence_score=float(confidence_score),
-                        election=elections[election_combo.current()]['name'] if elections else 'General'
+                        election=elections[election_combo.current()]['name'] if elections else 'General',
+                        proof=voting_system.get_vote_proof(person_id, selected_election_id)
                     )
-                    if jpeg_path:
-                        # Auto-open the JPEG
-                        try:
-                            os.startfile(jpeg_path)
-                        except Exception:
-                            pass
-                        messagebox.showinfo("Digital Receipt", f"Official Voting Receipt Generated:\n{jpeg_path}\n\nYou can keep this image as proof of your vote.")
+                    success_message += "\n\nYour official receipt is being saved to the receipts folder."
                 except Exception as e:
-                    print(f"Receipt Error: {e}") 
-                    pass
+                    print(f"Receipt Error: {e}")
+                messagebox.showinfo("Vote Cast Successfully", success_message)
                 # Attempt SMS receipt
                 try:
                     if _SMS_SUPPORT:
@@ -973,23 +1414,24 @@ def show_enhanced_voting_interface(person_id: int, confidence_score: float, iris
                                      "Thank you for participating in the democratic process!\n" +
                                      "Your vote has been securely recorded and encrypted.")
 
-                        messagebox.showinfo("Vote Cast Successfully", receipt_msg)
-                        # Generate JPEG Receipt
+                        # Render the JPEG receipt in the background while the voter reads the confirmation
                         try:
-                            jpeg_path = generate_jpeg_receipt(
+                            submit_receipt(
+                                'jpeg',
+                                callback=_open_receipt,
                                 person_id=person_id,
                                 username=username,
                                 party_name=str(party_name),
                                 party_symbol=str(party_symbol),
                                 timestamp=current_time,
                                 confidence_score=float(confidence_score),
-                                election=elections[enhanced_election_combo.current()]['name'] if elections else 'General'
+                                election=elections[enhanced_election_combo.current()]['name'] if elections else 'General',
+                                proof=voting_system.get_vote_proof(person_id, selected_election_id)
                             )
-                            if jpeg_path:
-                                try: os.startfile(jpeg_path)
-                                except: pass
-                                messagebox.showinfo("Digital Receipt", f"Official Voting Receipt Generated:\n{jpeg_path}\n\nYou can keep this image as proof of your vote.")
-                        except Exception: pass
+                            receipt_msg += "\n\nYour official receipt is being saved to the receipts folder."
+                        except Exception as e:
+                            print(f"Receipt Error: {e}")
+                        messagebox.showinfo("Vote Cast Successfully", receipt_msg)
 
                         # Close Logic
                         if on_close: on_close()
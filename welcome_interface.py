@@ -23,6 +23,7 @@ except Exception:
     CV2_AVAILABLE = False
 try:
     from PIL import Image, ImageTk
+    from video_presenter import VideoPresenter
     PIL_AVAILABLE = True
 except Exception:
     PIL_AVAILABLE = False
@@ -282,28 +283,41 @@ class AnimatedWelcome:
         video_lbl.pack(fill=tk.BOTH, expand=True)
         
         cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        if fps <= 1 or fps > 120:
+            fps = 30.0
+        frame_interval = 1.0 / fps
+        # One PhotoImage for the whole video; frames are pasted into it
+        presenter = VideoPresenter(video_lbl, size=None, fps=fps)
+        start_time = time.monotonic()
+        shown = [0]  # Frames consumed so far (mutable for the closure)
         
         def stream():
             if not cap.isOpened():
                 finish()
                 return
+            
+            # Stay on the video clock: skip frames (grab only) if the UI fell behind
+            due = int((time.monotonic() - start_time) / frame_interval)
+            while shown[0] < due:
+                if not cap.grab():
+                    finish()
+                    return
+                shown[0] += 1
                 
             ret, frame = cap.read()
             if ret:
+                shown[0] += 1
                 # Resize to fit window
                 w = self.root.winfo_width()
                 h = self.root.winfo_height()
-                if w > 10 and h > 10: # Avoid startup constraints
-                    frame = cv2.resize(frame, (w, h))
-                
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                img = Image.fromarray(frame)
-                imgtk = ImageTk.PhotoImage(image=img)
-                video_lbl.config(image=imgtk)
-                video_lbl.image = imgtk
+                size = (w, h) if w > 10 and h > 10 else None # Avoid startup constraints
+                presenter.present(frame, size)
                 
-                # Next frame (approx 30fps -> 33ms)
-                self.root.after(33, stream)
+                # Next frame at its presentation time
+                next_due = start_time + shown[0] * frame_interval
+                delay_ms = max(1, int((next_due - time.monotonic()) * 1000))
+                self.root.after(delay_ms, stream)
             else:
                 finish()
                 